@@ -5,9 +5,14 @@ from .auth_decorators import (
     require_any_role,
     require_verified_email,
     require_owner_or_role,
+    require_event_access,
     get_current_user,
-    load_current_user
+    get_current_principal,
+    load_current_user,
+    resolve_principal
 )
+from .principal_cache import invalidate_principal, invalidate_all_principals
+from .revocation import is_token_revoked, revoke_token
 
 __all__ = [
     'require_authenticated',
@@ -16,6 +21,13 @@ __all__ = [
     'require_any_role',
     'require_verified_email',
     'require_owner_or_role',
+    'require_event_access',
     'get_current_user',
+    'get_current_principal',
     'load_current_user',
+    'resolve_principal',
+    'invalidate_principal',
+    'invalidate_all_principals',
+    'is_token_revoked',
+    'revoke_token',
 ]
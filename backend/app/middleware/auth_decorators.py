@@ -1,15 +1,27 @@
 from functools import wraps
 from typing import Callable, List, Optional, Union, TYPE_CHECKING
-from flask import g, jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask import current_app, g, jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from app.extensions import db
 from app.models import User
+from app.middleware.principal_cache import Principal, get_principal, principal_from_claims
+from app.middleware.auth_getters import get_event_with_access
 
 if TYPE_CHECKING:
     from app.models import User
 
 
+def get_current_principal() -> Optional[Principal]:
+    return getattr(g, 'current_principal', None)
+
+
 def get_current_user() -> Optional["User"]:
-    return getattr(g, 'current_user', None)
+    user = getattr(g, 'current_user', None)
+    principal = get_current_principal()
+    if user is None and principal is not None:
+        user = db.session.get(User, principal.id)
+        g.current_user = user
+    return user
 
 
 def load_current_user() -> Optional["User"]:
@@ -34,6 +46,19 @@ def load_current_user() -> Optional["User"]:
         return None
 
 
+def resolve_principal(user_id) -> Optional[Principal]:
+    """
+    With AUTHORIZE_FROM_JWT_CLAIMS enabled, trust the roles and flags carried by
+    the access token, so that staleness is bounded by the token lifetime; tokens
+    without those claims, and the default mode, go through the principal cache.
+    """
+    if current_app.config.get('AUTHORIZE_FROM_JWT_CLAIMS'):
+        principal = principal_from_claims(user_id, get_jwt())
+        if principal is not None:
+            return principal
+    return get_principal(user_id)
+
+
 def require_authenticated(fn: Callable) -> Callable:
     @wraps(fn)
     def wrapper(*args, **kwargs):
@@ -52,18 +77,15 @@ def require_authenticated(fn: Callable) -> Callable:
                 "message": "Token does not contain valid user identity"
             }), 401
         
-        user = User.query.filter(
-            User.id == user_id,
-            User.deleted_at.is_(None)
-        ).first()
+        principal = resolve_principal(user_id)
         
-        if not user:
+        if not principal:
             return jsonify({
                 "error": "user_not_found",
                 "message": "User associated with token no longer exists"
             }), 401
         
-        g.current_user = user
+        g.current_principal = principal
         return fn(*args, **kwargs)
     
     return wrapper
@@ -73,7 +95,7 @@ def require_active_user(fn: Callable) -> Callable:
     @wraps(fn)
     @require_authenticated
     def wrapper(*args, **kwargs):
-        user = get_current_user()
+        user = get_current_principal()
         
         if not user.is_active:
             return jsonify({
@@ -90,7 +112,7 @@ def require_verified_email(fn: Callable) -> Callable:
     @wraps(fn)
     @require_active_user
     def wrapper(*args, **kwargs):
-        user = get_current_user()
+        user = get_current_principal()
         
         if not user.is_email_verified:
             return jsonify({
@@ -111,9 +133,9 @@ def require_roles(roles: Union[str, List[str]]) -> Callable:
         @wraps(fn)
         @require_active_user
         def wrapper(*args, **kwargs):
-            user = get_current_user()
+            user = get_current_principal()
             
-            user_roles = {role.name for role in user.roles}
+            user_roles = user.roles
             
             missing_roles = set(roles) - user_roles
             if missing_roles:
@@ -137,9 +159,9 @@ def require_any_role(roles: Union[str, List[str]]) -> Callable:
         @wraps(fn)
         @require_active_user
         def wrapper(*args, **kwargs):
-            user = get_current_user()
+            user = get_current_principal()
             
-            user_roles = {role.name for role in user.roles}
+            user_roles = user.roles
             
             if not user_roles.intersection(set(roles)):
                 return jsonify({
@@ -167,15 +189,14 @@ def require_owner_or_role(
         @wraps(fn)
         @require_active_user
         def wrapper(*args, **kwargs):
-            user = get_current_user()
+            user = get_current_principal()
             
             owner_id = resource_owner_getter(*args, **kwargs)
             
             if str(user.id) == str(owner_id):
                 return fn(*args, **kwargs)
             
-            user_roles = {role.name for role in user.roles}
-            if user_roles.intersection(set(roles)):
+            if user.roles.intersection(roles):
                 return fn(*args, **kwargs)
             
             return jsonify({
@@ -186,3 +207,48 @@ def require_owner_or_role(
         return wrapper
     
     return decorator
+
+
+def require_event_access(
+    id_key: str = 'event_id',
+    allow_participants: bool = False,
+    roles: Optional[Union[str, List[str]]] = None,
+    options=None
+) -> Callable:
+    """
+    Allow the event owner, its participants (when allow_participants is set) or
+    users with one of the roles, loading the event into g.current_resource with
+    the same query that checks access.
+    """
+    if roles is None:
+        roles = ['admin']
+    elif isinstance(roles, str):
+        roles = [roles]
+    
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        @require_active_user
+        def wrapper(*args, **kwargs):
+            user = get_current_principal()
+            
+            found = get_event_with_access(kwargs.get(id_key), user.id, options=options)
+            if found is None:
+                return jsonify({
+                    "error": "not_found",
+                    "message": "Event not found"
+                }), 404
+            
+            event, is_owner, is_participant = found
+            if not (is_owner or (allow_participants and is_participant) or user.roles.intersection(roles)):
+                return jsonify({
+                    "error": "access_denied",
+                    "message": "You can only access your own resources"
+                }), 403
+            
+            g.current_resource = event
+            return fn(*args, **kwargs)
+        
+        return wrapper
+    
+    return decorator
+
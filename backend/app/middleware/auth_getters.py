@@ -1,12 +1,14 @@
 from flask import g, abort
+from sqlalchemy import exists, select
 from app.extensions import db
+from app.models.event import Event, EventParticipant
 
 
-def get_resource(model_class, id_key='id'):
+def get_resource(model_class, id_key='id', options=None):
     def getter(*args, **kwargs):
         resource_id = kwargs.get(id_key)
 
-        resource = db.session.get(model_class, resource_id)
+        resource = db.session.get(model_class, resource_id, options=options)
 
         if not resource:
             abort(404, description=f"{model_class.__name__} not found")
@@ -15,4 +17,30 @@ def get_resource(model_class, id_key='id'):
 
         return getattr(resource, 'owner_id', None)
 
-    return getter
\ No newline at end of file
+    return getter
+
+
+def get_event_with_access(event_id, user_id, options=None):
+    """
+    Load an event together with the user's relation to it in one query.
+
+    Returns (event, is_owner, is_participant), or None when the event does not
+    exist. The participant check is an EXISTS on the event_participants
+    primary key.
+    """
+    is_participant = exists().where(
+        EventParticipant.event_id == Event.id,
+        EventParticipant.user_id == user_id,
+    )
+    statement = (
+        select(Event, (Event.owner_id == user_id).label('is_owner'), is_participant.label('is_participant'))
+        .where(Event.id == event_id)
+    )
+    if options:
+        statement = statement.options(*options)
+
+    row = db.session.execute(statement).unique().first()
+    if row is None:
+        return None
+    return row[0], bool(row[1]), bool(row[2])
+
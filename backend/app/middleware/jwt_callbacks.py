@@ -1,5 +1,6 @@
 from flask import jsonify
 from app.extensions import jwt
+from app.middleware.revocation import is_token_revoked
 
 
 def configure_jwt_callbacks():
@@ -24,6 +25,10 @@ def configure_jwt_callbacks():
             "message": "Access token is missing or invalid"
         }), 401
 
+    @jwt.token_in_blocklist_loader
+    def token_in_blocklist_callback(jwt_header, jwt_payload):
+        return is_token_revoked(jwt_payload)
+
     @jwt.revoked_token_loader
     def revoked_token_callback(jwt_header, jwt_payload):
         return jsonify({
@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Hashable, Optional
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import User
+from app.models.role import Role, UserRole
+
+PRINCIPAL_CACHE_SIZE = 4096
+PRINCIPAL_CACHE_TTL = 30.0
+
+
+class Principal:
+    """
+    What the authorization decorators need to know about a user.
+    """
+
+    __slots__ = ('id', 'is_active', 'is_email_verified', 'roles')
+
+    def __init__(self, id, is_active: bool, is_email_verified: bool, roles: FrozenSet[str]):
+        self.id = id
+        self.is_active = is_active
+        self.is_email_verified = is_email_verified
+        self.roles = roles
+
+    def __repr__(self):
+        return f"Principal(id={self.id!s}, roles={sorted(self.roles)})"
+
+
+class PrincipalCache:
+    """
+    Bounded LRU cache of principals by user id whose entries expire after ttl seconds.
+
+    The cache is per process, so the TTL bounds how long other workers can
+    serve a principal that was invalidated elsewhere.
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Hashable) -> Optional[Principal]:
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, principal: Principal) -> None:
+        key = str(principal.id)
+        with self._lock:
+            self._entries[key] = (principal, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache()
+
+
+def fetch_principal(user_id) -> Optional[Principal]:
+    """
+    Load a principal with a single query, or None for a missing or deleted user.
+    """
+    rows = db.session.execute(
+        select(User.id, User.is_active, User.is_email_verified, Role.name)
+        .outerjoin(UserRole, UserRole.user_id == User.id)
+        .outerjoin(Role, Role.id == UserRole.role_id)
+        .where(User.id == user_id, User.deleted_at.is_(None))
+    ).all()
+
+    if not rows:
+        return None
+
+    id_, is_active, is_email_verified, _ = rows[0]
+    return Principal(id_, is_active, is_email_verified, frozenset(row.name for row in rows if row.name))
+
+
+def get_principal(user_id) -> Optional[Principal]:
+    """
+    Principal for the user id, served from the cache when fresh.
+    """
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = fetch_principal(user_id)
+        if principal is not None:
+            principal_cache.put(principal)
+    return principal
+
+
+def principal_claims(principal: Principal) -> dict:
+    """
+    Additional access-token claims carrying the principal's flags and roles.
+    """
+    return {
+        'roles': sorted(principal.roles),
+        'is_active': bool(principal.is_active),
+        'is_email_verified': bool(principal.is_email_verified),
+    }
+
+
+def principal_from_claims(user_id, claims: dict) -> Optional[Principal]:
+    """
+    Rebuild a principal from token claims, or None for tokens issued without them.
+    """
+    if not all(key in claims for key in ('roles', 'is_active', 'is_email_verified')):
+        return None
+    return Principal(user_id, bool(claims['is_active']), bool(claims['is_email_verified']),
+                     frozenset(claims['roles']))
+
+
+def invalidate_principal(user_id) -> None:
+    principal_cache.invalidate(user_id)
+
+
+def invalidate_all_principals() -> None:
+    principal_cache.clear()
+
+
+PENDING_INVALIDATIONS_KEY = 'principal_cache_pending'
+ALL_PRINCIPALS = '*'
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_principals(session, flush_context):
+    """
+    Remember which principals the transaction changes; they are evicted once it commits.
+    """
+    pending = session.info.setdefault(PENDING_INVALIDATIONS_KEY, set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, Role):
+            pending.add(ALL_PRINCIPALS)
+        elif isinstance(instance, User) and instance.id is not None:
+            pending.add(str(instance.id))
+        elif isinstance(instance, UserRole) and instance.user_id is not None:
+            pending.add(str(instance.user_id))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_principals(session):
+    pending = session.info.pop(PENDING_INVALIDATIONS_KEY, None)
+    if not pending:
+        return
+    if ALL_PRINCIPALS in pending:
+        invalidate_all_principals()
+        return
+    for user_id in pending:
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_principals(session):
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
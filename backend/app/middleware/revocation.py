@@ -0,0 +1,108 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Hashable, Optional
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models import UserSession
+
+REVOCATION_SYNC_INTERVAL = 5.0
+REVOCATION_SYNC_OVERLAP = timedelta(minutes=1)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+class RevocationSet:
+    """
+    JTIs of revoked, not yet expired refresh tokens.
+
+    The first lookup in a process loads every such session; later lookups
+    fetch only sessions revoked since the newest revoked_at seen (less an
+    overlap for late commits) at most every sync_interval seconds, through
+    the partial revoked_at index. Revocations made by this process are added
+    right away; other workers see them within sync_interval. If a sync fails
+    the current set keeps being used until the next one succeeds.
+    """
+
+    def __init__(self, sync_interval: float = REVOCATION_SYNC_INTERVAL, clock=time.monotonic):
+        self.sync_interval = sync_interval
+        self._clock = clock
+        self._revoked: Dict[str, datetime] = {}
+        self._watermark: Optional[datetime] = None
+        self._synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def add(self, jti: Hashable, expires_at: datetime) -> None:
+        with self._lock:
+            self._revoked[str(jti)] = _as_utc(expires_at)
+
+    def __contains__(self, jti: Hashable) -> bool:
+        return str(jti) in self._revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_stale(self) -> bool:
+        return self._synced_at is None or self._clock() - self._synced_at >= self.sync_interval
+
+    def sync(self) -> None:
+        """
+        Merge sessions revoked since the last sync and drop expired entries.
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            now = datetime.now(timezone.utc)
+            query = select(UserSession.id, UserSession.revoked_at, UserSession.expires_at).where(
+                UserSession.revoked_at.is_not(None), UserSession.expires_at > now
+            )
+            if self._watermark is not None:
+                query = query.where(UserSession.revoked_at >= self._watermark - REVOCATION_SYNC_OVERLAP)
+            rows = db.session.execute(query).all()
+
+            with self._lock:
+                for row in rows:
+                    self._revoked[str(row.id)] = _as_utc(row.expires_at)
+                    revoked_at = _as_utc(row.revoked_at)
+                    if self._watermark is None or revoked_at > self._watermark:
+                        self._watermark = revoked_at
+                self._revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > now}
+            self._synced_at = self._clock()
+        finally:
+            self._sync_lock.release()
+
+    def is_revoked(self, jti: Hashable) -> bool:
+        if self.is_stale():
+            try:
+                self.sync()
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                current_app.logger.warning("Syncing revoked tokens failed: %s", e)
+        return jti in self
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked.clear()
+            self._watermark = None
+            self._synced_at = None
+
+
+revoked_tokens = RevocationSet()
+
+
+def revoke_token(jti: Hashable, expires_at: datetime) -> None:
+    revoked_tokens.add(jti, expires_at)
+
+
+def is_token_revoked(jwt_payload: dict) -> bool:
+    """
+    Blocklist check for refresh tokens; access tokens are short-lived and not tracked.
+    """
+    if jwt_payload.get('type') != 'refresh':
+        return False
+    return revoked_tokens.is_revoked(jwt_payload['jti'])
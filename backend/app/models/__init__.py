@@ -2,7 +2,8 @@ from .user import User, UserProfile, UserSettings
 from .role import Role, UserRole
 from .session import UserSession
 from .security import LoginAttempt, PasswordResetToken
-from .event import Event, EventParticipant
+from .event import Event, EventParticipant, EventException, CalendarVersion, EventTombstone
+from .outbox import EmailOutbox
 
 __all__ = [
 	"User",
@@ -14,5 +15,9 @@ __all__ = [
 	"PasswordResetToken",
 	"UserSettings",
 	"Event",
-	"EventParticipant"
+	"EventParticipant",
+	"EventException",
+	"CalendarVersion",
+	"EventTombstone",
+	"EmailOutbox"
 ]
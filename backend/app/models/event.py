@@ -1,5 +1,6 @@
 from app.extensions import db
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import CheckConstraint, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from datetime import datetime, timezone
 
 class Event(db.Model):
@@ -14,31 +15,51 @@ class Event(db.Model):
     status = db.Column(db.String(20), nullable=True)
     end_time = db.Column(db.DateTime, nullable=False)
     owner_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
+    updated_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=db.func.now(), onupdate=db.func.now()
+    )
+    recurrence_rule = db.Column(db.String(255), nullable=True)
+    recurrence_end = db.Column(db.DateTime, nullable=True)
+    search_vector = db.deferred(db.Column(
+        TSVECTOR,
+        db.Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'C')",
+            persisted=True,
+        ),
+    ))
 
     owner = db.relationship('User', back_populates='owned_events')
     participant_links = db.relationship("EventParticipant", back_populates="event",
-                                        cascade="all, delete-orphan", lazy="dynamic")
+                                        cascade="all, delete-orphan")
+    exceptions = db.relationship("EventException", back_populates="event",
+                                 cascade="all, delete-orphan", order_by="EventException.original_start")
 
+    __table_args__ = (
+        Index("ix_events_owner_id_start_time_end_time", "owner_id", "start_time", "end_time"),
+        Index("ix_events_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     def user_has_access(self, user):
+        from app.middleware.auth_getters import get_event_with_access
+
         if self.owner_id == user.id:
             return True
 
-        return (
-            self.participant_links.
-            filter(EventParticipant.user_id == user.id).
-            first() is not None)
+        found = get_event_with_access(self.id, user.id)
+        return found is not None and found[2]
 
 
     def to_dict(self):
-        links = self.participant_links.all()
-
         return {
             'id': self.id,
             'title': self.title,
             'description': self.description,
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'end_time': self.end_time.isoformat() if self.end_time else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'recurrence_rule': self.recurrence_rule,
             'location': self.location,
             'color': self.color,
             'status': self.status,
@@ -49,7 +70,7 @@ class Event(db.Model):
             'participants': [{
                 'id': link.user.id,
                 'email': link.user.email
-            } for link in links],
+            } for link in self.participant_links],
         }
 
 
@@ -63,3 +84,51 @@ class EventParticipant(db.Model):
 
     event = db.relationship("Event", back_populates="participant_links")
     user = db.relationship("User", back_populates="event_participations")
+
+    __table_args__ = (
+        Index("ix_event_participants_user_id", "user_id"),
+    )
+
+
+class EventException(db.Model):
+    __tablename__ = 'event_exceptions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
+    original_start = db.Column(db.DateTime, nullable=False)
+    is_cancelled = db.Column(db.Boolean, nullable=False, default=False)
+    start_time = db.Column(db.DateTime, nullable=True)
+    end_time = db.Column(db.DateTime, nullable=True)
+    title = db.Column(db.String(255), nullable=True)
+    description = db.Column(db.Text, nullable=True)
+    location = db.Column(db.String(255), nullable=True)
+    status = db.Column(db.String(20), nullable=True)
+
+    event = db.relationship("Event", back_populates="exceptions")
+
+    __table_args__ = (
+        Index("ux_event_exceptions_event_id_original_start", "event_id", "original_start", unique=True),
+        Index("ix_event_exceptions_moved", "start_time", "end_time",
+              postgresql_where=text("start_time IS NOT NULL AND NOT is_cancelled")),
+        CheckConstraint("(start_time IS NULL) = (end_time IS NULL)", name="ck_event_exceptions_moved_times"),
+    )
+
+
+class CalendarVersion(db.Model):
+    __tablename__ = 'calendar_versions'
+
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class EventTombstone(db.Model):
+    __tablename__ = 'event_tombstones'
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    event_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    deleted_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=db.func.now())
+
+    __table_args__ = (
+        Index("ix_event_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+    )
@@ -0,0 +1,26 @@
+from sqlalchemy import CheckConstraint, Index, text
+from app.extensions import db
+
+
+class EmailOutbox(db.Model):
+    __tablename__ = "email_outbox"
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    recipient = db.Column(db.Text, nullable=False)
+    subject = db.Column(db.Text, nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="pending", server_default="pending")
+    attempts = db.Column(db.SmallInteger, nullable=False, default=0, server_default="0")
+    next_attempt_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=db.func.now())
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=db.func.now())
+    sent_at = db.Column(db.DateTime(timezone=True))
+
+    __table_args__ = (
+        CheckConstraint("status IN ('pending','sent','failed')", name="ck_email_outbox_status"),
+        Index(
+            "ix_email_outbox_pending_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
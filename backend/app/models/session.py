@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Index
+from sqlalchemy import Index, text
 from sqlalchemy.dialects.postgresql import UUID, INET
 from app.extensions import db
 
@@ -21,4 +21,5 @@ class UserSession(db.Model):
 
     __table_args__ = (
         Index("ix_user_sessions_user_id", "user_id"),
+        Index("ix_user_sessions_revoked_at", "revoked_at", postgresql_where=text("revoked_at IS NOT NULL")),
     )
@@ -8,14 +8,23 @@ from app.services.auth_service import (
     send_reset_password_email, reset_password,
     TokenNotFoundException,TokenExpiredException,TokenAlreadyUsedException,
     validate_email)
+from app.services.throttle_service import LoginThrottledError
+from app.services.password_service import HashingPoolSaturatedError
 from flask_jwt_extended import (
-    jwt_required, get_jwt_identity, get_jwt,
+    jwt_required, verify_jwt_in_request, get_jwt_identity, get_jwt,
     set_refresh_cookies, unset_jwt_cookies
 )
 from sqlalchemy.exc import SQLAlchemyError
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/api/auth")
 
+
+def _hashing_busy(error):
+    response = jsonify({"error": "service_busy", "details": "Too many password checks in progress. Try again shortly."})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
+
 @auth_bp.route("/register", methods=["POST"])
 def register():
     """
@@ -52,6 +61,8 @@ def register():
         description: Email and password required
       401:
         description: Invalid credentials
+      503:
+        description: Password hashing is at capacity; see Retry-After
     """
     data = request.get_json(silent=True) or {}
 
@@ -91,7 +102,10 @@ def register():
             }
         ), 400
 
-    user, errors = create_user(data)
+    try:
+        user, errors = create_user(data)
+    except HashingPoolSaturatedError as he:
+        return _hashing_busy(he)
     if not user:
         return jsonify(
             {
@@ -135,6 +149,10 @@ def login():
         description: Email and password required
       401:
         description: Invalid credentials
+      429:
+        description: Too many failed attempts for this email or IP address; see Retry-After
+      503:
+        description: Password hashing is at capacity; see Retry-After
     """
     data = request.get_json(silent=True) or {}
     email = data.get("email")
@@ -143,7 +161,14 @@ def login():
     if not email or not password:
         return jsonify({"error": "email_and_password_required", "details": "Email and password required"}), 400
 
-    user = authenticate_user(email, password)
+    try:
+        user = authenticate_user(email, password, request.remote_addr, str(request.user_agent))
+    except LoginThrottledError as te:
+        response = jsonify({"error": "too_many_attempts", "details": "Too many failed login attempts. Try again later."})
+        response.headers['Retry-After'] = str(te.retry_after)
+        return response, 429
+    except HashingPoolSaturatedError as he:
+        return _hashing_busy(he)
     if not user:
         return jsonify({"error": "invalid_credentials", "details": "Invalid credentials"}), 401
 
@@ -166,7 +191,6 @@ def login():
 
 
 @auth_bp.route("/logout", methods=["POST"])
-@jwt_required(optional=True)
 def logout():
     """
     Logout user and clear cookies
@@ -177,9 +201,13 @@ def logout():
       200:
         description: Logged out successfully
     """
-    jti_string = get_jwt()['jti']
-
-    revoke_session(uuid.UUID(jti_string))
+    # The session is keyed by the refresh token's JTI, so look for the refresh
+    # cookie first; an access token in the header does not identify it.
+    verify_jwt_in_request(optional=True, refresh=True, locations=["cookies", "headers"],
+                          verify_type=False, skip_revocation_check=True)
+    token = get_jwt()
+    if token.get('type') == 'refresh':
+        revoke_session(uuid.UUID(token['jti']))
 
     response = jsonify({"message": "Logged out successfully"})
     unset_jwt_cookies(response)
@@ -356,6 +384,8 @@ def reset():
       description: Successfully reset password
     400:
       description: Token and password required
+    503:
+      description: Password hashing is at capacity; see Retry-After
     500:
       description: Internal server error
   """
@@ -392,6 +422,8 @@ def reset():
 
   except (TokenNotFoundException, TokenAlreadyUsedException, TokenExpiredException) as e:
       return jsonify({"error": str(e)}), 400
+  except HashingPoolSaturatedError as he:
+      return _hashing_busy(he)
   except SQLAlchemyError:
       return jsonify({"error": "A database error occurred. Please try again later."}), 500
   except Exception:
@@ -0,0 +1,157 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.services.calendar_service import parse_time_range
+from app.services.availability_service import (
+    parse_user_ids, validate_window, get_free_busy, parse_slot_request, find_common_slots)
+
+availability_bp = Blueprint('availability', __name__, url_prefix='/api/availability')
+
+
+def _invalid_value(ve):
+    error_msg = str(ve)
+    if error_msg.startswith("INVALID_DATE:"):
+        return jsonify({"error": "Invalid date format", "details": error_msg.replace("INVALID_DATE: ", "")}), 400
+    return jsonify({"error": "Invalid value", "details": error_msg}), 400
+
+
+@availability_bp.route('/freebusy', methods=['POST'])
+@jwt_required()
+def free_busy():
+    """
+    Get busy blocks of several users within a time window
+    ---
+    tags:
+      - Availability
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - user_ids
+            - from
+            - to
+          properties:
+            user_ids:
+              type: array
+              items:
+                type: string
+                format: uuid
+              example: ["550e8400-e29b-41d4-a716-446655440000"]
+            from:
+              type: string
+              format: date-time
+              example: "2024-06-01T00:00:00"
+            to:
+              type: string
+              format: date-time
+              example: "2024-06-08T00:00:00"
+    responses:
+      200:
+        description: Merged busy blocks per user
+      400:
+        description: Invalid users or time window
+      401:
+        description: Authentication required
+    """
+    data = request.get_json(silent=True) or {}
+
+    try:
+        user_ids = parse_user_ids(data.get('user_ids'))
+        range_start, range_end = parse_time_range(data)
+        validate_window(range_start, range_end)
+    except ValueError as ve:
+        return _invalid_value(ve)
+
+    busy = get_free_busy(user_ids, range_start, range_end)
+
+    return jsonify({
+        "from": range_start.isoformat(),
+        "to": range_end.isoformat(),
+        "busy": {
+            str(user_id): [{"start": start.isoformat(), "end": end.isoformat()} for start, end in blocks]
+            for user_id, blocks in busy.items()
+        }
+    }), 200
+
+
+@availability_bp.route('/slots', methods=['POST'])
+@jwt_required()
+def common_slots():
+    """
+    Find the earliest slots in which all given users are free
+    ---
+    tags:
+      - Availability
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - user_ids
+            - duration_minutes
+            - from
+            - to
+          properties:
+            user_ids:
+              type: array
+              items:
+                type: string
+                format: uuid
+              example: ["550e8400-e29b-41d4-a716-446655440000"]
+            duration_minutes:
+              type: integer
+              example: 60
+            from:
+              type: string
+              format: date-time
+              example: "2024-06-03T00:00:00"
+            to:
+              type: string
+              format: date-time
+              example: "2024-06-08T00:00:00"
+            count:
+              type: integer
+              example: 5
+            working_hours:
+              type: object
+              description: Working hours applied in each user's profile timezone
+              properties:
+                start:
+                  type: string
+                  example: "09:00"
+                end:
+                  type: string
+                  example: "17:00"
+            working_days:
+              type: array
+              items:
+                type: integer
+              description: Weekdays with working hours (0 = Monday), Monday to Friday by default
+              example: [0, 1, 2, 3, 4]
+    responses:
+      200:
+        description: Earliest free slots
+      400:
+        description: Invalid search parameters
+      401:
+        description: Authentication required
+    """
+    data = request.get_json(silent=True) or {}
+
+    try:
+        user_ids = parse_user_ids(data.get('user_ids'))
+        range_start, range_end = parse_time_range(data)
+        validate_window(range_start, range_end)
+        duration, count, working_hours, working_days = parse_slot_request(data)
+    except ValueError as ve:
+        return _invalid_value(ve)
+
+    slots = find_common_slots(user_ids, range_start, range_end, duration, count, working_hours, working_days)
+
+    return jsonify({
+        "slots": [{"start": start.isoformat(), "end": end.isoformat()} for start, end in slots]
+    }), 200
@@ -1,15 +1,33 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, Response, request, jsonify, g, make_response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.services.calendar_service import create_event, patch_event
-from app.models.event import Event
+from app.services.calendar_service import (
+    create_event, patch_event, parse_time_range, get_user_events_query,
+    event_etag_options, load_event, event_etag, parse_pagination, paginate_events, paginate_occurrences, iter_events_json,
+    bump_calendar_versions, get_calendar_version, calendar_etag,
+    record_event_tombstones, decode_sync_token, get_event_changes,
+    EventConflictError, serialize_events, set_occurrence_exception, clear_occurrence_exception,
+    bulk_create_events, bulk_patch_events, bulk_delete_events, search_events, parse_search_limit)
+from app.services.ical_service import iter_calendar_ics, import_ics, parse_import_batch_size
 from app.models.user import User
 from app.extensions import db
-from app.middleware.auth_getters import get_resource
-from app.middleware.auth_decorators import require_owner_or_role
+from app.middleware.auth_decorators import require_event_access
 
 calendar_bp = Blueprint('calendar', __name__, url_prefix='/api/calendar')
 
 
+def _not_modified(etag):
+    response = make_response('', 304)
+    response.set_etag(etag)
+    return response
+
+
+def _with_etag(response, etag):
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
 @calendar_bp.route('/events/create', methods=['POST'])
 @jwt_required()
 def create_new_event():
@@ -43,6 +61,20 @@ def create_new_event():
               type: string
               format: date-time
               example: "2023-12-24T11:30:00"
+            participant_ids:
+              type: array
+              items:
+                type: string
+                format: uuid
+              description: List of User UUIDs participating in the event
+            recurrence_rule:
+              type: string
+              description: RRULE (FREQ, INTERVAL, COUNT, UNTIL, weekly BYDAY) repeating the event
+              example: "FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10"
+            check_conflicts:
+              type: boolean
+              description: Reject the event if it overlaps events of the owner or participants
+              example: true
     responses:
       201:
         description: Event created successfully
@@ -50,6 +82,8 @@ def create_new_event():
         description: Missing required fields
       401:
         description: Authentication required
+      409:
+        description: Event overlaps existing events (only with check_conflicts)
       500:
         description: Server error
     """
@@ -72,11 +106,202 @@ def create_new_event():
             "end_time": event.end_time.isoformat(),
             "owner_id": str(event.owner_id)
         }), 201
+    except EventConflictError as ce:
+        return jsonify({"error": "event_conflict", "conflicts": ce.conflicts}), 409
+    except ValueError as ve:
+        db.session.rollback()
+        error_msg = str(ve)
+        if error_msg.startswith("INVALID_RRULE:"):
+            return jsonify({"error": "Invalid recurrence rule", "details": error_msg.replace("INVALID_RRULE: ", "")}), 400
+        return jsonify({"error": "Invalid value", "details": error_msg}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@calendar_bp.route('/events/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create():
+    """
+    Create many calendar events in one request
+    ---
+    tags:
+      - Calendar
+    description: >
+      Valid events are inserted in a single transaction; invalid ones are
+      skipped and reported by their position in the list.
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - events
+          properties:
+            events:
+              type: array
+              maxItems: 1000
+              items:
+                type: object
+                required:
+                  - title
+                  - start_time
+                  - end_time
+                properties:
+                  title:
+                    type: string
+                  start_time:
+                    type: string
+                    format: date-time
+                  end_time:
+                    type: string
+                    format: date-time
+                  participant_ids:
+                    type: array
+                    items:
+                      type: string
+                      format: uuid
+                  recurrence_rule:
+                    type: string
+    responses:
+      201:
+        description: At least one event was created; "errors" lists the rejected ones
+      400:
+        description: Invalid batch or no valid events
+      401:
+        description: Authentication required
+      500:
+        description: Server error
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+
+    try:
+        created, errors = bulk_create_events(data.get('events'), user_id)
+    except ValueError as ve:
+        db.session.rollback()
+        return jsonify({"error": "Invalid value", "details": str(ve)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({"created": created, "errors": errors}), 201 if created else 400
+
+
+def _bulk_change(change):
+    user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+
+    try:
+        event_ids = change(data, user_id)
+    except ValueError as ve:
+        db.session.rollback()
+        error_msg = str(ve)
+        if error_msg.startswith("NOT_FOUND:"):
+            return jsonify({"error": "Not found", "details": error_msg.replace("NOT_FOUND: ", "")}), 404
+        if error_msg.startswith("FORBIDDEN:"):
+            return jsonify({"error": "Access denied", "details": error_msg.replace("FORBIDDEN: ", "")}), 403
+        return jsonify({"error": "Invalid value", "details": error_msg}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({"ids": event_ids, "count": len(event_ids)}), 200
+
+
+@calendar_bp.route('/events/bulk', methods=['PATCH'])
+@jwt_required()
+def bulk_update():
+    """
+    Apply the same change to many events (Only for owners)
+    ---
+    tags:
+      - Calendar
+    description: >
+      All events must exist and belong to the caller, otherwise nothing is
+      changed. Conflicts are not checked.
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - ids
+          properties:
+            ids:
+              type: array
+              maxItems: 1000
+              items:
+                type: integer
+            shift_minutes:
+              type: integer
+              description: Move every event (and its occurrence exceptions) by this many minutes
+              example: 30
+            title:
+              type: string
+            description:
+              type: string
+            location:
+              type: string
+            color:
+              type: string
+            status:
+              type: string
+    responses:
+      200:
+        description: Events updated
+      400:
+        description: Invalid request
+      401:
+        description: Authentication required
+      403:
+        description: Some events belong to other users
+      404:
+        description: Some events do not exist
+    """
+    return _bulk_change(bulk_patch_events)
+
+
+@calendar_bp.route('/events/bulk', methods=['DELETE'])
+@jwt_required()
+def bulk_delete():
+    """
+    Delete many events (Only for owners)
+    ---
+    tags:
+      - Calendar
+    description: All events must exist and belong to the caller, otherwise nothing is deleted.
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - ids
+          properties:
+            ids:
+              type: array
+              maxItems: 1000
+              items:
+                type: integer
+    responses:
+      200:
+        description: Events deleted
+      400:
+        description: Invalid request
+      401:
+        description: Authentication required
+      403:
+        description: Some events belong to other users
+      404:
+        description: Some events do not exist
+    """
+    return _bulk_change(bulk_delete_events)
+
+
 @calendar_bp.route('/events/<int:event_id>', methods=['GET'])
-@require_owner_or_role(resource_owner_getter=get_resource(Event, 'event_id'))
+@require_event_access('event_id', allow_participants=True, options=event_etag_options())
 def get_event(event_id):
     """
     Get event details by ID
@@ -94,6 +319,8 @@ def get_event(event_id):
         description: Event details retrieved
       403:
         description: Access denied (user is not owner or participant)
+      304:
+        description: Event has not changed since the ETag sent in If-None-Match
       404:
         description: Event not found
       401:
@@ -101,11 +328,16 @@ def get_event(event_id):
     """
     event = g.current_resource
 
-    return jsonify(event.to_dict()), 200
+    etag = event_etag(event)
+    if request.if_none_match.contains(etag):
+        return _not_modified(etag)
+
+    event = load_event(event.id)
+    return _with_etag(make_response(jsonify(event.to_dict()), 200), etag)
 
 
 @calendar_bp.route('/events/<int:event_id>', methods=['PATCH'])
-@require_owner_or_role(resource_owner_getter=get_resource(Event, 'event_id'))
+@require_event_access('event_id')
 def update_event(event_id):
     """
     Edit an event (Only for owners)
@@ -151,6 +383,14 @@ def update_event(event_id):
                 format: uuid
               description: List of User UUIDs participating in the event
               example: ["550e8400-e29b-41d4-a716-446655440000", "123e4567-e89b-12d3-a456-426614174000"]
+            recurrence_rule:
+              type: string
+              description: New RRULE for the event. Null or an empty string makes it a single event
+              example: "FREQ=DAILY;COUNT=5"
+            check_conflicts:
+              type: boolean
+              description: Reject the change if the new time or participants overlap other events
+              example: true
     responses:
       200:
         description: Event edited successfully
@@ -160,6 +400,8 @@ def update_event(event_id):
         description: Access denied (only owner can edit)
       404:
         description: Event not found
+      409:
+        description: Event overlaps existing events (only with check_conflicts)
       500:
         description: Internal Server Error (Database failure or unexpected crash)
     """
@@ -181,6 +423,8 @@ def update_event(event_id):
 
         return jsonify(updated_event.to_dict()), 200
 
+    except EventConflictError as ce:
+        return jsonify({"error": "event_conflict", "conflicts": ce.conflicts}), 409
     except TypeError:
         return jsonify({"error": "Invalid type for time value: str(te)"}), 400
     except ValueError as ve:
@@ -189,6 +433,8 @@ def update_event(event_id):
           return jsonify({"error": "Resource not found", "details": error_msg.replace("NOT_FOUND: ", "")}), 404
       elif error_msg.startswith("INVALID_DATE:"):
           return jsonify({"error": "Invalid date format", "details": error_msg.replace("INVALID_DATE: ", "")}), 400
+      elif error_msg.startswith("INVALID_RRULE:"):
+          return jsonify({"error": "Invalid recurrence rule", "details": error_msg.replace("INVALID_RRULE: ", "")}), 400
       else:
           return jsonify({"error": "Invalid value", "details": error_msg}), 400
     except Exception as e:
@@ -196,8 +442,168 @@ def update_event(event_id):
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
 
+@calendar_bp.route('/events/<int:event_id>/occurrences', methods=['PUT'])
+@require_event_access('event_id')
+def update_occurrence(event_id):
+    """
+    Override a single occurrence of a recurring event
+    ---
+    tags:
+      - Calendar
+    parameters:
+      - name: event_id
+        in: path
+        type: integer
+        required: true
+        description: Unique ID of the recurring event
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - original_start
+          properties:
+            original_start:
+              type: string
+              format: date-time
+              description: Start of the occurrence as generated by the recurrence rule
+              example: "2024-06-17T10:00:00"
+            start_time:
+              type: string
+              format: date-time
+              example: "2024-06-17T12:00:00"
+            end_time:
+              type: string
+              format: date-time
+              example: "2024-06-17T13:00:00"
+            title:
+              type: string
+            description:
+              type: string
+            location:
+              type: string
+            status:
+              type: string
+    responses:
+      200:
+        description: Occurrence overridden
+      400:
+        description: Bad request or event is not recurring
+      403:
+        description: Access denied
+      404:
+        description: Event or occurrence not found
+    """
+    return _save_occurrence_exception(g.current_resource, request.get_json(silent=True) or {}, cancelled=False)
+
+
+@calendar_bp.route('/events/<int:event_id>/occurrences', methods=['DELETE'])
+@require_event_access('event_id')
+def cancel_occurrence(event_id):
+    """
+    Cancel a single occurrence of a recurring event
+    ---
+    tags:
+      - Calendar
+    parameters:
+      - name: event_id
+        in: path
+        type: integer
+        required: true
+        description: Unique ID of the recurring event
+      - name: original_start
+        in: query
+        type: string
+        format: date-time
+        required: true
+        description: Start of the occurrence as generated by the recurrence rule
+    responses:
+      200:
+        description: Occurrence cancelled
+      400:
+        description: Bad request or event is not recurring
+      403:
+        description: Access denied
+      404:
+        description: Event or occurrence not found
+    """
+    return _save_occurrence_exception(
+        g.current_resource, {'original_start': request.args.get('original_start')}, cancelled=True
+    )
+
+
+def _save_occurrence_exception(event, data, cancelled):
+    try:
+        exception = set_occurrence_exception(event, data, cancelled=cancelled)
+    except ValueError as ve:
+        db.session.rollback()
+        error_msg = str(ve)
+        if error_msg.startswith("NOT_FOUND:"):
+            return jsonify({"error": "Resource not found", "details": error_msg.replace("NOT_FOUND: ", "")}), 404
+        elif error_msg.startswith("INVALID_DATE:"):
+            return jsonify({"error": "Invalid date format", "details": error_msg.replace("INVALID_DATE: ", "")}), 400
+        return jsonify({"error": "Invalid value", "details": error_msg}), 400
+
+    return jsonify({
+        "event_id": event.id,
+        "original_start": exception.original_start.isoformat(),
+        "cancelled": exception.is_cancelled,
+        "start_time": exception.start_time.isoformat() if exception.start_time else None,
+        "end_time": exception.end_time.isoformat() if exception.end_time else None,
+        "title": exception.title,
+        "description": exception.description,
+        "location": exception.location,
+        "status": exception.status,
+    }), 200
+
+
+@calendar_bp.route('/events/<int:event_id>/exceptions', methods=['DELETE'])
+@require_event_access('event_id')
+def clear_occurrence(event_id):
+    """
+    Remove the override or cancellation of a single occurrence
+    ---
+    tags:
+      - Calendar
+    parameters:
+      - name: event_id
+        in: path
+        type: integer
+        required: true
+        description: Unique ID of the recurring event
+      - name: original_start
+        in: query
+        type: string
+        format: date-time
+        required: true
+        description: Start of the occurrence as generated by the recurrence rule
+    responses:
+      200:
+        description: Occurrence restored as generated by the recurrence rule
+      400:
+        description: Bad request
+      403:
+        description: Access denied
+      404:
+        description: Event or exception not found
+    """
+    try:
+        clear_occurrence_exception(g.current_resource, {'original_start': request.args.get('original_start')})
+    except ValueError as ve:
+        db.session.rollback()
+        error_msg = str(ve)
+        if error_msg.startswith("NOT_FOUND:"):
+            return jsonify({"error": "Resource not found", "details": error_msg.replace("NOT_FOUND: ", "")}), 404
+        elif error_msg.startswith("INVALID_DATE:"):
+            return jsonify({"error": "Invalid date format", "details": error_msg.replace("INVALID_DATE: ", "")}), 400
+        return jsonify({"error": "Invalid value", "details": error_msg}), 400
+
+    return jsonify({"message": "Occurrence restored"}), 200
+
+
 @calendar_bp.route('/events/<int:event_id>', methods=['DELETE'])
-@jwt_required()
+@require_event_access('event_id', roles=[])
 def delete_event(event_id):
     """
     Delete an event (Only for owners)
@@ -218,14 +624,12 @@ def delete_event(event_id):
       404:
         description: Event not found
     """
-    current_user_id = get_jwt_identity()
-
-    event = Event.query.get_or_404(event_id)
-
-    if str(event.owner_id) != str(current_user_id):
-        return jsonify({'error': 'Only the owner can delete this event'}), 403
+    event = g.current_resource
 
     try:
+        affected_user_ids = [event.owner_id, *(link.user_id for link in event.participant_links)]
+        bump_calendar_versions(affected_user_ids)
+        record_event_tombstones(event.id, affected_user_ids)
         db.session.delete(event)
         db.session.commit()
         return jsonify({'message': 'Event deleted successfully'}), 200
@@ -240,11 +644,47 @@ def get_events():
     """
     Get all user events
     ---
+    description: When both from and to are given, recurring events are expanded into their occurrences within the window.
     tags:
       - Calendar
+    parameters:
+      - name: from
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Only return events ending after this time
+        example: "2024-06-01T00:00:00"
+      - name: to
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Only return events starting before this time
+        example: "2024-07-01T00:00:00"
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size. When set (or when cursor is set) the response is an object with data and next_cursor
+        example: 100
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Opaque next_cursor value returned by the previous page
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: Stream the whole (optionally range-limited) listing as a JSON array. Cannot be combined with limit or cursor
     responses:
       200:
         description: Events details retrieved
+      304:
+        description: Calendar has not changed since the ETag sent in If-None-Match
+      400:
+        description: Invalid time range or pagination parameters
       403:
         description: Access denied
       404:
@@ -253,32 +693,265 @@ def get_events():
         description: Authentication required
     """
     current_user_id = get_jwt_identity()
+
+    try:
+        range_start, range_end = parse_time_range(request.args)
+        limit, after = parse_pagination(request.args)
+    except ValueError as ve:
+        error_msg = str(ve)
+        if error_msg.startswith("INVALID_DATE:"):
+            return jsonify({"error": "Invalid date format", "details": error_msg.replace("INVALID_DATE: ", "")}), 400
+        elif error_msg.startswith("INVALID_CURSOR:"):
+            return jsonify({"error": "Invalid cursor", "details": error_msg.replace("INVALID_CURSOR: ", "")}), 400
+        return jsonify({"error": "Invalid value", "details": error_msg}), 400
+
+    stream = request.args.get('stream', '').lower() in ('1', 'true')
+    if stream and limit is not None:
+        return jsonify({"error": "Invalid value", "details": "'stream' cannot be combined with pagination."}), 400
+
+    etag = calendar_etag(
+        current_user_id, get_calendar_version(current_user_id), request.query_string.decode()
+    )
+    if request.if_none_match.contains(etag):
+        return _not_modified(etag)
+
     current_user = User.query.get_or_404(current_user_id)
+    query = get_user_events_query(current_user.id, range_start, range_end)
+
+    if stream:
+        response = Response(
+            stream_with_context(iter_events_json(query, range_start, range_end)), mimetype='application/json'
+        )
+        return _with_etag(response, etag)
+
+    if limit is None:
+        events_data = list(serialize_events(query.all(), range_start, range_end))
+        return _with_etag(make_response(jsonify(events_data), 200), etag)
+
+    if range_start is not None and range_end is not None:
+        events_data, next_cursor = paginate_occurrences(current_user.id, range_start, range_end, limit, after)
+    else:
+        events, next_cursor = paginate_events(query, limit, after)
+        events_data = list(serialize_events(events))
+
+    return _with_etag(make_response(jsonify({
+        "data": events_data,
+        "next_cursor": next_cursor
+    }), 200), etag)
+
+
+@calendar_bp.route('/events/search', methods=['GET'])
+@jwt_required()
+def search_user_events():
+    """
+    Search the user's events by title, location and description
+    ---
+    tags:
+      - Calendar
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Words to look for; each word also matches as a prefix
+        example: team meet
+      - name: from
+        in: query
+        type: string
+        format: date-time
+        required: false
+      - name: to
+        in: query
+        type: string
+        format: date-time
+        required: false
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 20
+        description: Maximal number of results (1-100)
+    responses:
+      200:
+        description: Matching events, best matches first, each with its rank
+      400:
+        description: Missing search text or invalid parameters
+      401:
+        description: Authentication required
+    """
+    current_user_id = get_jwt_identity()
+
+    try:
+        range_start, range_end = parse_time_range(request.args)
+        limit = parse_search_limit(request.args.get('limit'))
+        results = search_events(current_user_id, request.args.get('q'), range_start, range_end, limit)
+    except ValueError as ve:
+        error_msg = str(ve)
+        if error_msg.startswith("INVALID_DATE:"):
+            return jsonify({"error": "Invalid date format", "details": error_msg.replace("INVALID_DATE: ", "")}), 400
+        elif error_msg.startswith("INVALID_QUERY:"):
+            return jsonify({"error": "Invalid search query", "details": error_msg.replace("INVALID_QUERY: ", "")}), 400
+        return jsonify({"error": "Invalid value", "details": error_msg}), 400
+
+    return jsonify([dict(event.to_dict(), rank=rank) for event, rank in results]), 200
+
+
+@calendar_bp.route('/events/changes', methods=['GET'])
+@jwt_required()
+def get_events_changes():
+    """
+    Get events changed since a sync token
+    ---
+    tags:
+      - Calendar
+    parameters:
+      - name: since
+        in: query
+        type: string
+        required: false
+        description: next_since token from the previous call. Omit to receive the full calendar
+    responses:
+      200:
+        description: Events updated and ids of events deleted since the token, plus the next token
+      400:
+        description: Invalid sync token
+      401:
+        description: Authentication required
+      410:
+        description: Sync token is older than the tombstone retention; sync again without since
+    """
+    current_user_id = get_jwt_identity()
+
+    since = request.args.get('since')
+    try:
+        since = decode_sync_token(since) if since else None
+        updated, deleted, next_since = get_event_changes(current_user_id, since)
+    except ValueError as ve:
+        error_msg = str(ve)
+        if error_msg.startswith("TOKEN_EXPIRED:"):
+            return jsonify({"error": "Sync token expired", "details": error_msg.replace("TOKEN_EXPIRED: ", "")}), 410
+        return jsonify({"error": "Invalid sync token", "details": error_msg.replace("INVALID_TOKEN: ", "")}), 400
+
+    return jsonify({
+        "updated": [event.to_dict() for event in updated],
+        "deleted": deleted,
+        "next_since": next_since
+    }), 200
+
+
+@calendar_bp.route('/export.ics', methods=['GET'])
+@jwt_required()
+def export_ics():
+    """
+    Export the user's events as an iCalendar file
+    ---
+    tags:
+      - Calendar
+    produces:
+      - text/calendar
+    description: >
+      Streams owned and joined events as RFC 5545 VEVENTs. Recurring events are
+      exported once with their RRULE. Clients can poll cheaply with If-None-Match.
+    parameters:
+      - name: from
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Only export events ending after this time
+      - name: to
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Only export events starting before this time
+    responses:
+      200:
+        description: iCalendar document
+      304:
+        description: Calendar has not changed since the ETag given in If-None-Match
+      400:
+        description: Invalid date format
+      401:
+        description: Authentication required
+    """
+    current_user_id = get_jwt_identity()
+
+    try:
+        range_start, range_end = parse_time_range(request.args)
+    except ValueError as ve:
+        error_msg = str(ve)
+        if error_msg.startswith("INVALID_DATE:"):
+            return jsonify({"error": "Invalid date format", "details": error_msg.replace("INVALID_DATE: ", "")}), 400
+        return jsonify({"error": "Invalid value", "details": error_msg}), 400
+
+    etag = calendar_etag(
+        current_user_id, get_calendar_version(current_user_id), 'ics', request.query_string.decode()
+    )
+    if request.if_none_match.contains(etag):
+        return _not_modified(etag)
+
+    query = get_user_events_query(current_user_id, range_start, range_end)
+    response = Response(stream_with_context(iter_calendar_ics(query)), mimetype='text/calendar')
+    response.headers['Content-Disposition'] = 'attachment; filename="calendar.ics"'
+    return _with_etag(response, etag)
+
+
+@calendar_bp.route('/import.ics', methods=['POST'])
+@jwt_required()
+def import_calendar():
+    """
+    Import events from an iCalendar file
+    ---
+    tags:
+      - Calendar
+    consumes:
+      - multipart/form-data
+      - text/calendar
+    description: >
+      Accepts the file as the "file" form field or as a raw text/calendar body.
+      VEVENTs are parsed as the upload is read and inserted in batches; invalid
+      events are skipped and listed in "errors" (at most 100 are reported).
+    parameters:
+      - name: file
+        in: formData
+        type: file
+        required: false
+      - name: batch_size
+        in: query
+        type: integer
+        required: false
+        default: 500
+        description: Number of events inserted per statement (1-5000)
+    responses:
+      200:
+        description: Import summary with imported and failed counts, errors and throughput
+      400:
+        description: Missing file or invalid batch size
+      401:
+        description: Authentication required
+      500:
+        description: Server error
+    """
+    current_user_id = get_jwt_identity()
+
+    try:
+        batch_size = parse_import_batch_size(request.args.get('batch_size'))
+    except ValueError as ve:
+        return jsonify({"error": "Invalid value", "details": str(ve)}), 400
+
+    if 'file' in request.files:
+        stream = request.files['file'].stream
+    elif request.mimetype == 'text/calendar':
+        stream = request.stream
+    else:
+        return jsonify({"error": "Missing file", "details": "Upload a 'file' field or a text/calendar body."}), 400
+
+    try:
+        summary = import_ics(stream, current_user_id, batch_size)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(summary), 200
 
-    events = Event.query.filter(
-        (Event.owner_id == current_user.id) |
-        (Event.participant_links.any(user_id=current_user.id))
-    ).all()
-
-    events_data = []
-    for event in events:
-        events_data.append({
-            'id': event.id,
-            'title': event.title,
-            'description': event.description,
-            'start_time': event.start_time.isoformat(),
-            'end_time': event.end_time.isoformat(),
-            'location': event.location,
-            'color': event.color,
-            'status': event.status,
-            'owner': {
-                'id': str(event.owner.id),
-                'email': event.owner.email
-            },
-            'participants': [{
-                'id': str(p.user.id),
-                'email': p.user.email
-            } for p in event.participant_links.all()]
-        })
-
-    return jsonify(events_data), 200
\ No newline at end of file
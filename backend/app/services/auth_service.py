@@ -1,62 +1,65 @@
 from typing import Optional
 import re
-from werkzeug.security import check_password_hash
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from sqlalchemy import Text, cast, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import INET, UUID
 from sqlalchemy.exc import SQLAlchemyError
-from werkzeug.security import generate_password_hash
 from app.extensions import db
 from app.models import User, UserSession, UserProfile, UserSettings, PasswordResetToken
+from app.middleware.principal_cache import fetch_principal, principal_claims
+from app.middleware.revocation import revoke_token
 from datetime import datetime, timedelta, timezone
 import uuid
-from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
-from flask_mail import Message
-from app.extensions import mail
+from flask_jwt_extended import create_access_token, create_refresh_token
+from app.services.email_service import enqueue_email, email_dispatcher
+from app.services.throttle_service import login_throttle
+from app.services.password_service import PASSWORD_ALGORITHM, hash_password, needs_rehash, verify_password
+from app.services.password_service import HashingPoolSaturatedError
 import secrets
 import hashlib
 
-_password_hasher = PasswordHasher()
-
-
 def _verify_password(user: User, password: str) -> bool:
-    if not user.password_hash:
-        return False
-
-    algorithm = user.password_algorithm or "pbkdf2:sha256"
-
-    if algorithm.startswith("pbkdf2"):
-        return check_password_hash(user.password_hash, password)
-
-    if algorithm == "argon2id":
-        try:
-            _password_hasher.verify(user.password_hash, password)
-            return True
-        except VerifyMismatchError:
-            return False
-        except Exception:
-            return False
+    return verify_password(user.password_algorithm or "pbkdf2:sha256", user.password_hash, password)
 
-    return False
 
+def authenticate_user(email: str, password: str, ip_address: Optional[str] = None,
+                      user_agent: Optional[str] = None) -> Optional[User]:
+    """
+    Check credentials, recording the attempt in the login throttle.
 
-def authenticate_user(email: str, password: str) -> Optional[User]:
+    Raises LoginThrottledError, before any lookup or hash verification, when
+    the email or the IP address has too many recent failures, and
+    HashingPoolSaturatedError when the password cannot be checked right now.
+    """
     normalized_email = (email or "").strip().lower()
     if not normalized_email or not password:
         return None
 
+    login_throttle.check(normalized_email, ip_address)
+
+    def failed(reason, user_id=None):
+        login_throttle.record(normalized_email, ip_address, user_agent, False, user_id, reason)
+        return None
+
     query = User.query
     if hasattr(User, "deleted_at"):
         query = query.filter(User.deleted_at.is_(None))
 
     user = query.filter_by(email=normalized_email).first()
     if not user:
-        return None
+        return failed("unknown_email")
 
     if hasattr(User, "is_active") and not user.is_active:
-        return None
+        return failed("inactive_account", user.id)
 
     if not _verify_password(user, password):
-        return None
+        return failed("invalid_password", user.id)
+
+    if needs_rehash(user.password_algorithm, user.password_hash):
+        try:
+            user.password_hash = hash_password(password)
+            user.password_algorithm = PASSWORD_ALGORITHM
+        except HashingPoolSaturatedError:
+            pass  # the upgrade waits for a later login
 
     try:
         user.last_login_at = db.func.now()
@@ -65,6 +68,8 @@ def authenticate_user(email: str, password: str) -> Optional[User]:
     except Exception:
         db.session.rollback()
 
+    login_throttle.record(normalized_email, ip_address, user_agent, True, user.id)
+
     return user
 
 MINIMAL_PASSWORD_LENGTH = 8
@@ -129,12 +134,14 @@ def create_user(data):
     if existing_user:
         return None, ["User with this email already exists"]
 
+    password_hash = hash_password(data['password'])
+
     try:
         new_user = User()
         email = data.get("email", "").lower().strip()
         new_user.email = email
-        new_user.password_hash = generate_password_hash(data['password'])
-        new_user.password_algorithm = "pbkdf2:sha256"
+        new_user.password_hash = password_hash
+        new_user.password_algorithm = PASSWORD_ALGORITHM
         new_user.is_email_verified = False
         new_user.is_active = True
         new_user.created_at = datetime.now(timezone.utc)
@@ -166,68 +173,110 @@ def create_user(data):
         db.session.rollback()
         return None, [str(e)]
 
+SESSION_LIFETIME = timedelta(days=30)
+
 class SessionNotFoundError(Exception):
     pass
 
 class SessionRevokedError(Exception):
     pass
 
-def refresh_tokens(self, jti_string, user_id, ip_address, user_agent):
 
-    jti_uuid = uuid.UUID(jti_string)
-    old_session = UserSession.query.get(jti_uuid)
+def access_token_claims(user_id):
+    """
+    Roles and account flags embedded in access tokens, read fresh from the database.
+    """
+    principal = fetch_principal(user_id)
+    if principal is None:
+        raise SessionNotFoundError("User not found")
+    return principal_claims(principal)
 
-    if not old_session:
-        raise SessionNotFoundError("Session not found")
 
-    if old_session.revoked_at:
-        raise SessionRevokedError("Session already revoked")
+def _new_refresh_token(user_id):
+    """
+    Mint a refresh token whose JTI is chosen up front, so it needs no decoding.
+    """
+    jti = uuid.uuid4()
+    return jti, create_refresh_token(identity=user_id, additional_claims={'jti': str(jti)})
 
-    new_access_token = create_access_token(identity=user_id)
-    new_refresh_token = create_refresh_token(identity=user_id)
-    new_jti_string = decode_token(new_refresh_token)['jti']
 
-    old_session.revoked_at = datetime.utcnow()
+def refresh_tokens(jti_string, user_id, ip_address, user_agent):
+    """
+    Rotate a refresh token.
 
-    new_session = UserSession(
-        id=uuid.UUID(new_jti_string),
-        user_id=user_id,
-        device_name=old_session.device_name,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        expires_at=datetime.utcnow() + timedelta(days=30),
-        last_seen_at=datetime.utcnow()
+    The old session is revoked and its successor inserted by one statement,
+    the UPDATE only matching a session that is not revoked yet, so of
+    concurrent refreshes with the same token exactly one succeeds.
+    """
+    jti_uuid = uuid.UUID(jti_string)
+    new_jti, new_refresh_token = _new_refresh_token(user_id)
+
+    revoked = (
+        update(UserSession)
+        .where(UserSession.id == jti_uuid, UserSession.user_id == user_id, UserSession.revoked_at.is_(None))
+        .values(revoked_at=db.func.now())
+        .returning(UserSession.device_name)
+        .cte('revoked_session')
     )
+    expires_at = db.session.execute(
+        insert(UserSession)
+        .from_select(
+            ['id', 'user_id', 'device_name', 'ip_address', 'user_agent', 'expires_at', 'last_seen_at'],
+            select(
+                literal(new_jti, UUID(as_uuid=True)),
+                literal(uuid.UUID(str(user_id)), UUID(as_uuid=True)),
+                revoked.c.device_name,
+                cast(ip_address, INET),
+                literal(user_agent, Text()),
+                db.func.now() + SESSION_LIFETIME,
+                db.func.now(),
+            )
+        )
+        .add_cte(revoked)
+        .returning(UserSession.expires_at)
+    ).scalar_one_or_none()
+
+    if expires_at is None:
+        db.session.rollback()
+        if db.session.get(UserSession, jti_uuid) is None:
+            raise SessionNotFoundError("Session not found")
+        raise SessionRevokedError("Session already revoked")
 
-    db.session.add(new_session)
     db.session.commit()
+    # The successor outlives the old token, so its expiry is a safe bound for pruning.
+    revoke_token(jti_uuid, expires_at)
 
     return {
-        'access_token': new_access_token,
+        'access_token': create_access_token(identity=user_id, additional_claims=access_token_claims(user_id)),
         'refresh_token': new_refresh_token
     }
 
 
 def revoke_session(jti_uuid):
-    session = UserSession.query.get(jti_uuid)
-    if session:
-        session.revoked_at = datetime.utcnow()
-        db.session.commit()
+    expires_at = db.session.execute(
+        update(UserSession)
+        .where(UserSession.id == jti_uuid, UserSession.revoked_at.is_(None))
+        .values(revoked_at=db.func.now())
+        .returning(UserSession.expires_at)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    db.session.commit()
 
+    if expires_at is not None:
+        revoke_token(jti_uuid, expires_at)
 
-def generate_session_for_user(user_id, user_agent, remote_addr):
-    access_token = create_access_token(identity=user_id)
-    refresh_token = create_refresh_token(identity=user_id)
 
-    jti_string = decode_token(refresh_token)['jti']
+def generate_session_for_user(user_id, user_agent, remote_addr):
+    access_token = create_access_token(identity=user_id, additional_claims=access_token_claims(user_id))
+    jti, refresh_token = _new_refresh_token(user_id)
 
     session = UserSession(
-        id=uuid.UUID(jti_string),
+        id=jti,
         user_id=user_id,
         device_name=str(user_agent),
         ip_address=remote_addr,
         user_agent=str(user_agent),
-        expires_at=datetime.utcnow() + timedelta(days=30),
+        expires_at=datetime.utcnow() + SESSION_LIFETIME,
         last_seen_at=datetime.utcnow()
     )
 
@@ -285,7 +334,8 @@ def generate_reset_password_token(email, ip_address, user_agent):
 
 def send_reset_password_email(email, reset_link):
     """
-    Send a password reset email to the user.
+    Queue a password reset email to the user; the email dispatcher sends it
+    in the background.
 
     :param email: The email of the user.
     :param reset_link: The reset link containing the token.
@@ -293,8 +343,9 @@ def send_reset_password_email(email, reset_link):
     subject = "Password Reset Request"
     body = f"Click the link below to reset your password:\n\n{reset_link}\n\nIf you did not request a password reset, please ignore this email."
 
-    msg = Message(subject=subject, recipients=[email], body=body)
-    mail.send(msg)
+    enqueue_email(email, subject, body)
+    db.session.commit()
+    email_dispatcher.wake()
 
 class TokenError(Exception):
     """Base exception for token errors"""
@@ -331,11 +382,14 @@ def reset_password(token, password):
     if reset_token.expires_at < datetime.now(timezone.utc):
         raise TokenExpiredException("Token expired")
 
+    password_hash = hash_password(password)
+
     try:
         reset_token.used_at = datetime.now(timezone.utc)
 
         user = reset_token.user
-        user.password_hash = generate_password_hash(password)
+        user.password_hash = password_hash
+        user.password_algorithm = PASSWORD_ALGORITHM
         user.updated_at = datetime.now(timezone.utc)
 
         db.session.commit()
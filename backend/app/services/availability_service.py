@@ -0,0 +1,334 @@
+from app.models.event import Event, EventParticipant, EventException
+from app.models.user import UserProfile
+from app.extensions import db
+from app.services.recurrence_service import occurrence_intervals, overlap_filters, moved_occurrence_filters
+from app.utils.datetime import naive_utc
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone
+from sqlalchemy import DateTime, and_, column, not_, or_, select, union_all, values
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import uuid
+
+MAXIMAL_USERS_PER_QUERY = 50
+MAXIMAL_WINDOW = timedelta(days=366)
+MAXIMAL_SLOT_COUNT = 50
+DEFAULT_SLOT_COUNT = 5
+DEFAULT_WORKING_DAYS = (0, 1, 2, 3, 4)
+SLOT_GRANULARITY = timedelta(minutes=15)
+
+
+def parse_user_ids(raw_ids):
+    """
+    Parse a non-empty list of user UUIDs, dropping duplicates but keeping order.
+    """
+    if not isinstance(raw_ids, list) or not raw_ids:
+        raise ValueError("user_ids must be a non-empty list of user UUIDs.")
+
+    if len(raw_ids) > MAXIMAL_USERS_PER_QUERY:
+        raise ValueError(f"At most {MAXIMAL_USERS_PER_QUERY} users can be queried at once.")
+
+    try:
+        return list(dict.fromkeys(uuid.UUID(str(raw_id)) for raw_id in raw_ids))
+    except ValueError:
+        raise ValueError("user_ids must be a non-empty list of user UUIDs.")
+
+
+def validate_window(range_start, range_end):
+    if range_start is None or range_end is None:
+        raise ValueError("Both 'from' and 'to' are required.")
+
+    if naive_utc(range_end) - naive_utc(range_start) > MAXIMAL_WINDOW:
+        raise ValueError(f"The time window cannot exceed {MAXIMAL_WINDOW.days} days.")
+
+
+def merge_intervals(intervals):
+    """
+    Merge overlapping or touching (start, end) intervals.
+
+    Sorting dominates, so this runs in O(n log n).
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    return [(start, end) for start, end in merged]
+
+
+def _occupied_events(user_ids, range_start, range_end, exclude_event_id=None, windows=None):
+    """
+    Select (user_id, event_id, start_time, end_time, recurrence_rule) of every
+    event or series that may overlap the window and that one of the users owns
+    or takes part in.
+
+    Owned events and participations are combined with UNION ALL so both
+    branches stay index scans; series matched only through an occurrence moved
+    into the window come from branches driven by event_exceptions. Cancelled
+    events do not make anyone busy.
+
+    With windows, a sorted list of disjoint (start, end) pairs inside the
+    range, single events are joined against them so only events overlapping
+    one of the windows are returned; series are still matched on the range.
+    """
+    filters = [or_(Event.status.is_(None), Event.status != 'cancelled')]
+    if exclude_event_id is not None:
+        filters.append(Event.id != exclude_event_id)
+
+    columns = (Event.id.label('event_id'), Event.start_time, Event.end_time, Event.recurrence_rule)
+
+    def branches(*conditions, window=None):
+        owned = select(Event.owner_id.label('user_id'), *columns).where(
+            Event.owner_id.in_(user_ids), *filters, *conditions
+        )
+        joined = (
+            select(EventParticipant.user_id, *columns)
+            .join(Event, Event.id == EventParticipant.event_id)
+            .where(EventParticipant.user_id.in_(user_ids), *filters, *conditions)
+        )
+        if window is not None:
+            overlaps = and_(Event.start_time < window.c.end_time, Event.end_time > window.c.start_time)
+            owned = owned.join(window, overlaps).distinct()
+            joined = joined.join(window, overlaps).distinct()
+        return owned, joined
+
+    def moved_branches(*conditions):
+        moved = (
+            select(EventException.event_id)
+            .where(*moved_occurrence_filters(range_start, range_end))
+            .distinct()
+            .subquery()
+        )
+        owned, joined = branches(*conditions)
+        return owned.join(moved, moved.c.event_id == Event.id), joined.join(moved, moved.c.event_id == Event.id)
+
+    range_filters = overlap_filters(range_start, range_end)
+    moved_only = not_(and_(*range_filters))
+    if windows is None:
+        return union_all(*branches(*range_filters), *moved_branches(moved_only))
+
+    window = values(
+        column('start_time', DateTime), column('end_time', DateTime), name='candidate_windows'
+    ).data(list(windows))
+    return union_all(
+        *branches(Event.recurrence_rule.is_(None), Event.start_time < range_end, Event.end_time > range_start,
+                  window=window),
+        *branches(Event.recurrence_rule.isnot(None), *range_filters),
+        *moved_branches(Event.recurrence_rule.isnot(None), moved_only),
+    )
+
+
+def _occupied_intervals(user_ids, range_start, range_end, exclude_event_id=None, windows=None):
+    """
+    Yield (user_id, event_id, start, end) for every occurrence overlapping the window.
+
+    Recurring series are expanded inside the window only, with their
+    exceptions fetched in one extra query.
+    """
+    rows = db.session.execute(
+        _occupied_events(user_ids, range_start, range_end, exclude_event_id, windows)
+    ).all()
+
+    series_ids = {row.event_id for row in rows if row.recurrence_rule}
+    exceptions = defaultdict(list)
+    if series_ids:
+        for exception in db.session.execute(
+            select(EventException).where(EventException.event_id.in_(series_ids))
+        ).scalars():
+            exceptions[exception.event_id].append(exception)
+
+    for row in rows:
+        for start, end, _, _ in occurrence_intervals(row, range_start, range_end, exceptions.get(row.event_id)):
+            yield row.user_id, row.event_id, start, end
+
+
+def busy_intervals(user_ids, range_start, range_end):
+    """
+    Fetch raw busy intervals overlapping the window for every user.
+    """
+    intervals = defaultdict(list)
+    for user_id, _, start, end in _occupied_intervals(user_ids, range_start, range_end):
+        intervals[user_id].append((start, end))
+
+    return intervals
+
+
+def find_conflicts(user_ids, candidate_intervals, exclude_event_id=None):
+    """
+    List occurrences of the users' events overlapping any candidate interval.
+
+    The merged candidates are sent along with the query, so single events
+    are only fetched when they overlap one of them; occurrences of series
+    spanning the candidates are then matched with a binary search.
+    """
+    candidates = merge_intervals((naive_utc(start), naive_utc(end)) for start, end in candidate_intervals)
+    if not candidates:
+        return []
+
+    candidate_starts = [start for start, _ in candidates]
+    conflicts = []
+    for user_id, event_id, start, end in _occupied_intervals(
+        user_ids, candidates[0][0], candidates[-1][1], exclude_event_id, candidates
+    ):
+        index = bisect_left(candidate_starts, end) - 1
+        if index >= 0 and candidates[index][1] > start:
+            conflicts.append((start, event_id, str(user_id), end))
+
+    return [
+        {
+            'user_id': user_id,
+            'event_id': event_id,
+            'start_time': start.isoformat(),
+            'end_time': end.isoformat(),
+        }
+        for start, event_id, user_id, end in sorted(conflicts)
+    ]
+
+
+def get_free_busy(user_ids, range_start, range_end):
+    """
+    Compute merged busy blocks per user, clipped to the requested window.
+    """
+    range_start, range_end = naive_utc(range_start), naive_utc(range_end)
+    intervals = busy_intervals(user_ids, range_start, range_end)
+
+    return {
+        user_id: [
+            (max(start, range_start), min(end, range_end))
+            for start, end in merge_intervals(intervals.get(user_id, []))
+        ]
+        for user_id in user_ids
+    }
+
+
+def parse_slot_request(data):
+    """
+    Validate slot search options: duration, count and optional working hours.
+
+    Returns (duration, count, working_hours, working_days) where working_hours
+    is a (start, end) pair of times or None when any time of day is allowed.
+    """
+    duration_minutes = data.get('duration_minutes')
+    if not isinstance(duration_minutes, int) or isinstance(duration_minutes, bool) or duration_minutes <= 0:
+        raise ValueError("duration_minutes must be a positive integer.")
+
+    count = data.get('count', DEFAULT_SLOT_COUNT)
+    if not isinstance(count, int) or isinstance(count, bool) or not 1 <= count <= MAXIMAL_SLOT_COUNT:
+        raise ValueError(f"count must be an integer between 1 and {MAXIMAL_SLOT_COUNT}.")
+
+    working_hours = data.get('working_hours')
+    if working_hours is not None:
+        try:
+            working_hours = (
+                time.fromisoformat(working_hours['start']),
+                time.fromisoformat(working_hours['end']),
+            )
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("working_hours must contain 'start' and 'end' times such as '09:00'.")
+
+        if working_hours[0] >= working_hours[1]:
+            raise ValueError("working_hours start must be before end.")
+
+    working_days = data.get('working_days', list(DEFAULT_WORKING_DAYS))
+    if not isinstance(working_days, list) or not all(
+        isinstance(day, int) and 0 <= day <= 6 for day in working_days
+    ):
+        raise ValueError("working_days must be a list of weekday numbers (0 = Monday).")
+
+    return timedelta(minutes=duration_minutes), count, working_hours, frozenset(working_days)
+
+
+def _zone(name):
+    try:
+        return ZoneInfo(name) if name else timezone.utc
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def working_intervals(tz, range_start, range_end, working_hours, working_days):
+    """
+    Working hours of a timezone as naive UTC intervals covering the window.
+    """
+    work_start, work_end = working_hours
+    day = range_start.replace(tzinfo=timezone.utc).astimezone(tz).date() - timedelta(days=1)
+    last_day = range_end.replace(tzinfo=timezone.utc).astimezone(tz).date()
+
+    intervals = []
+    while day <= last_day:
+        if day.weekday() in working_days:
+            start = datetime.combine(day, work_start, tz).astimezone(timezone.utc).replace(tzinfo=None)
+            end = datetime.combine(day, work_end, tz).astimezone(timezone.utc).replace(tzinfo=None)
+            intervals.append((start, end))
+        day += timedelta(days=1)
+
+    return intervals
+
+
+def complement(intervals, range_start, range_end):
+    """
+    Gaps of the window not covered by merged, sorted intervals.
+    """
+    gaps = []
+    cursor = range_start
+    for start, end in intervals:
+        if start > cursor:
+            gaps.append((cursor, min(start, range_end)))
+        cursor = max(cursor, end)
+        if cursor >= range_end:
+            break
+
+    if cursor < range_end:
+        gaps.append((cursor, range_end))
+
+    return [(start, end) for start, end in gaps if start < end]
+
+
+def _align(moment):
+    remainder = (moment - datetime.min) % SLOT_GRANULARITY
+    return moment + (SLOT_GRANULARITY - remainder) if remainder else moment
+
+
+def find_slots(blocked, range_start, range_end, duration, count):
+    """
+    Sweep the merged blocked intervals and return the earliest free slots.
+
+    Slots start on SLOT_GRANULARITY boundaries and do not overlap each other.
+    """
+    slots = []
+    for gap_start, gap_end in complement(merge_intervals(blocked), range_start, range_end):
+        start = _align(gap_start)
+        while start + duration <= gap_end:
+            slots.append((start, start + duration))
+            if len(slots) == count:
+                return slots
+            start += duration
+
+    return slots
+
+
+def find_common_slots(user_ids, range_start, range_end, duration, count,
+                      working_hours=None, working_days=DEFAULT_WORKING_DAYS):
+    """
+    Find the earliest slots in which every user is free.
+
+    Event times are treated as UTC. When working_hours is given, time outside
+    each user's working hours in their profile timezone is blocked as well;
+    users sharing a timezone are only expanded once.
+    """
+    range_start, range_end = naive_utc(range_start), naive_utc(range_end)
+
+    busy = busy_intervals(user_ids, range_start, range_end)
+    blocked = [interval for intervals in busy.values() for interval in intervals]
+
+    if working_hours is not None:
+        profiles = dict(db.session.execute(
+            select(UserProfile.user_id, UserProfile.timezone).where(UserProfile.user_id.in_(user_ids))
+        ).all())
+        for tz_name in {profiles.get(user_id) for user_id in user_ids}:
+            working = working_intervals(_zone(tz_name), range_start, range_end, working_hours, working_days)
+            blocked.extend(complement(working, range_start, range_end))
+
+    return find_slots(blocked, range_start, range_end, duration, count)
@@ -1,39 +1,303 @@
-from app.models.event import Event, EventParticipant
+from app.models.event import Event, EventParticipant, EventException, CalendarVersion, EventTombstone
 from app.models.user import User
 from app.extensions import db
-from datetime import datetime
+from app.services.availability_service import find_conflicts
+from app.services.recurrence_service import (
+    normalize_rrule, parse_rrule, series_end, occurrence_starts, occurrence_intervals,
+    overlap_filters, moved_occurrence_filters, is_occurrence, shift_rrule)
+from app.utils.datetime import naive_utc
+from flask import current_app
+import base64
+import binascii
+import hashlib
+import heapq
+import json
+import re
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, select, tuple_, union, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import joinedload, load_only, selectinload
 
-def create_event(data, owner_id):
+def event_load_options():
     """
-    Create a new event for the authenticated user.
+    Loader options fetching an event's owner and participants up front.
+    """
+    return (
+        joinedload(Event.owner),
+        selectinload(Event.participant_links).joinedload(EventParticipant.user),
+        selectinload(Event.exceptions),
+    )
+
+
+def event_etag_options():
+    """
+    Loader options fetching only the columns an event's ETag is built from.
+    """
+    return (load_only(Event.id, Event.owner_id, Event.updated_at),)
+
+
+def load_event(event_id):
+    """
+    Load an event with its owner and participants, refreshing a partially loaded instance.
+    """
+    return db.session.execute(
+        select(Event)
+        .where(Event.id == event_id)
+        .options(*event_load_options())
+        .execution_options(populate_existing=True)
+    ).unique().scalar_one()
+
+
+def event_etag(event):
+    return calendar_etag(
+        event.owner_id, get_calendar_version(event.owner_id), event.id, event.updated_at.isoformat()
+    )
+
+
+def bump_calendar_versions(user_ids):
+    """
+    Increment the calendar version of every given user in one statement.
+
+    Must be called inside the transaction that changes their events.
+    """
+    unique_ids = sorted({str(user_id) for user_id in user_ids})
+    if not unique_ids:
+        return
+
+    stmt = pg_insert(CalendarVersion).values([{'user_id': user_id, 'version': 1} for user_id in unique_ids])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CalendarVersion.user_id],
+        set_={'version': CalendarVersion.version + 1},
+    )
+    db.session.execute(stmt)
+
+
+def get_calendar_version(user_id):
+    version = db.session.execute(
+        select(CalendarVersion.version).where(CalendarVersion.user_id == user_id)
+    ).scalar()
+    return version or 0
+
+
+def calendar_etag(user_id, version, *parts):
+    """
+    Build an entity tag for a calendar response from the version and request parts.
+    """
+    key = '|'.join(str(part) for part in (user_id, version, *parts))
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def record_event_tombstones(event_id, user_ids):
+    """
+    Record that the event disappeared from the calendars of the given users.
+    """
+    rows = [{'event_id': event_id, 'user_id': user_id} for user_id in {str(u) for u in user_ids}]
+    if rows:
+        db.session.execute(insert(EventTombstone), rows)
+
+
+class EventConflictError(Exception):
+    def __init__(self, conflicts):
+        super().__init__("Event overlaps existing events")
+        self.conflicts = conflicts
+
+
+def parse_participant_ids(raw_ids):
+    try:
+        return {uuid.UUID(str(u_id)) for u_id in raw_ids}
+    except (TypeError, ValueError):
+        raise ValueError("participant_ids must be a list of user UUIDs.")
+
+
+def validate_participant_ids(participant_ids):
+    existing_users = db.session.query(User.id).filter(User.id.in_(participant_ids)).all()
+    existing_user_ids = {user.id for user in existing_users}
+    invalid_ids = participant_ids - existing_user_ids
+
+    if invalid_ids:
+        raise ValueError(f"NOT_FOUND Invalid user IDs: {', '.join(map(str, invalid_ids))}")
+
+
+CONFLICT_CHECK_HORIZON = timedelta(days=366)
+
+
+def check_conflicts(user_ids, start_time, end_time, recurrence_rule=None, exclude_event_id=None):
+    """
+    Raise EventConflictError when any of the users is busy during the event.
+
+    For recurring events every occurrence within CONFLICT_CHECK_HORIZON of the
+    first one is checked.
+    """
+    intervals = [(start_time, end_time)]
+    if recurrence_rule:
+        duration = naive_utc(end_time) - naive_utc(start_time)
+        intervals = [
+            (moment, moment + duration)
+            for moment in occurrence_starts(
+                parse_rrule(recurrence_rule), start_time, duration,
+                range_end=naive_utc(start_time) + CONFLICT_CHECK_HORIZON
+            )
+        ]
+
+    conflicts = find_conflicts(list(user_ids), intervals, exclude_event_id)
+    if conflicts:
+        raise EventConflictError(conflicts)
+
+
+def _recurrence_end(recurrence_rule, start_time, end_time):
+    if not recurrence_rule:
+        return None
+    return series_end(parse_rrule(recurrence_rule), start_time, end_time)
+
+
+def event_values(data, owner_id):
+    """
+    Validate an event payload and map it onto Event column values.
+
+    Returns the column values and the set of participant ids.
     """
     try:
         start_time = datetime.fromisoformat(data['start_time'])
         end_time = datetime.fromisoformat(data['end_time'])
-    except ValueError:
+    except (TypeError, ValueError):
         raise ValueError("start_time or end_time format is invalid. Use ISO format.")
 
     if start_time >= end_time:
         raise ValueError("start_time must be before end_time.")
 
-    new_event = Event(
-        title=data['title'],
-        description=data.get('description'),
-        location=data.get('location'),
-        color=data.get('color'),
-        status=data.get('status') or 'planned',
-        start_time=start_time,
-        end_time=end_time,
-        owner_id=owner_id,
-    )
+    recurrence_rule = normalize_rrule(data.get('recurrence_rule'))
+    participant_ids = parse_participant_ids(data.get('participant_ids') or [])
+
+    values = {
+        'title': data['title'],
+        'description': data.get('description'),
+        'location': data.get('location'),
+        'color': data.get('color'),
+        'status': data.get('status') or 'planned',
+        'start_time': start_time,
+        'end_time': end_time,
+        'owner_id': owner_id,
+        'recurrence_rule': recurrence_rule,
+        'recurrence_end': _recurrence_end(recurrence_rule, start_time, end_time),
+    }
 
+    return values, participant_ids
+
+
+def create_event(data, owner_id):
+    """
+    Create a new event for the authenticated user.
+
+    With `check_conflicts` set, the event is rejected when it overlaps events
+    of the owner or any of the participants.
+    """
+    values, participant_ids = event_values(data, owner_id)
+
+    if participant_ids:
+        validate_participant_ids(participant_ids)
+
+    if data.get('check_conflicts'):
+        check_conflicts(
+            {owner_id} | participant_ids, values['start_time'], values['end_time'], values['recurrence_rule']
+        )
+
+    new_event = Event(**values)
 
     db.session.add(new_event)
+    db.session.flush()
+
+    for u_id in participant_ids:
+        db.session.add(EventParticipant(event_id=new_event.id, user_id=u_id))
+
+    bump_calendar_versions({owner_id} | participant_ids)
     db.session.commit()
 
     return new_event
 
 
+MAXIMAL_BULK_SIZE = 1000
+REQUIRED_EVENT_FIELDS = ('title', 'start_time', 'end_time')
+
+
+def insert_events(rows):
+    """
+    Insert (values, participant_ids) pairs with one statement per table.
+
+    Events go through a multi-row INSERT ... RETURNING and participants through
+    a single executemany insert. Returns the new ids in the order of rows.
+    """
+    event_ids = db.session.execute(
+        insert(Event).returning(Event.id, sort_by_parameter_order=True),
+        [values for values, _ in rows]
+    ).scalars().all()
+
+    participant_rows = [
+        {'event_id': event_id, 'user_id': user_id}
+        for event_id, (_, participant_ids) in zip(event_ids, rows)
+        for user_id in participant_ids
+    ]
+    if participant_rows:
+        db.session.execute(insert(EventParticipant), participant_rows)
+
+    return event_ids
+
+
+def bulk_create_events(items, owner_id):
+    """
+    Validate a batch of event payloads and insert the valid ones in one transaction.
+
+    Events are written with a multi-row INSERT ... RETURNING and their
+    participants with a single executemany insert. Invalid items are skipped
+    and reported by their index in the batch.
+
+    Returns (created, errors): lists of {'index', 'id'} and {'index', 'error'}.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError("events must be a non-empty list.")
+    if len(items) > MAXIMAL_BULK_SIZE:
+        raise ValueError(f"At most {MAXIMAL_BULK_SIZE} events can be created at once.")
+
+    errors = []
+    valid = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not all(key in item for key in REQUIRED_EVENT_FIELDS):
+            errors.append({'index': index, 'error': "Missing required fields"})
+            continue
+        try:
+            values, participant_ids = event_values(item, owner_id)
+        except ValueError as ve:
+            errors.append({'index': index, 'error': str(ve)})
+            continue
+        valid.append((index, values, participant_ids))
+
+    requested_ids = set().union(*(participant_ids for _, _, participant_ids in valid))
+    if requested_ids:
+        existing_ids = set(db.session.execute(select(User.id).where(User.id.in_(requested_ids))).scalars())
+        accepted = []
+        for index, values, participant_ids in valid:
+            invalid_ids = participant_ids - existing_ids
+            if invalid_ids:
+                errors.append({
+                    'index': index,
+                    'error': f"NOT_FOUND Invalid user IDs: {', '.join(map(str, invalid_ids))}"
+                })
+            else:
+                accepted.append((index, values, participant_ids))
+        valid = accepted
+
+    if not valid:
+        return [], sorted(errors, key=lambda error: error['index'])
+
+    event_ids = insert_events([(values, participant_ids) for _, values, participant_ids in valid])
+
+    bump_calendar_versions({owner_id}.union(*(participant_ids for _, _, participant_ids in valid)))
+    db.session.commit()
+
+    created = [{'index': index, 'id': event_id} for event_id, (index, _, _) in zip(event_ids, valid)]
+    return created, sorted(errors, key=lambda error: error['index'])
+
+
 def set_proposed_time(event, data):
     proposed_start = event.start_time
     proposed_end = event.end_time
@@ -68,11 +332,59 @@ def set_proposed_time(event, data):
     return proposed_start, proposed_end
 
 
+def _rekey_exceptions(event, shift):
+    """
+    Carry occurrence exceptions over to a moved or re-ruled series.
+
+    Exceptions follow the series by shift; those that no longer match an
+    occurrence of the new schedule are deleted. Rows are replaced rather than
+    updated so the (event_id, original_start) index never sees a collision.
+    """
+    kept = []
+    for exception in event.exceptions:
+        original_start = naive_utc(exception.original_start) + shift
+        if event.recurrence_rule and is_occurrence(event, original_start):
+            kept.append(EventException(
+                original_start=original_start,
+                is_cancelled=exception.is_cancelled,
+                start_time=exception.start_time + shift if exception.start_time else None,
+                end_time=exception.end_time + shift if exception.end_time else None,
+                title=exception.title,
+                description=exception.description,
+                location=exception.location,
+                status=exception.status,
+            ))
+
+    event.exceptions.clear()
+    db.session.flush()
+    event.exceptions.extend(kept)
+
+
 def patch_event(event, data):
     allowed_fields = ['title', 'location', 'description', 'color', 'status', 'start_time', 'end_time']
     updated_any = False
+    previous_start = event.start_time
 
     proposed_start, proposed_end = set_proposed_time(event, data)
+    current_ids = {p.user_id for p in event.participant_links}
+    affected_user_ids = {event.owner_id} | current_ids
+
+    new_ids = current_ids
+    if 'participant_ids' in data:
+        new_ids = parse_participant_ids(data['participant_ids'])
+
+    proposed_rule = event.recurrence_rule
+    if 'recurrence_rule' in data:
+        proposed_rule = normalize_rrule(data['recurrence_rule'])
+
+    schedule_changed = (
+        (proposed_start, proposed_end, proposed_rule) != (event.start_time, event.end_time, event.recurrence_rule)
+    )
+
+    if data.get('check_conflicts') and (schedule_changed or new_ids != current_ids):
+        check_conflicts(
+            {event.owner_id} | new_ids, proposed_start, proposed_end, proposed_rule, exclude_event_id=event.id
+        )
 
     for field in allowed_fields:
         if field in data:
@@ -87,29 +399,690 @@ def patch_event(event, data):
                 setattr(event, field, value)
                 updated_any = True
 
-    if 'participant_ids' in data:
-        new_ids = set(data['participant_ids'])
-
-        current_ids = {p.user_id for p in event.participant_links.all()}
+    if schedule_changed:
+        event.recurrence_rule = proposed_rule
+        event.recurrence_end = _recurrence_end(proposed_rule, proposed_start, proposed_end)
+        if event.exceptions:
+            _rekey_exceptions(event, naive_utc(proposed_start) - naive_utc(previous_start))
+        updated_any = True
 
+    if 'participant_ids' in data:
         if new_ids != current_ids:
-            existing_users = db.session.query(User.id).filter(User.id.in_(new_ids)).all()
-            existing_user_ids = {user.id for user in existing_users}
-            invalid_ids = new_ids - existing_user_ids
+            added_ids = new_ids - current_ids
+            removed_ids = current_ids - new_ids
 
-            if invalid_ids:
-                raise ValueError(f"NOT_FOUND Invalid user IDs: {', '.join(map(str, invalid_ids))}")
+            if added_ids:
+                validate_participant_ids(added_ids)
+                db.session.execute(
+                    pg_insert(EventParticipant).on_conflict_do_nothing(),
+                    [{'event_id': event.id, 'user_id': u_id} for u_id in added_ids]
+                )
 
-            for link in event.participant_links.all():
-                db.session.delete(link)
-
-            for u_id in new_ids:
-                new_link = EventParticipant(event_id=event.id, user_id=u_id)
-                db.session.add(new_link)
+            if removed_ids:
+                db.session.execute(
+                    delete(EventParticipant)
+                    .where(EventParticipant.event_id == event.id, EventParticipant.user_id.in_(removed_ids))
+                    .execution_options(synchronize_session=False)
+                )
+            record_event_tombstones(event.id, removed_ids)
+            event.updated_at = db.func.now()
+            affected_user_ids |= new_ids
             updated_any = True
 
     if updated_any:
+        bump_calendar_versions(affected_user_ids)
         db.session.commit()
 
 
     return event, updated_any
+
+
+BULK_PATCH_FIELDS = ('title', 'location', 'description', 'color', 'status')
+
+
+def parse_event_ids(raw_ids):
+    if not isinstance(raw_ids, list) or not raw_ids:
+        raise ValueError("ids must be a non-empty list of event ids.")
+    if len(raw_ids) > MAXIMAL_BULK_SIZE:
+        raise ValueError(f"At most {MAXIMAL_BULK_SIZE} events can be changed at once.")
+    if not all(isinstance(event_id, int) and not isinstance(event_id, bool) for event_id in raw_ids):
+        raise ValueError("ids must be a non-empty list of event ids.")
+    return sorted(set(raw_ids))
+
+
+def check_bulk_ownership(event_ids, owner_id):
+    """
+    Verify with one query that every event exists and belongs to the owner.
+    """
+    owners = dict(db.session.execute(
+        select(Event.id, Event.owner_id).where(Event.id.in_(event_ids))
+    ).all())
+
+    missing = [event_id for event_id in event_ids if event_id not in owners]
+    if missing:
+        raise ValueError(f"NOT_FOUND: Events not found: {', '.join(map(str, missing))}")
+
+    foreign = [event_id for event_id in event_ids if str(owners[event_id]) != str(owner_id)]
+    if foreign:
+        raise ValueError(f"FORBIDDEN: Only the owner can change events: {', '.join(map(str, foreign))}")
+
+
+def _participants_by_event(event_ids):
+    rows = db.session.execute(
+        select(EventParticipant.event_id, EventParticipant.user_id).where(EventParticipant.event_id.in_(event_ids))
+    ).all()
+    participants = {}
+    for event_id, user_id in rows:
+        participants.setdefault(event_id, set()).add(user_id)
+    return participants
+
+
+def parse_bulk_patch(data):
+    """
+    Extract the column values and the time shift applied to every event of a bulk patch.
+    """
+    values = {field: data[field] for field in BULK_PATCH_FIELDS if field in data}
+    if 'title' in values and not values['title']:
+        raise ValueError("title cannot be empty.")
+    for field, value in values.items():
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f"{field} must be a string.")
+        max_length = Event.__table__.c[field].type.length
+        if max_length is not None and len(value) > max_length:
+            raise ValueError(f"{field} cannot exceed {max_length} characters.")
+
+    shift = None
+    if data.get('shift_minutes') is not None:
+        minutes = data['shift_minutes']
+        if not isinstance(minutes, int) or isinstance(minutes, bool):
+            raise ValueError("shift_minutes must be an integer.")
+        shift = timedelta(minutes=minutes) if minutes else None
+
+    if not values and shift is None:
+        raise ValueError("Nothing to update.")
+
+    return values, shift
+
+
+def bulk_patch_events(data, owner_id):
+    """
+    Apply the same field changes and time shift to many events of one owner.
+
+    The events are changed with a single UPDATE; when the events move, their
+    occurrence exceptions and any UNTIL of their rules are shifted along with
+    them and the end of every finite series is recomputed. Conflicts are not
+    checked.
+    """
+    event_ids = parse_event_ids(data.get('ids'))
+    values, shift = parse_bulk_patch(data)
+    check_bulk_ownership(event_ids, owner_id)
+
+    if shift is not None:
+        values['start_time'] = Event.start_time + shift
+        values['end_time'] = Event.end_time + shift
+
+    series = db.session.execute(
+        update(Event)
+        .where(Event.id.in_(event_ids))
+        .values(**values, updated_at=db.func.now())
+        .returning(Event.id, Event.recurrence_rule, Event.start_time, Event.end_time)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    if shift is not None:
+        db.session.execute(
+            update(EventException)
+            .where(EventException.event_id.in_(event_ids))
+            .values(
+                original_start=EventException.original_start + shift,
+                start_time=EventException.start_time + shift,
+                end_time=EventException.end_time + shift,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        series_ends = []
+        for event_id, rule, start_time, end_time in series:
+            if not rule:
+                continue
+            rule = shift_rrule(rule, shift)
+            series_ends.append({
+                'id': event_id,
+                'recurrence_rule': rule,
+                'recurrence_end': _recurrence_end(rule, start_time, end_time),
+            })
+        if series_ends:
+            db.session.execute(update(Event), series_ends)
+
+    participants = _participants_by_event(event_ids)
+    bump_calendar_versions({owner_id}.union(*participants.values()))
+    db.session.commit()
+
+    return event_ids
+
+
+def bulk_delete_events(data, owner_id):
+    """
+    Delete many events of one owner with a single DELETE.
+
+    Participants and exceptions go with them through the ON DELETE CASCADE
+    foreign keys; every affected calendar receives a tombstone.
+    """
+    event_ids = parse_event_ids(data.get('ids'))
+    check_bulk_ownership(event_ids, owner_id)
+
+    participants = _participants_by_event(event_ids)
+    tombstones = [
+        {'event_id': event_id, 'user_id': user_id}
+        for event_id in event_ids
+        for user_id in {str(u) for u in participants.get(event_id, set()) | {owner_id}}
+    ]
+    db.session.execute(insert(EventTombstone), tombstones)
+    bump_calendar_versions({owner_id}.union(*participants.values()))
+
+    db.session.execute(
+        delete(Event).where(Event.id.in_(event_ids)).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    return event_ids
+
+
+def parse_time_range(args):
+    """
+    Parse the optional `from`/`to` query parameters into a time window.
+    """
+    bounds = {}
+    for key in ('from', 'to'):
+        value = args.get(key)
+        if not value:
+            bounds[key] = None
+            continue
+        try:
+            bounds[key] = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"INVALID_DATE: Invalid format for '{key}'")
+
+    range_start, range_end = bounds['from'], bounds['to']
+
+    if range_start and range_end:
+        if naive_utc(range_end) <= naive_utc(range_start):
+            raise ValueError("'from' must be before 'to'.")
+
+    return range_start, range_end
+
+
+def visible_event_ids(user_id, range_start=None, range_end=None):
+    """
+    Select ids of events owned or joined by the user that overlap the window.
+
+    Recurring series match when any of their occurrences may fall inside it,
+    including occurrences moved outside the bounds of their series.
+
+    Owned and joined events are selected separately and combined with UNION so
+    each branch can use its own index instead of a single OR predicate; moved
+    occurrences get their own branches driven from event_exceptions.
+    """
+    range_filters = overlap_filters(range_start, range_end)
+
+    owned = select(Event.id).where(Event.owner_id == user_id, *range_filters)
+    joined = (
+        select(EventParticipant.event_id)
+        .join(Event, Event.id == EventParticipant.event_id)
+        .where(EventParticipant.user_id == user_id, *range_filters)
+    )
+    if not range_filters:
+        return union(owned, joined)
+
+    moved_filters = moved_occurrence_filters(range_start, range_end)
+    moved_owned = (
+        select(EventException.event_id)
+        .join(Event, Event.id == EventException.event_id)
+        .where(Event.owner_id == user_id, *moved_filters)
+    )
+    moved_joined = (
+        select(EventException.event_id)
+        .join(EventParticipant, EventParticipant.event_id == EventException.event_id)
+        .where(EventParticipant.user_id == user_id, *moved_filters)
+    )
+
+    return union(owned, joined, moved_owned, moved_joined)
+
+
+def earliest_start(event, range_start, range_end):
+    """
+    Earliest start among an event and its occurrences moved into the window.
+
+    No occurrence of the event inside the window starts before it.
+    """
+    range_start, range_end = naive_utc(range_start), naive_utc(range_end)
+    moved_starts = [
+        naive_utc(exception.start_time) for exception in event.exceptions
+        if exception.start_time is not None and not exception.is_cancelled
+        and naive_utc(exception.start_time) < range_end and naive_utc(exception.end_time) > range_start
+    ]
+    return min([naive_utc(event.start_time), *moved_starts])
+
+
+def get_user_events_query(user_id, range_start=None, range_end=None):
+    """
+    Query events visible to the user, optionally limited to a time window.
+
+    Events are ordered by (start_time, id); within a bounded window, where
+    series are expanded, by earliest_start instead, so that serialize_events
+    can emit occurrences in time order as rows arrive. The moved starts come
+    from one grouped scan of the exceptions moved into the window.
+    """
+    query = (
+        Event.query
+        .options(*event_load_options())
+        .filter(Event.id.in_(visible_event_ids(user_id, range_start, range_end)))
+    )
+    if range_start is None or range_end is None:
+        return query.order_by(Event.start_time, Event.id)
+
+    moved = (
+        select(EventException.event_id, func.min(EventException.start_time).label('start_time'))
+        .where(*moved_occurrence_filters(range_start, range_end))
+        .group_by(EventException.event_id)
+        .subquery()
+    )
+    return (
+        query
+        .outerjoin(moved, moved.c.event_id == Event.id)
+        .order_by(func.least(Event.start_time, moved.c.start_time), Event.id)
+    )
+
+
+DEFAULT_SEARCH_LIMIT = 20
+MAXIMAL_SEARCH_LIMIT = 100
+MAXIMAL_SEARCH_TERMS = 10
+
+
+def build_search_query(text):
+    """
+    Turn free text into a prefix-matching tsquery string, e.g. 'team meet' -> 'team':* & 'meet':*.
+    """
+    terms = re.findall(r'\w+', (text or '').lower())[:MAXIMAL_SEARCH_TERMS]
+    if not terms:
+        raise ValueError("INVALID_QUERY: Search text must contain at least one word")
+    return ' & '.join(f"'{term}':*" for term in terms)
+
+
+def parse_search_limit(value):
+    if value is None or value == '':
+        return DEFAULT_SEARCH_LIMIT
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("'limit' must be an integer.")
+    if not 1 <= limit <= MAXIMAL_SEARCH_LIMIT:
+        raise ValueError(f"'limit' must be between 1 and {MAXIMAL_SEARCH_LIMIT}.")
+    return limit
+
+
+def search_events(user_id, text, range_start=None, range_end=None, limit=DEFAULT_SEARCH_LIMIT):
+    """
+    Rank the user's events matching the text by title, location and description.
+
+    Matching goes through the GIN-indexed search_vector column; title matches
+    weigh more than location matches, which weigh more than description ones.
+    Recurring series are returned once, as stored.
+
+    Returns a list of (event, rank) pairs.
+    """
+    tsquery = db.func.to_tsquery('simple', build_search_query(text))
+    rank = db.func.ts_rank(Event.search_vector, tsquery).label('rank')
+
+    return (
+        db.session.query(Event, rank)
+        .options(*event_load_options())
+        .filter(
+            Event.search_vector.op('@@')(tsquery),
+            Event.id.in_(visible_event_ids(user_id, range_start, range_end)),
+        )
+        .order_by(rank.desc(), Event.start_time, Event.id)
+        .limit(limit)
+        .all()
+    )
+
+
+DEFAULT_PAGE_SIZE = 100
+MAXIMAL_PAGE_SIZE = 500
+
+
+def _encode_key(start_time, event_id, recurrence_id=None):
+    payload = {'start_time': start_time.isoformat(), 'id': event_id}
+    if recurrence_id is not None:
+        payload['recurrence_id'] = recurrence_id.isoformat()
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def encode_cursor(event):
+    """
+    Build an opaque cursor pointing just after the given event.
+    """
+    return _encode_key(event.start_time, event.id)
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor into a (start_time, id, recurrence_id) key.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        recurrence_id = payload.get('recurrence_id')
+        return (
+            datetime.fromisoformat(payload['start_time']),
+            int(payload['id']),
+            datetime.fromisoformat(recurrence_id) if recurrence_id else None,
+        )
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, AttributeError, KeyError, TypeError,
+            ValueError):
+        raise ValueError("INVALID_CURSOR: Cursor is malformed")
+
+
+def parse_pagination(args):
+    """
+    Parse the optional `limit`/`cursor` query parameters.
+
+    Returns (None, None) when pagination was not requested.
+    """
+    limit = args.get('limit')
+    cursor = args.get('cursor')
+
+    if limit is None and cursor is None:
+        return None, None
+
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("'limit' must be an integer.")
+
+    if not 1 <= limit <= MAXIMAL_PAGE_SIZE:
+        raise ValueError(f"'limit' must be between 1 and {MAXIMAL_PAGE_SIZE}.")
+
+    return limit, decode_cursor(cursor) if cursor else None
+
+
+def paginate_events(query, limit, after=None):
+    """
+    Fetch one keyset page of an event query ordered by (start_time, id).
+
+    Returns the events of the page and the cursor of the next one, or None
+    when this is the last page.
+    """
+    if after is not None:
+        query = query.filter(tuple_(Event.start_time, Event.id) > after[:2])
+
+    events = query.limit(limit + 1).all()
+
+    if len(events) <= limit:
+        return events, None
+
+    events = events[:limit]
+    return events, encode_cursor(events[-1])
+
+
+def _occurrence_key(occurrence):
+    recurrence_id = occurrence.get('recurrence_id')
+    return (
+        naive_utc(datetime.fromisoformat(occurrence['start_time'])),
+        occurrence['id'],
+        datetime.fromisoformat(recurrence_id) if recurrence_id else None,
+    )
+
+
+def paginate_occurrences(user_id, range_start, range_end, limit, after=None):
+    """
+    Fetch one keyset page of the expanded occurrences of a bounded window.
+
+    Pages are ordered by (start_time, id, recurrence_id) of the occurrences.
+    After a cursor, events that cannot start an occurrence at or after its
+    time are left out of the query.
+
+    Returns the occurrence dictionaries of the page and the next cursor, or None.
+    """
+    query_start = range_start
+    if after is not None:
+        query_start = max(naive_utc(range_start), after[0])
+    query = get_user_events_query(user_id, query_start, range_end)
+
+    page = []
+    for occurrence in serialize_events(query.yield_per(STREAM_BATCH_SIZE), query_start, range_end):
+        if after is not None and _occurrence_key(occurrence) <= after:
+            continue
+        page.append(occurrence)
+        if len(page) > limit:
+            break
+
+    if len(page) <= limit:
+        return page, None
+
+    page = page[:limit]
+    return page, _encode_key(*_occurrence_key(page[-1]))
+
+
+STREAM_BATCH_SIZE = 500
+
+
+def serialize_events(events, range_start=None, range_end=None):
+    """
+    Yield event dictionaries, expanding recurring series inside a bounded window.
+
+    Occurrences share the id of their series and carry a `recurrence_id` with
+    their original start; exceptions override time and text fields. Without
+    both bounds series are returned as stored, with their recurrence_rule.
+
+    When expanding, events must arrive ordered by earliest_start; occurrences
+    are held in a heap until no later event can precede them, so the output is
+    ordered by (start_time, id, recurrence_id).
+    """
+    if range_start is None or range_end is None:
+        for event in events:
+            yield event.to_dict()
+        return
+
+    pending = []
+    sequence = 0
+    for event in events:
+        bound = earliest_start(event, range_start, range_end)
+        while pending and pending[0][0][0] < bound:
+            yield heapq.heappop(pending)[2]
+
+        if not event.recurrence_rule:
+            heapq.heappush(pending, ((naive_utc(event.start_time), event.id, None), sequence, event.to_dict()))
+            sequence += 1
+            continue
+
+        series = event.to_dict()
+        for start, end, original_start, exception in occurrence_intervals(
+            event, range_start, range_end, event.exceptions
+        ):
+            occurrence = dict(
+                series,
+                start_time=start.isoformat(),
+                end_time=end.isoformat(),
+                recurrence_id=original_start.isoformat(),
+            )
+            if exception is not None:
+                for field in ('title', 'description', 'location', 'status'):
+                    value = getattr(exception, field)
+                    if value is not None:
+                        occurrence[field] = value
+            heapq.heappush(pending, ((start, event.id, original_start), sequence, occurrence))
+            sequence += 1
+
+    while pending:
+        yield heapq.heappop(pending)[2]
+
+
+def iter_events_json(query, range_start=None, range_end=None, batch_size=STREAM_BATCH_SIZE):
+    """
+    Serialize an event query as a JSON array, one event at a time.
+
+    Rows are fetched through a server-side cursor in batches of batch_size,
+    so neither the result set nor the JSON document is held in memory.
+    """
+    yield '['
+    separator = ''
+    for event in serialize_events(query.yield_per(batch_size), range_start, range_end):
+        yield separator + current_app.json.dumps(event)
+        separator = ','
+    yield ']'
+
+
+SYNC_SAFETY_WINDOW = timedelta(seconds=5)
+DEFAULT_SYNC_TOKEN_RETENTION_DAYS = 30
+
+
+def sync_token_retention():
+    """
+    How long tombstones are kept, and therefore how old a sync token may be.
+    """
+    return timedelta(days=current_app.config.get('SYNC_TOKEN_RETENTION_DAYS', DEFAULT_SYNC_TOKEN_RETENTION_DAYS))
+
+
+def encode_sync_token(timestamp):
+    return base64.urlsafe_b64encode(timestamp.isoformat().encode()).decode()
+
+
+def decode_sync_token(token):
+    try:
+        since = datetime.fromisoformat(base64.urlsafe_b64decode(token.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("INVALID_TOKEN: Sync token is malformed")
+    if since.tzinfo is None:
+        raise ValueError("INVALID_TOKEN: Sync token has no time zone")
+    return since
+
+
+def prune_event_tombstones():
+    """
+    Delete tombstones older than the sync token retention; returns how many were removed.
+    """
+    cutoff = db.session.execute(select(db.func.now())).scalar() - sync_token_retention()
+    deleted = db.session.execute(
+        delete(EventTombstone)
+        .where(EventTombstone.deleted_at < cutoff)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+def get_event_changes(user_id, since=None):
+    """
+    Collect events created, updated or removed from the user's calendar after `since`.
+
+    Without `since` every visible event is returned. The next token lags the
+    database clock by SYNC_SAFETY_WINDOW so rows committed by transactions that
+    started before this call are not skipped; clients apply changes by id, so
+    re-sent events are harmless. A token older than the tombstone retention
+    raises TOKEN_EXPIRED, since deletions before it may already be pruned.
+    """
+    now = db.session.execute(select(db.func.now())).scalar()
+    if since is not None and since < now - sync_token_retention():
+        raise ValueError("TOKEN_EXPIRED: Sync token is too old, fetch the full calendar again")
+
+    query = (
+        Event.query
+        .options(*event_load_options())
+        .filter(Event.id.in_(visible_event_ids(user_id)))
+    )
+    if since is not None:
+        query = query.filter(Event.updated_at > since)
+    updated = query.order_by(Event.updated_at, Event.id).all()
+
+    deleted = []
+    if since is not None:
+        updated_ids = {event.id for event in updated}
+        deleted_ids = db.session.execute(
+            select(EventTombstone.event_id)
+            .where(EventTombstone.user_id == user_id, EventTombstone.deleted_at > since)
+            .distinct()
+        ).scalars()
+        deleted = sorted(event_id for event_id in deleted_ids if event_id not in updated_ids)
+
+    next_since = now - SYNC_SAFETY_WINDOW
+    if since is not None and since > next_since:
+        next_since = since
+
+    return updated, deleted, encode_sync_token(next_since)
+
+
+def _parse_occurrence_time(value, field):
+    if not isinstance(value, str):
+        raise ValueError(f"INVALID_DATE: Invalid format for {field}")
+    try:
+        return naive_utc(datetime.fromisoformat(value))
+    except ValueError:
+        raise ValueError(f"INVALID_DATE: Invalid format for {field}")
+
+
+def clear_occurrence_exception(event, data):
+    """
+    Remove the override or cancellation of a single occurrence, restoring it as generated.
+    """
+    original_start = _parse_occurrence_time(data.get('original_start'), 'original_start')
+    exception = next(
+        (existing for existing in event.exceptions if naive_utc(existing.original_start) == original_start),
+        None
+    )
+    if exception is None:
+        raise ValueError(f"NOT_FOUND: No exception for the occurrence at {original_start.isoformat()}")
+
+    event.exceptions.remove(exception)
+    event.updated_at = db.func.now()
+    bump_calendar_versions([event.owner_id, *(link.user_id for link in event.participant_links)])
+    db.session.commit()
+
+
+def set_occurrence_exception(event, data, cancelled=False):
+    """
+    Override or cancel a single occurrence of a recurring event.
+
+    The occurrence is identified by its original start; overrides may move it
+    (start_time/end_time) or change its title, description, location or status.
+    """
+    if not event.recurrence_rule:
+        raise ValueError("Event is not recurring.")
+
+    original_start = _parse_occurrence_time(data.get('original_start'), 'original_start')
+    if not is_occurrence(event, original_start):
+        raise ValueError(f"NOT_FOUND: No occurrence starts at {original_start.isoformat()}")
+
+    exception = next(
+        (existing for existing in event.exceptions if naive_utc(existing.original_start) == original_start),
+        None
+    )
+    if exception is None:
+        exception = EventException(original_start=original_start)
+        event.exceptions.append(exception)
+
+    exception.is_cancelled = cancelled
+    if not cancelled:
+        for field in ('start_time', 'end_time'):
+            if field in data:
+                setattr(exception, field, _parse_occurrence_time(data[field], field))
+        for field in ('title', 'description', 'location', 'status'):
+            if field in data:
+                setattr(exception, field, data[field])
+
+        duration = naive_utc(event.end_time) - naive_utc(event.start_time)
+        occurrence_start = exception.start_time or original_start
+        occurrence_end = exception.end_time or occurrence_start + duration
+        if occurrence_end <= occurrence_start:
+            raise ValueError("start_time must be before end_time.")
+        if exception.start_time is not None or exception.end_time is not None:
+            exception.start_time, exception.end_time = occurrence_start, occurrence_end
+
+    event.updated_at = db.func.now()
+    bump_calendar_versions([event.owner_id, *(link.user_id for link in event.participant_links)])
+    db.session.commit()
+
+    return exception
@@ -0,0 +1,212 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from flask_mail import Message
+from sqlalchemy import select, update
+from app.extensions import db, mail
+from app.models import EmailOutbox
+
+EMAIL_BATCH_SIZE = 50
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_RETRY_DELAY = timedelta(seconds=30)
+EMAIL_CLAIM_LEASE = timedelta(minutes=5)
+EMAIL_POLL_INTERVAL = 30.0
+
+
+def enqueue_email(recipient, subject, body):
+    """
+    Add a message to the outbox; it is sent once the caller's transaction commits.
+    """
+    message = EmailOutbox(recipient=recipient, subject=subject, body=body)
+    db.session.add(message)
+    return message
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff: 30 s after the first failure, doubling after each next one.
+    """
+    return EMAIL_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+
+
+def claim_batch(limit=EMAIL_BATCH_SIZE):
+    """
+    Lease up to limit due messages to this worker.
+
+    Claimed rows stay pending with next_attempt_at pushed past the lease, so
+    concurrent workers skip them (FOR UPDATE SKIP LOCKED) and messages of a
+    crashed worker are picked up again once the lease runs out.
+    """
+    due = (
+        select(EmailOutbox.id)
+        .where(EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= db.func.now())
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    batch = db.session.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(due.scalar_subquery()))
+        .values(attempts=EmailOutbox.attempts + 1, next_attempt_at=db.func.now() + EMAIL_CLAIM_LEASE)
+        .returning(EmailOutbox.id, EmailOutbox.recipient, EmailOutbox.subject, EmailOutbox.body,
+                   EmailOutbox.attempts)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    return batch
+
+
+def send_messages(batch):
+    """
+    Send a batch over a single SMTP connection.
+
+    Returns {message id: error or None}; a message that cannot be built or
+    sent only fails itself.
+    """
+    results = {}
+    with mail.connect() as connection:
+        for message in batch:
+            try:
+                connection.send(Message(subject=message.subject, recipients=[message.recipient], body=message.body))
+                results[message.id] = None
+            except Exception as e:
+                results[message.id] = str(e) or type(e).__name__
+    return results
+
+
+def record_results(batch, results):
+    """
+    Mark sent messages and reschedule, or give up on, failed ones.
+    """
+    now = datetime.now(timezone.utc)
+    sent_ids = [message.id for message in batch if results.get(message.id) is None]
+    failures = [
+        {
+            'id': message.id,
+            'status': 'failed' if message.attempts >= EMAIL_MAX_ATTEMPTS else 'pending',
+            'next_attempt_at': now + retry_delay(message.attempts),
+            'last_error': results[message.id][:1000],
+        }
+        for message in batch if results.get(message.id) is not None
+    ]
+
+    if sent_ids:
+        db.session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(sent_ids))
+            .values(status='sent', sent_at=now, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+    if failures:
+        db.session.execute(update(EmailOutbox), failures)
+    db.session.commit()
+
+
+def deliver_pending(batch_size=EMAIL_BATCH_SIZE):
+    """
+    Claim, send and record one batch of due messages. Returns the batch size.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0
+
+    try:
+        results = send_messages(batch)
+    except Exception as e:
+        results = {message.id: str(e) or type(e).__name__ for message in batch}
+
+    record_results(batch, results)
+    return len(batch)
+
+
+def drain_outbox(batch_size=EMAIL_BATCH_SIZE):
+    """
+    Deliver due messages until none are left. Returns the number of attempts made.
+    """
+    attempted = 0
+    while True:
+        delivered = deliver_pending(batch_size)
+        if not delivered:
+            return attempted
+        attempted += delivered
+
+
+class EmailDispatcher:
+    """
+    Background thread draining the email outbox.
+
+    The thread starts with the first request or wake() in each process, so it
+    survives pre-forking servers and stays out of CLI commands. It drains the
+    outbox as soon as it starts, picking up mail left pending or due for retry
+    by a restart, then whenever it is woken and every poll_interval seconds. It stays off in testing and when
+    EMAIL_DISPATCHER_ENABLED is false; `flask send-emails` drains the outbox
+    from a separate worker process instead.
+    """
+
+    def __init__(self, app=None, poll_interval=EMAIL_POLL_INTERVAL, batch_size=EMAIL_BATCH_SIZE):
+        self.app = None
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['email_dispatcher'] = self
+        app.before_request(self.start)
+
+    @property
+    def enabled(self):
+        return (
+            self.app is not None
+            and self.app.config.get('EMAIL_DISPATCHER_ENABLED', True)
+            and not self.app.testing
+        )
+
+    def start(self):
+        if self.enabled:
+            self._ensure_started()
+
+    def wake(self):
+        if not self.enabled:
+            return
+        self._ensure_started()
+        self._wakeup.set()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._wakeup.set()
+            self._thread = threading.Thread(target=self._run, name='email-dispatcher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                return
+            with self.app.app_context():
+                try:
+                    drain_outbox(self.batch_size)
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.warning("Email dispatch failed: %s", e)
+                finally:
+                    db.session.remove()
+
+
+email_dispatcher = EmailDispatcher()
@@ -0,0 +1,430 @@
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import func, insert, select
+from app.extensions import db
+from app.models.event import EventException
+from app.models.user import User
+from app.services.calendar_service import event_values, insert_events, bump_calendar_versions
+from app.utils.datetime import naive_utc
+
+ICS_PRODID = '-//My Friend Calendar//Calendar Export//EN'
+ICS_UID_DOMAIN = 'my-friend-calendar'
+ICS_LINE_LIMIT = 75
+EXPORT_BATCH_SIZE = 500
+
+ICS_STATUSES = {'cancelled': 'CANCELLED', 'tentative': 'TENTATIVE'}
+IMPORT_STATUSES = {'CANCELLED': 'cancelled', 'TENTATIVE': 'tentative', 'CONFIRMED': 'planned'}
+
+DEFAULT_IMPORT_BATCH_SIZE = 500
+MAXIMAL_IMPORT_BATCH_SIZE = 5000
+MAXIMAL_REPORTED_ERRORS = 100
+MAXIMAL_TEXT_LENGTH = 255
+
+
+def escape_text(value):
+    """
+    Escape a TEXT property value (RFC 5545, section 3.3.11).
+    """
+    return (
+        value.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold_line(line):
+    """
+    Fold a content line into chunks of at most 75 octets joined by CRLF and a space.
+
+    Lines are split on character boundaries so multi-byte UTF-8 sequences stay intact.
+    """
+    if len(line.encode('utf-8')) <= ICS_LINE_LIMIT:
+        return line + '\r\n'
+
+    chunks = []
+    chunk, size, limit = '', 0, ICS_LINE_LIMIT
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            chunks.append(chunk)
+            chunk, size, limit = '', 0, ICS_LINE_LIMIT - 1
+        chunk += char
+        size += char_size
+    chunks.append(chunk)
+
+    return '\r\n '.join(chunks) + '\r\n'
+
+
+def format_datetime(value):
+    """
+    Format a stored time as a UTC DATE-TIME; naive values are taken as UTC.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+
+def _utc_rule(rule):
+    return re.sub(r'UNTIL=(\d{8}T\d{6})(?!Z)', r'UNTIL=\1Z', rule)
+
+
+def event_uid(event_id):
+    return f'{event_id}@{ICS_UID_DOMAIN}'
+
+
+def _event_lines(event, dtstamp):
+    status = ICS_STATUSES.get((event.status or '').lower(), 'CONFIRMED')
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{event_uid(event.id)}',
+        f'DTSTAMP:{dtstamp}',
+        f'DTSTART:{format_datetime(event.start_time)}',
+        f'DTEND:{format_datetime(event.end_time)}',
+        f'SUMMARY:{escape_text(event.title)}',
+        f'STATUS:{status}',
+    ]
+    if event.description:
+        lines.append(f'DESCRIPTION:{escape_text(event.description)}')
+    if event.location:
+        lines.append(f'LOCATION:{escape_text(event.location)}')
+    if event.updated_at:
+        lines.append(f'LAST-MODIFIED:{format_datetime(event.updated_at)}')
+    if event.owner:
+        lines.append(f'ORGANIZER:mailto:{event.owner.email}')
+    for link in event.participant_links:
+        lines.append(f'ATTENDEE:mailto:{link.user.email}')
+    return lines
+
+
+def vevent_lines(event, dtstamp):
+    """
+    Content lines of an event; a series is followed by one VEVENT per moved occurrence.
+    """
+    lines = _event_lines(event, dtstamp)
+
+    if not event.recurrence_rule:
+        return lines + ['END:VEVENT']
+
+    exceptions = list(event.exceptions)
+    lines.append(f'RRULE:{_utc_rule(event.recurrence_rule)}')
+    for exception in exceptions:
+        if exception.is_cancelled:
+            lines.append(f'EXDATE:{format_datetime(exception.original_start)}')
+    lines.append('END:VEVENT')
+
+    duration = naive_utc(event.end_time) - naive_utc(event.start_time)
+    for exception in exceptions:
+        if exception.is_cancelled:
+            continue
+        start_time = exception.start_time or exception.original_start
+        end_time = exception.end_time or naive_utc(start_time) + duration
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:{event_uid(event.id)}',
+            f'DTSTAMP:{dtstamp}',
+            f'RECURRENCE-ID:{format_datetime(exception.original_start)}',
+            f'DTSTART:{format_datetime(start_time)}',
+            f'DTEND:{format_datetime(end_time)}',
+            f'SUMMARY:{escape_text(exception.title or event.title)}',
+        ]
+        description = exception.description or event.description
+        if description:
+            lines.append(f'DESCRIPTION:{escape_text(description)}')
+        location = exception.location or event.location
+        if location:
+            lines.append(f'LOCATION:{escape_text(location)}')
+        lines.append('END:VEVENT')
+
+    return lines
+
+
+def iter_calendar_ics(query, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Serialize an event query as an iCalendar (RFC 5545) document, one event at a time.
+
+    Rows are fetched through a server-side cursor in batches of batch_size, so
+    large calendars are never held in memory.
+    """
+    dtstamp = format_datetime(datetime.now(timezone.utc))
+
+    yield ''.join(fold_line(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{ICS_PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+    ))
+    for event in query.yield_per(batch_size):
+        yield ''.join(fold_line(line) for line in vevent_lines(event, dtstamp))
+    yield fold_line('END:VCALENDAR')
+
+
+def unescape_text(value):
+    return re.sub(r'\\([\\;,nN])', lambda match: '\n' if match.group(1) in 'nN' else match.group(1), value)
+
+
+def iter_content_lines(stream):
+    """
+    Yield unfolded content lines read one physical line at a time from a binary stream.
+    """
+    pending = None
+    first = True
+    for raw in iter(stream.readline, b''):
+        line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+        if first:
+            line = line.lstrip('\ufeff')
+            first = False
+        if line[:1] in (' ', '\t') and pending is not None:
+            pending += line[1:]
+            continue
+        if pending:
+            yield pending
+        pending = line
+    if pending:
+        yield pending
+
+
+def parse_content_line(line):
+    """
+    Split a content line into (NAME, {PARAM: value}, value).
+    """
+    head, in_quotes, split_at = line, False, None
+    for position, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ':' and not in_quotes:
+            split_at = position
+            break
+    if split_at is None:
+        raise ValueError(f"Malformed content line '{line[:40]}'")
+
+    head, value = line[:split_at], line[split_at + 1:]
+    name, *raw_params = head.split(';')
+    params = {}
+    for raw_param in raw_params:
+        key, _, param_value = raw_param.partition('=')
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def parse_ics_datetime(value, params):
+    """
+    Parse a DATE or DATE-TIME value into a naive UTC datetime.
+
+    Floating times are kept as written; TZID times are converted to UTC.
+    Returns the datetime and whether the value was a whole-day DATE.
+    """
+    value = value.strip()
+    if params.get('VALUE') == 'DATE' or re.fullmatch(r'\d{8}', value):
+        return datetime.strptime(value, '%Y%m%d'), True
+
+    if value.endswith('Z'):
+        return datetime.strptime(value, '%Y%m%dT%H%M%SZ'), False
+
+    moment = datetime.strptime(value, '%Y%m%dT%H%M%S')
+    if 'TZID' in params:
+        try:
+            zone = ZoneInfo(params['TZID'])
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown time zone '{params['TZID']}'")
+        moment = moment.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+    return moment, False
+
+
+def iter_vevents(lines):
+    """
+    Yield the properties of each top-level VEVENT as {NAME: [(params, value), ...]}.
+
+    Nested components such as VALARM are skipped, as are VTIMEZONE blocks.
+    """
+    properties = None
+    depth = 0
+    for line in lines:
+        upper = line.upper()
+        if upper == 'BEGIN:VEVENT' and properties is None:
+            properties, depth = {}, 0
+            continue
+        if properties is None:
+            continue
+        if upper.startswith('BEGIN:'):
+            depth += 1
+            continue
+        if upper.startswith('END:'):
+            if depth:
+                depth -= 1
+                continue
+            yield properties
+            properties = None
+            continue
+        if depth:
+            continue
+
+        try:
+            name, params, value = parse_content_line(line)
+        except ValueError:
+            continue
+        properties.setdefault(name, []).append((params, value))
+
+
+def _short_text(value):
+    return unescape_text(value)[:MAXIMAL_TEXT_LENGTH] if value else None
+
+
+def _excluded_starts(properties):
+    excluded = set()
+    for params, value in properties.get('EXDATE', []):
+        for item in value.split(','):
+            if item.strip():
+                excluded.add(parse_ics_datetime(item, params)[0])
+    return sorted(excluded)
+
+
+def vevent_to_event_data(properties):
+    """
+    Map VEVENT properties onto an event payload, the attendee emails and the
+    EXDATE starts of a series.
+
+    SUMMARY and LOCATION are cut to the length of their columns.
+    """
+    def first(name):
+        values = properties.get(name)
+        return values[0] if values else (None, None)
+
+    if 'RECURRENCE-ID' in properties:
+        raise ValueError("Overrides of single occurrences are not imported.")
+
+    start_params, start_value = first('DTSTART')
+    if start_value is None:
+        raise ValueError("DTSTART is required.")
+    try:
+        start_time, all_day = parse_ics_datetime(start_value, start_params)
+
+        end_params, end_value = first('DTEND')
+        if end_value is not None:
+            end_time, _ = parse_ics_datetime(end_value, end_params)
+        elif all_day:
+            end_time = start_time + timedelta(days=1)
+        else:
+            raise ValueError("DTEND is required for timed events.")
+        excluded_starts = _excluded_starts(properties) if 'RRULE' in properties else []
+    except ValueError as ve:
+        raise ValueError(f"Invalid date: {ve}")
+
+    recurrence_rule = first('RRULE')[1]
+    if recurrence_rule and len(recurrence_rule) > MAXIMAL_TEXT_LENGTH:
+        raise ValueError(f"RRULE cannot exceed {MAXIMAL_TEXT_LENGTH} characters.")
+
+    data = {
+        'title': _short_text(first('SUMMARY')[1]) or '(No title)',
+        'description': unescape_text(first('DESCRIPTION')[1]) if first('DESCRIPTION')[1] else None,
+        'location': _short_text(first('LOCATION')[1]),
+        'status': IMPORT_STATUSES.get((first('STATUS')[1] or '').upper()),
+        'start_time': start_time.isoformat(),
+        'end_time': end_time.isoformat(),
+        'recurrence_rule': recurrence_rule,
+    }
+
+    attendees = {
+        value[len('mailto:'):].strip().lower()
+        for _, value in properties.get('ATTENDEE', [])
+        if value.lower().startswith('mailto:')
+    }
+    return data, attendees, excluded_starts
+
+
+def parse_import_batch_size(value):
+    if value is None or value == '':
+        return DEFAULT_IMPORT_BATCH_SIZE
+    try:
+        batch_size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("batch_size must be an integer.")
+    if not 1 <= batch_size <= MAXIMAL_IMPORT_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {MAXIMAL_IMPORT_BATCH_SIZE}.")
+    return batch_size
+
+
+def _flush_import_batch(batch, owner_id):
+    emails = set().union(*(attendees for _, attendees, _ in batch))
+    users_by_email = {}
+    if emails:
+        users_by_email = dict(db.session.execute(
+            select(func.lower(User.email), User.id).where(func.lower(User.email).in_(emails))
+        ).all())
+
+    rows = []
+    for values, attendees, _ in batch:
+        participant_ids = {
+            users_by_email[email] for email in attendees
+            if email in users_by_email and str(users_by_email[email]) != str(owner_id)
+        }
+        rows.append((values, participant_ids))
+
+    event_ids = insert_events(rows)
+
+    exception_rows = [
+        {'event_id': event_id, 'original_start': original_start, 'is_cancelled': True}
+        for event_id, (_, _, excluded_starts) in zip(event_ids, batch)
+        for original_start in excluded_starts
+    ]
+    if exception_rows:
+        db.session.execute(insert(EventException), exception_rows)
+
+    return set().union(*(participant_ids for _, participant_ids in rows))
+
+
+def import_ics(stream, owner_id, batch_size=DEFAULT_IMPORT_BATCH_SIZE):
+    """
+    Import the VEVENTs of an iCalendar stream as events owned by the user.
+
+    The stream is parsed one line at a time and valid events are written in
+    batches of batch_size, each with one multi-row insert per table, inside a
+    single transaction. Attendees are linked when their email belongs to a
+    user and EXDATEs become cancelled occurrences. Invalid events are skipped
+    and reported by their position.
+    """
+    started = time.perf_counter()
+    imported = 0
+    error_count = 0
+    errors = []
+    affected_user_ids = {owner_id}
+    batch = []
+
+    for index, properties in enumerate(iter_vevents(iter_content_lines(stream))):
+        uid = properties['UID'][0][1] if properties.get('UID') else None
+        try:
+            data, attendees, excluded_starts = vevent_to_event_data(properties)
+            values, _ = event_values(data, owner_id)
+        except ValueError as ve:
+            error_count += 1
+            if len(errors) < MAXIMAL_REPORTED_ERRORS:
+                errors.append({'index': index, 'uid': uid, 'error': str(ve)})
+            continue
+
+        batch.append((values, attendees, excluded_starts))
+        if len(batch) >= batch_size:
+            affected_user_ids |= _flush_import_batch(batch, owner_id)
+            imported += len(batch)
+            batch = []
+
+    if batch:
+        affected_user_ids |= _flush_import_batch(batch, owner_id)
+        imported += len(batch)
+
+    if imported:
+        bump_calendar_versions(affected_user_ids)
+    db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'imported': imported,
+        'failed': error_count,
+        'errors': errors,
+        'elapsed_seconds': round(elapsed, 3),
+        'events_per_second': round(imported / elapsed, 1) if elapsed > 0 else None,
+    }
+
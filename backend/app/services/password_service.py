@@ -0,0 +1,197 @@
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from argon2 import PasswordHasher, Type
+from argon2.exceptions import VerificationError, InvalidHashError
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash
+
+PASSWORD_ALGORITHM = "argon2id"
+
+DEFAULT_TIME_COST = 3
+DEFAULT_MEMORY_COST = 65536
+DEFAULT_PARALLELISM = 4
+
+MINIMAL_MEMORY_COST = 19456
+MAXIMAL_TIME_COST = 20
+CALIBRATION_ROUNDS = 5
+
+DEFAULT_HASH_WORKERS = max(1, min(4, (os.cpu_count() or 1) // 2))
+DEFAULT_HASH_QUEUE_DEPTH = 16
+DEFAULT_HASH_TIMEOUT = 10.0
+HASHING_RETRY_AFTER = 1
+
+
+class HashingPoolSaturatedError(Exception):
+    def __init__(self, retry_after=HASHING_RETRY_AFTER):
+        super().__init__("Password hashing is at capacity")
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    """
+    Bounded thread pool running password KDFs off the request threads.
+
+    argon2 and hashlib's pbkdf2 release the GIL, so at most `workers` hashes
+    use the CPU at once while other requests keep being served. Up to
+    `queue_depth` more may wait for a worker; anything beyond that, or a
+    hash not finished within `timeout` seconds, raises
+    HashingPoolSaturatedError right away instead of piling up. The executor
+    is created on first use in each process, so it survives pre-forking servers.
+    """
+
+    def __init__(self, workers=DEFAULT_HASH_WORKERS, queue_depth=DEFAULT_HASH_QUEUE_DEPTH,
+                 timeout=DEFAULT_HASH_TIMEOUT):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.configure(workers, queue_depth, timeout)
+
+    def init_app(self, app):
+        self.configure(
+            int(app.config.get('PASSWORD_HASH_WORKERS', DEFAULT_HASH_WORKERS)),
+            int(app.config.get('PASSWORD_HASH_QUEUE_DEPTH', DEFAULT_HASH_QUEUE_DEPTH)),
+            float(app.config.get('PASSWORD_HASH_TIMEOUT', DEFAULT_HASH_TIMEOUT)),
+        )
+        app.extensions['hashing_pool'] = self
+
+    def configure(self, workers, queue_depth, timeout):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self.workers = max(1, workers)
+            self.queue_depth = max(0, queue_depth)
+            self.timeout = timeout
+            self._slots = threading.BoundedSemaphore(self.workers + self.queue_depth)
+            self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+                self._pid = os.getpid()
+            return self._executor
+
+    def run(self, fn, *args):
+        """
+        Call fn(*args) on a hashing worker and return its result.
+        """
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HashingPoolSaturatedError()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashingPoolSaturatedError() from None
+
+
+hashing_pool = HashingPool()
+
+
+@lru_cache(maxsize=8)
+def _hasher(time_cost, memory_cost, parallelism):
+    return PasswordHasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism, type=Type.ID
+    )
+
+
+def cost_profile():
+    """
+    The configured argon2id cost profile as (time_cost, memory_cost in KiB, parallelism).
+    """
+    config = current_app.config if has_app_context() else {}
+    return (
+        int(config.get('PASSWORD_HASH_TIME_COST', DEFAULT_TIME_COST)),
+        int(config.get('PASSWORD_HASH_MEMORY_COST', DEFAULT_MEMORY_COST)),
+        int(config.get('PASSWORD_HASH_PARALLELISM', DEFAULT_PARALLELISM)),
+    )
+
+
+def password_hasher():
+    return _hasher(*cost_profile())
+
+
+def hash_password(password):
+    return hashing_pool.run(password_hasher().hash, password)
+
+
+def _verify_argon2(hasher, password_hash, password):
+    try:
+        return hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def verify_password(algorithm, password_hash, password):
+    """
+    Check a password against a stored argon2id or pbkdf2 hash on the hashing pool.
+    """
+    if not password_hash:
+        return False
+    if algorithm.startswith("pbkdf2"):
+        return hashing_pool.run(check_password_hash, password_hash, password)
+    if algorithm == PASSWORD_ALGORITHM:
+        return hashing_pool.run(_verify_argon2, password_hasher(), password_hash, password)
+    return False
+
+
+def needs_rehash(algorithm, password_hash):
+    """
+    Check whether a stored hash should be replaced by one using the current profile.
+    """
+    if algorithm != PASSWORD_ALGORITHM:
+        return True
+    try:
+        return password_hasher().check_needs_rehash(password_hash)
+    except Exception:
+        return True
+
+
+def _median_hash_ms(time_cost, memory_cost, parallelism, rounds):
+    hasher = _hasher(time_cost, memory_cost, parallelism)
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms, memory_cost=DEFAULT_MEMORY_COST, parallelism=DEFAULT_PARALLELISM,
+              rounds=CALIBRATION_ROUNDS):
+    """
+    Find the strongest argon2id profile whose median hash time stays within target_ms.
+
+    Memory is kept at memory_cost while the time cost grows one step at a time;
+    when even a single pass is too slow, memory is halved down to the OWASP
+    minimum of 19 MiB. Returns the profile and its measured median in ms.
+    """
+    while True:
+        elapsed = _median_hash_ms(1, memory_cost, parallelism, rounds)
+        if elapsed <= target_ms or memory_cost // 2 < MINIMAL_MEMORY_COST:
+            break
+        memory_cost //= 2
+
+    time_cost = 1
+    while time_cost < MAXIMAL_TIME_COST:
+        candidate = _median_hash_ms(time_cost + 1, memory_cost, parallelism, rounds)
+        if candidate > target_ms:
+            break
+        time_cost, elapsed = time_cost + 1, candidate
+
+    return {
+        'time_cost': time_cost,
+        'memory_cost': memory_cost,
+        'parallelism': parallelism,
+        'median_ms': round(elapsed, 1),
+    }
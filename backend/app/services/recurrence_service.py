@@ -0,0 +1,307 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+from app.models.event import Event, EventException
+from app.utils.datetime import naive_utc
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+WEEKDAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+MAXIMAL_INTERVAL = 1000
+MAXIMAL_COUNT = 1000
+MAXIMAL_SERIES_DAYS = 366 * 100
+
+
+def _parse_until(value):
+    for fmt in ('%Y%m%dT%H%M%SZ', '%Y%m%dT%H%M%S', '%Y%m%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError("INVALID_RRULE: UNTIL must look like 20240630 or 20240630T120000")
+
+
+def parse_rrule(text):
+    """
+    Parse the supported subset of an RFC 5545 RRULE.
+
+    Supported parts are FREQ (DAILY, WEEKLY, MONTHLY, YEARLY), INTERVAL,
+    COUNT, UNTIL and, for weekly rules, BYDAY without numeric prefixes.
+    """
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("INVALID_RRULE: Recurrence rule must be a non-empty string")
+
+    text = text.strip()
+    if text.upper().startswith('RRULE:'):
+        text = text[len('RRULE:'):]
+
+    parts = {}
+    for part in text.split(';'):
+        key, separator, value = part.partition('=')
+        if not separator or not value:
+            raise ValueError(f"INVALID_RRULE: Malformed part '{part}'")
+        parts[key.strip().upper()] = value.strip().upper()
+
+    unknown = set(parts) - {'FREQ', 'INTERVAL', 'COUNT', 'UNTIL', 'BYDAY'}
+    if unknown:
+        raise ValueError(f"INVALID_RRULE: Unsupported parts: {', '.join(sorted(unknown))}")
+
+    freq = parts.get('FREQ')
+    if freq not in FREQUENCIES:
+        raise ValueError(f"INVALID_RRULE: FREQ must be one of {', '.join(FREQUENCIES)}")
+
+    try:
+        interval = int(parts.get('INTERVAL', 1))
+        count = int(parts['COUNT']) if 'COUNT' in parts else None
+    except ValueError:
+        raise ValueError("INVALID_RRULE: INTERVAL and COUNT must be integers")
+
+    if not 1 <= interval <= MAXIMAL_INTERVAL:
+        raise ValueError(f"INVALID_RRULE: INTERVAL must be between 1 and {MAXIMAL_INTERVAL}")
+    if count is not None and not 1 <= count <= MAXIMAL_COUNT:
+        raise ValueError(f"INVALID_RRULE: COUNT must be between 1 and {MAXIMAL_COUNT}")
+
+    until = _parse_until(parts['UNTIL']) if 'UNTIL' in parts else None
+    if count is not None and until is not None:
+        raise ValueError("INVALID_RRULE: COUNT and UNTIL cannot be combined")
+
+    byday = None
+    if 'BYDAY' in parts:
+        if freq != 'WEEKLY':
+            raise ValueError("INVALID_RRULE: BYDAY is only supported for weekly rules")
+        try:
+            byday = sorted({WEEKDAYS[day] for day in parts['BYDAY'].split(',')})
+        except KeyError:
+            raise ValueError("INVALID_RRULE: BYDAY must list days such as MO,WE,FR")
+
+    return {'freq': freq, 'interval': interval, 'count': count, 'until': until, 'byday': byday}
+
+
+def format_rrule(rule):
+    parts = [f"FREQ={rule['freq']}"]
+    if rule['interval'] != 1:
+        parts.append(f"INTERVAL={rule['interval']}")
+    if rule['count'] is not None:
+        parts.append(f"COUNT={rule['count']}")
+    if rule['until'] is not None:
+        parts.append(f"UNTIL={rule['until'].strftime('%Y%m%dT%H%M%S')}")
+    if rule['byday']:
+        names = {number: name for name, number in WEEKDAYS.items()}
+        parts.append(f"BYDAY={','.join(names[day] for day in rule['byday'])}")
+    return ';'.join(parts)
+
+
+def normalize_rrule(text):
+    """
+    Validate a rule and return its canonical form, or None when it is empty.
+    """
+    if text is None or text == '':
+        return None
+    return format_rrule(parse_rrule(text))
+
+
+def shift_rrule(text, shift):
+    """
+    Move the UNTIL of a rule by shift, so a moved series keeps its occurrences.
+    """
+    if not text:
+        return text
+    rule = parse_rrule(text)
+    if rule['until'] is None:
+        return text
+    rule['until'] += shift
+    return format_rrule(rule)
+
+
+def _add_months(moment, months):
+    """
+    Shift by whole months, returning None when the day does not exist (e.g. 31 April).
+    """
+    month_index = moment.month - 1 + months
+    try:
+        return moment.replace(year=moment.year + month_index // 12, month=month_index % 12 + 1)
+    except ValueError:
+        return None
+
+
+def _period(rule, dtstart, index):
+    """
+    Earliest possible moment of the index-th period and its candidate starts.
+    """
+    step = index * rule['interval']
+    freq = rule['freq']
+
+    if freq == 'DAILY':
+        moment = dtstart + timedelta(days=step)
+        return moment, [moment]
+
+    if freq == 'WEEKLY':
+        base = dtstart + timedelta(weeks=step)
+        if not rule['byday']:
+            return base, [base]
+        week_start = base - timedelta(days=base.weekday())
+        return week_start, [week_start + timedelta(days=day) for day in rule['byday']]
+
+    months = step if freq == 'MONTHLY' else step * 12
+    first_of_period = _add_months(dtstart.replace(day=1), months)
+    moment = _add_months(dtstart, months)
+    return first_of_period, [moment] if moment is not None else []
+
+
+def _skip_periods(rule, dtstart, duration, range_start):
+    """
+    Number of whole periods ending before range_start and occurrences inside them.
+
+    Only daily and weekly rules have fixed-length periods that can be skipped
+    arithmetically; monthly and yearly rules produce few enough candidates to
+    walk from the start.
+    """
+    if range_start is None or rule['freq'] not in ('DAILY', 'WEEKLY'):
+        return 0, 0
+
+    period_length = timedelta(days=rule['interval'] * (1 if rule['freq'] == 'DAILY' else 7))
+    skipped = (range_start - duration - dtstart) // period_length - 1
+    if skipped <= 0:
+        return 0, 0
+
+    per_period = len(rule['byday']) if rule['freq'] == 'WEEKLY' and rule['byday'] else 1
+    first_period = len([moment for moment in _period(rule, dtstart, 0)[1] if moment >= dtstart])
+    return skipped, first_period + (skipped - 1) * per_period
+
+
+def occurrence_starts(rule, dtstart, duration, range_start=None, range_end=None):
+    """
+    Yield starts of the occurrences overlapping [range_start, range_end) in order.
+
+    Periods entirely before the window are skipped without being generated, so
+    the cost follows the size of the window rather than the age of the series.
+    Unbounded rules must be expanded with a range_end.
+    """
+    dtstart = naive_utc(dtstart)
+    if range_start is not None:
+        range_start = naive_utc(range_start)
+    if range_end is not None:
+        range_end = naive_utc(range_end)
+
+    horizon = dtstart + timedelta(days=MAXIMAL_SERIES_DAYS)
+    index, produced = _skip_periods(rule, dtstart, duration, range_start)
+
+    while True:
+        period_start, candidates = _period(rule, dtstart, index)
+        if period_start > horizon or (range_end is not None and period_start >= range_end):
+            return
+
+        for moment in candidates:
+            if moment < dtstart:
+                continue
+            if rule['until'] is not None and moment > rule['until']:
+                return
+            if rule['count'] is not None and produced >= rule['count']:
+                return
+            produced += 1
+
+            if range_end is not None and moment >= range_end:
+                return
+            if range_start is None or moment + duration > range_start:
+                yield moment
+
+        index += 1
+
+
+def series_end(rule, start_time, end_time):
+    """
+    End of the last occurrence of a finite series, or None for an endless one.
+    """
+    if rule['count'] is None and rule['until'] is None:
+        return None
+
+    duration = naive_utc(end_time) - naive_utc(start_time)
+    last_start = None
+    for last_start in occurrence_starts(rule, start_time, duration):
+        pass
+
+    return last_start + duration if last_start is not None else naive_utc(end_time)
+
+
+def occurrence_intervals(event, range_start, range_end, exceptions=None):
+    """
+    Occurrences of an event overlapping the window as (start, end, original_start, exception).
+
+    Single events yield themselves. Cancelled occurrences are dropped and moved
+    ones are reported at their new time, including ones moved into the window.
+    """
+    start_time, end_time = naive_utc(event.start_time), naive_utc(event.end_time)
+    range_start, range_end = naive_utc(range_start), naive_utc(range_end)
+
+    if not event.recurrence_rule:
+        if start_time < range_end and end_time > range_start:
+            return [(start_time, end_time, None, None)]
+        return []
+
+    duration = end_time - start_time
+    overrides = {naive_utc(exception.original_start): exception for exception in (exceptions or [])}
+
+    intervals = [
+        (moment, moment + duration, moment, None)
+        for moment in occurrence_starts(parse_rrule(event.recurrence_rule), start_time, duration,
+                                        range_start, range_end)
+        if moment not in overrides
+    ]
+
+    for original_start, exception in overrides.items():
+        if exception.is_cancelled:
+            continue
+        occurrence_start = naive_utc(exception.start_time) if exception.start_time else original_start
+        occurrence_end = naive_utc(exception.end_time) if exception.end_time else occurrence_start + duration
+        if occurrence_start < range_end and occurrence_end > range_start:
+            intervals.append((occurrence_start, occurrence_end, original_start, exception))
+
+    intervals.sort(key=lambda interval: (interval[0], interval[2]))
+    return intervals
+
+
+def is_occurrence(event, original_start):
+    """
+    Check that original_start is a generated start of the event's series.
+    """
+    original_start = naive_utc(original_start)
+    duration = naive_utc(event.end_time) - naive_utc(event.start_time)
+    starts = occurrence_starts(
+        parse_rrule(event.recurrence_rule), event.start_time, duration,
+        original_start, original_start + timedelta(microseconds=1)
+    )
+    return original_start in starts
+
+
+def overlap_filters(range_start=None, range_end=None):
+    """
+    SQL predicates matching events, or series, with occurrences that may overlap the window.
+
+    Occurrences moved outside the bounds of their series are not matched here;
+    see moved_occurrence_filters.
+    """
+    filters = []
+    if range_start is not None:
+        filters.append(or_(
+            Event.end_time > range_start,
+            and_(
+                Event.recurrence_rule.isnot(None),
+                or_(Event.recurrence_end.is_(None), Event.recurrence_end > range_start),
+            ),
+        ))
+    if range_end is not None:
+        filters.append(Event.start_time < range_end)
+    return filters
+
+
+def moved_occurrence_filters(range_start=None, range_end=None):
+    """
+    SQL predicates on EventException matching occurrences moved into the window.
+
+    Moved occurrences store both start_time and end_time, so the partial
+    ix_event_exceptions_moved index serves the range.
+    """
+    filters = [EventException.is_cancelled.is_(False), EventException.start_time.isnot(None)]
+    if range_start is not None:
+        filters.append(EventException.end_time > range_start)
+    if range_end is not None:
+        filters.append(EventException.start_time < range_end)
+    return filters
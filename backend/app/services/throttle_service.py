@@ -0,0 +1,256 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, insert, select
+from app.extensions import db
+from app.models import LoginAttempt
+
+LOGIN_WINDOW = timedelta(minutes=15)
+MAXIMAL_FAILURES_PER_EMAIL = 5
+MAXIMAL_FAILURES_PER_IP = 20
+MAXIMAL_TRACKED_KEYS = 100_000
+
+ATTEMPT_BATCH_SIZE = 200
+ATTEMPT_FLUSH_INTERVAL = 2.0
+
+
+class LoginThrottledError(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Too many failed login attempts")
+        self.retry_after = retry_after
+
+
+class SlidingWindowCounter:
+    """
+    Per-key timestamps of recent events, pruned to a sliding window.
+
+    At most maxsize keys are tracked; the least recently used ones are dropped
+    first. A tracked key, even with no events, means its history is known, so
+    only untracked keys need to be loaded from the database.
+    """
+
+    def __init__(self, window, maxsize=MAXIMAL_TRACKED_KEYS, clock=time.time):
+        self.window = window.total_seconds()
+        self.maxsize = maxsize
+        self._clock = clock
+        self._events = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self, events, now):
+        while events and events[0] <= now - self.window:
+            events.popleft()
+
+    def events(self, key):
+        """
+        Timestamps of the key's events inside the window, or None for an untracked key.
+        """
+        now = self._clock()
+        with self._lock:
+            events = self._events.get(key)
+            if events is None:
+                return None
+            self._prune(events, now)
+            self._events.move_to_end(key)
+            return list(events)
+
+    def seed(self, key, timestamps):
+        with self._lock:
+            if key in self._events:
+                return
+            self._events[key] = deque(sorted(timestamps))
+            self._evict()
+
+    def hit(self, key, at=None):
+        now = self._clock() if at is None else at
+        with self._lock:
+            events = self._events.setdefault(key, deque())
+            events.append(now)
+            self._prune(events, now)
+            self._events.move_to_end(key)
+            self._evict()
+
+    def reset(self, key):
+        with self._lock:
+            self._events[key] = deque()
+            self._events.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        while len(self._events) > self.maxsize:
+            self._events.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+
+class AttemptWriter:
+    """
+    Buffers LoginAttempt rows and inserts them in batches from a background thread.
+
+    Rows are flushed every flush_interval seconds or once batch_size are
+    buffered. In testing, or with LOGIN_ATTEMPT_WRITER_ENABLED false, rows are
+    inserted right away in the request's session instead.
+    """
+
+    def __init__(self, batch_size=ATTEMPT_BATCH_SIZE, flush_interval=ATTEMPT_FLUSH_INTERVAL):
+        self.app = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self.app = app
+
+    @property
+    def enabled(self):
+        return (
+            self.app is not None
+            and self.app.config.get('LOGIN_ATTEMPT_WRITER_ENABLED', True)
+            and not self.app.testing
+        )
+
+    def add(self, row):
+        if not self.enabled:
+            db.session.execute(insert(LoginAttempt), [row])
+            db.session.commit()
+            return
+
+        with self._lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='login-attempt-writer', daemon=True)
+                self._thread.start()
+        if full:
+            self._wakeup.set()
+
+    def take(self):
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        return rows
+
+    def flush(self):
+        """
+        Insert everything buffered so far with one executemany statement.
+        """
+        rows = self.take()
+        if rows:
+            db.session.execute(insert(LoginAttempt), rows)
+            db.session.commit()
+        return len(rows)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    self.flush()
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.warning("Writing login attempts failed: %s", e)
+                finally:
+                    db.session.remove()
+
+
+class LoginThrottle:
+    """
+    Per-email and per-IP budgets of failed logins over a sliding window.
+
+    Budgets are checked in memory; a key seen for the first time in this
+    process is loaded from login_attempts through its (email|ip, created_at)
+    index, so restarts and other workers' recent failures still count. As in
+    record(), a successful login clears an email's earlier failures.
+
+    Counters are per process: failures made after a key was loaded are only
+    seen by the worker that recorded them, so with N workers up to N times
+    the budget can be spent before every worker refuses a key.
+    """
+
+    def __init__(self, window=LOGIN_WINDOW, email_budget=MAXIMAL_FAILURES_PER_EMAIL,
+                 ip_budget=MAXIMAL_FAILURES_PER_IP, clock=time.time):
+        self.window = window
+        self.budgets = {'email': email_budget, 'ip': ip_budget}
+        self.counter = SlidingWindowCounter(window, clock=clock)
+        self.writer = AttemptWriter()
+        self._clock = clock
+
+    def init_app(self, app):
+        self.writer.init_app(app)
+
+    def _recent_failures(self, kind, value):
+        key = (kind, value)
+        events = self.counter.events(key)
+        if events is not None:
+            return events
+
+        column = LoginAttempt.email if kind == 'email' else LoginAttempt.ip_address
+        since = datetime.fromtimestamp(self._clock(), timezone.utc) - self.window
+        after = since
+        if kind == 'email':
+            last_success = (
+                select(func.max(LoginAttempt.created_at))
+                .where(column == value, LoginAttempt.successful.is_(True), LoginAttempt.created_at > since)
+                .scalar_subquery()
+            )
+            after = func.coalesce(last_success, since)
+        created = db.session.execute(
+            select(LoginAttempt.created_at)
+            .where(column == value, LoginAttempt.successful.is_(False), LoginAttempt.created_at > after)
+            .order_by(LoginAttempt.created_at.desc())
+            .limit(self.budgets[kind])
+        ).scalars().all()
+
+        timestamps = [moment.timestamp() for moment in created]
+        self.counter.seed(key, timestamps)
+        return timestamps
+
+    def check(self, email, ip_address):
+        """
+        Raise LoginThrottledError when the email or the IP address is over budget.
+        """
+        now = self._clock()
+        retry_after = 0
+        for kind, value in (('email', email), ('ip', ip_address)):
+            if not value:
+                continue
+            failures = self._recent_failures(kind, value)
+            budget = self.budgets[kind]
+            if len(failures) >= budget:
+                oldest_counted = sorted(failures)[-budget]
+                retry_after = max(retry_after, oldest_counted + self.window.total_seconds() - now)
+
+        if retry_after > 0:
+            raise LoginThrottledError(int(retry_after) + 1)
+
+    def record(self, email, ip_address, user_agent, successful, user_id=None, failure_reason=None):
+        """
+        Count the attempt and queue its LoginAttempt row.
+        """
+        now = self._clock()
+        if successful:
+            if email:
+                self.counter.reset(('email', email))
+        else:
+            if email:
+                self.counter.hit(('email', email), now)
+            if ip_address:
+                self.counter.hit(('ip', ip_address), now)
+
+        self.writer.add({
+            'user_id': user_id,
+            'email': email,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'successful': successful,
+            'failure_reason': failure_reason,
+            'created_at': datetime.fromtimestamp(now, timezone.utc),
+        })
+
+
+login_throttle = LoginThrottle()
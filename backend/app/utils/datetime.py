@@ -0,0 +1,8 @@
+from datetime import timezone
+
+
+def naive_utc(value):
+    """
+    Convert an aware datetime to UTC and drop its tzinfo; naive values are taken as UTC already.
+    """
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
@@ -0,0 +1,26 @@
+"""Add owner/time range index to events
+
+Revision ID: b4c5d6e7f8a9
+Revises: e3f4a5b6c7d8
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = 'b4c5d6e7f8a9'
+down_revision = 'e3f4a5b6c7d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_events_owner_id_start_time_end_time',
+        'events',
+        ['owner_id', 'start_time', 'end_time'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_events_owner_id_start_time_end_time', table_name='events')
@@ -0,0 +1,26 @@
+"""Index revoked user sessions by revoked_at
+
+Revision ID: c7d8e9f0a1b2
+Revises: b6c7d8e9f0a1
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c7d8e9f0a1b2'
+down_revision = 'b6c7d8e9f0a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_user_sessions_revoked_at', 'user_sessions', ['revoked_at'],
+        unique=False, postgresql_where=sa.text("revoked_at IS NOT NULL")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_user_sessions_revoked_at', table_name='user_sessions')
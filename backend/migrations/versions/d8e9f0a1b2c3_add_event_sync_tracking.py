@@ -0,0 +1,39 @@
+"""Add updated_at to events and event_tombstones table
+
+Revision ID: d8e9f0a1b2c3
+Revises: c6d7e8f9a0b1
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd8e9f0a1b2c3'
+down_revision = 'c6d7e8f9a0b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('events', sa.Column(
+        'updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False
+    ))
+
+    op.create_table('event_tombstones',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_event_tombstones_user_id_deleted_at', 'event_tombstones', ['user_id', 'deleted_at']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_event_tombstones_user_id_deleted_at', table_name='event_tombstones')
+    op.drop_table('event_tombstones')
+    op.drop_column('events', 'updated_at')
@@ -0,0 +1,43 @@
+"""Store both times of moved occurrences and index them
+
+Revision ID: d9e0f1a2b3c4
+Revises: c7d8e9f0a1b2
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd9e0f1a2b3c4'
+down_revision = 'c7d8e9f0a1b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        UPDATE event_exceptions AS exception
+        SET start_time = coalesce(exception.start_time, exception.original_start),
+            end_time = coalesce(
+                exception.end_time,
+                coalesce(exception.start_time, exception.original_start) + (events.end_time - events.start_time)
+            )
+        FROM events
+        WHERE events.id = exception.event_id
+          AND (exception.start_time IS NULL) <> (exception.end_time IS NULL)
+        """
+    )
+    op.create_check_constraint(
+        'ck_event_exceptions_moved_times', 'event_exceptions', '(start_time IS NULL) = (end_time IS NULL)'
+    )
+    op.create_index(
+        'ix_event_exceptions_moved', 'event_exceptions', ['start_time', 'end_time'],
+        unique=False, postgresql_where=sa.text("start_time IS NOT NULL AND NOT is_cancelled")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_event_exceptions_moved', table_name='event_exceptions')
+    op.drop_constraint('ck_event_exceptions_moved_times', 'event_exceptions', type_='check')
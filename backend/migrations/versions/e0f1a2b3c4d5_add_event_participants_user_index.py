@@ -0,0 +1,22 @@
+"""Add user_id index to event_participants
+
+Revision ID: e0f1a2b3c4d5
+Revises: d8e9f0a1b2c3
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = 'e0f1a2b3c4d5'
+down_revision = 'd8e9f0a1b2c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_event_participants_user_id', 'event_participants', ['user_id'])
+
+
+def downgrade():
+    op.drop_index('ix_event_participants_user_id', table_name='event_participants')
@@ -0,0 +1,46 @@
+"""Add recurrence to events and event_exceptions table
+
+Revision ID: f2a3b4c5d6e7
+Revises: e0f1a2b3c4d5
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'f2a3b4c5d6e7'
+down_revision = 'e0f1a2b3c4d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('events', sa.Column('recurrence_rule', sa.String(length=255), nullable=True))
+    op.add_column('events', sa.Column('recurrence_end', sa.DateTime(), nullable=True))
+
+    op.create_table('event_exceptions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('original_start', sa.DateTime(), nullable=False),
+    sa.Column('is_cancelled', sa.Boolean(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=True),
+    sa.Column('end_time', sa.DateTime(), nullable=True),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ux_event_exceptions_event_id_original_start', 'event_exceptions',
+        ['event_id', 'original_start'], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('ux_event_exceptions_event_id_original_start', table_name='event_exceptions')
+    op.drop_table('event_exceptions')
+    op.drop_column('events', 'recurrence_end')
+    op.drop_column('events', 'recurrence_rule')
@@ -1,4 +1,5 @@
 import os
+import click
 from flask import Flask, jsonify
 from flask_cors import CORS
 from sqlalchemy import text
@@ -6,6 +7,8 @@ from app.extensions import db, migrate, jwt, mail
 from app.models import User
 from datetime import timedelta
 from flasgger import Swagger
+from app.services.password_service import DEFAULT_HASH_WORKERS, DEFAULT_HASH_QUEUE_DEPTH, DEFAULT_HASH_TIMEOUT
+from app.services.calendar_service import DEFAULT_SYNC_TOKEN_RETENTION_DAYS
 
 def create_app(config_overrides=None):
     app = Flask(__name__)
@@ -60,6 +63,7 @@ def create_app(config_overrides=None):
     app.config['JWT_COOKIE_SAMESITE'] = 'Lax'
     app.config['JWT_REFRESH_COOKIE_NAME'] = 'refresh_token_cookie'
     app.config['JWT_COOKIE_SECURE'] = False
+    app.config['AUTHORIZE_FROM_JWT_CLAIMS'] = os.environ.get('AUTHORIZE_FROM_JWT_CLAIMS', 'false').lower() == 'true'
 
     # Updated Mail configuration
     app.config['MAIL_SERVER'] = 'smtp.gmail.com'
@@ -70,6 +74,15 @@ def create_app(config_overrides=None):
     app.config['MAIL_PASSWORD'] = 'iflqwsskvjlsboia'
     app.config['MAIL_DEFAULT_SENDER'] = 'adamczykjan166@gmail.com'
     app.config['TESTING'] = False  # This prevents actual sending
+    app.config['PASSWORD_HASH_TIME_COST'] = int(os.environ.get('PASSWORD_HASH_TIME_COST', 3))
+    app.config['PASSWORD_HASH_MEMORY_COST'] = int(os.environ.get('PASSWORD_HASH_MEMORY_COST', 65536))
+    app.config['PASSWORD_HASH_PARALLELISM'] = int(os.environ.get('PASSWORD_HASH_PARALLELISM', 4))
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', DEFAULT_HASH_WORKERS))
+    app.config['PASSWORD_HASH_QUEUE_DEPTH'] = int(os.environ.get('PASSWORD_HASH_QUEUE_DEPTH', DEFAULT_HASH_QUEUE_DEPTH))
+    app.config['PASSWORD_HASH_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_TIMEOUT', DEFAULT_HASH_TIMEOUT))
+    app.config['LOGIN_ATTEMPT_WRITER_ENABLED'] = os.environ.get('LOGIN_ATTEMPT_WRITER_ENABLED', 'true').lower() == 'true'
+    app.config['SYNC_TOKEN_RETENTION_DAYS'] = int(os.environ.get('SYNC_TOKEN_RETENTION_DAYS', DEFAULT_SYNC_TOKEN_RETENTION_DAYS))
+    app.config['EMAIL_DISPATCHER_ENABLED'] = os.environ.get('EMAIL_DISPATCHER_ENABLED', 'true').lower() == 'true'
 
     jwt.init_app(app)
 
@@ -84,9 +97,11 @@ def create_app(config_overrides=None):
 
     from app.routes.auth_routes import auth_bp
     from app.routes.calendar_routes import calendar_bp
+    from app.routes.availability_routes import availability_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(calendar_bp)
+    app.register_blueprint(availability_bp)
 
     @app.route("/api/test-db")
     def health():
@@ -115,6 +130,15 @@ def create_app(config_overrides=None):
     register_cli_commands(app)
 
     mail.init_app(app)
+
+    from app.services.email_service import email_dispatcher
+    email_dispatcher.init_app(app)
+
+    from app.services.throttle_service import login_throttle
+    login_throttle.init_app(app)
+
+    from app.services.password_service import hashing_pool
+    hashing_pool.init_app(app)
     
     return app
 
@@ -122,7 +146,7 @@ def create_app(config_overrides=None):
 def register_cli_commands(app):
     from flask.cli import with_appcontext
     from app.models import User, Role, UserProfile, UserSettings
-    from werkzeug.security import generate_password_hash
+    from app.services.password_service import PASSWORD_ALGORITHM, hash_password
 
     @app.cli.command("seed-demo")
     @with_appcontext
@@ -152,8 +176,8 @@ def register_cli_commands(app):
 
             new_user = User()
             new_user.email = u["email"]
-            new_user.password_hash = generate_password_hash("demo123")
-            new_user.password_algorithm = "pbkdf2:sha256"
+            new_user.password_hash = hash_password("demo123")
+            new_user.password_algorithm = PASSWORD_ALGORITHM
             new_user.is_email_verified = True
             new_user.is_active = True
             db.session.add(new_user)
@@ -181,6 +205,36 @@ def register_cli_commands(app):
 
         db.session.commit()
 
+    @app.cli.command("send-emails")
+    @with_appcontext
+    def send_emails():
+        """Send all due messages from the email outbox."""
+        from app.services.email_service import drain_outbox
+
+        click.echo(f"Attempted {drain_outbox()} emails")
+
+    @app.cli.command("prune-tombstones")
+    @with_appcontext
+    def prune_tombstones():
+        """Delete event tombstones older than the sync token retention."""
+        from app.services.calendar_service import prune_event_tombstones
+
+        click.echo(f"Deleted {prune_event_tombstones()} tombstones")
+
+    @app.cli.command("calibrate-password-hash")
+    @click.option("--target-ms", default=250, show_default=True, help="Target hashing time per login.")
+    @click.option("--memory-kib", default=65536, show_default=True, help="Starting memory cost in KiB.")
+    @click.option("--parallelism", default=4, show_default=True)
+    def calibrate_password_hash(target_ms, memory_kib, parallelism):
+        """Measure argon2id on this machine and suggest PASSWORD_HASH_* settings."""
+        from app.services.password_service import calibrate
+
+        profile = calibrate(target_ms, memory_kib, parallelism)
+        click.echo(f"Median hash time: {profile['median_ms']} ms")
+        click.echo(f"PASSWORD_HASH_TIME_COST={profile['time_cost']}")
+        click.echo(f"PASSWORD_HASH_MEMORY_COST={profile['memory_cost']}")
+        click.echo(f"PASSWORD_HASH_PARALLELISM={profile['parallelism']}")
+
 
 app = create_app()
 
@@ -2,7 +2,11 @@ import pytest
 import os
 from run import create_app
 from app.extensions import db as _db
-from app.models import User
+from datetime import datetime
+from app.models import Event, EventParticipant, User
+from app.middleware.principal_cache import invalidate_all_principals
+from app.middleware.revocation import revoked_tokens
+from app.services.throttle_service import login_throttle
 from werkzeug.security import generate_password_hash
 
 @pytest.fixture(scope='function')
@@ -14,6 +18,9 @@ def app():
     os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
     app = create_app()
     app.config['TESTING'] = True
+    invalidate_all_principals()
+    revoked_tokens.clear()
+    login_throttle.counter.clear()
    
     with app.app_context():
         _db.create_all()
@@ -28,8 +35,9 @@ def session(app):
         connection = _db.engine.connect()
         transaction = connection.begin()
         
-        # Override the session to use this connection
-        session_options = dict(bind=connection, binds={})
+        # Override the session to use this connection; commits and rollbacks
+        # in the code under test only release or roll back a SAVEPOINT
+        session_options = dict(bind=connection, binds={}, join_transaction_mode='create_savepoint')
         session = _db._make_scoped_session(options=session_options)
         
         # Replace the db.session with our test session
@@ -57,3 +65,71 @@ def user(session):
     session.flush()
     session.refresh(new_user)
     return new_user
+
+
+@pytest.fixture
+def test_participants(session):
+    """Create three more users to invite to events."""
+    participants = []
+    for i in range(3):
+        participant = User()
+        participant.email = f'participant{i}@test.com'
+        participant.password_hash = generate_password_hash(f'participant{i}')
+        participant.password_algorithm = 'pbkdf2:sha256'
+        participant.is_email_verified = True
+        participant.is_active = True
+        session.add(participant)
+        participants.append(participant)
+    session.flush()
+    for participant in participants:
+        session.refresh(participant)
+    return participants
+
+
+@pytest.fixture
+def add_events(session):
+    """
+    Factory adding one-hour events on consecutive days from 2024-06-01; returns their ids.
+
+    The events are committed, so a rollback in the code under test keeps them.
+    """
+
+    def add(owner, participants=(), count=3):
+        events = [
+            Event(
+                title=f'Event {i}',
+                start_time=datetime(2024, 6, 1 + i, 9, 0),
+                end_time=datetime(2024, 6, 1 + i, 10, 0),
+                owner_id=owner.id,
+            )
+            for i in range(count)
+        ]
+        session.add_all(events)
+        session.flush()
+        session.add_all(
+            EventParticipant(event_id=event.id, user_id=participant.id)
+            for event in events for participant in participants
+        )
+        session.flush()
+        ids = [event.id for event in events]
+        session.commit()
+        return ids
+
+    return add
+
+
+@pytest.fixture
+def auth_token(user, app):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity=user.id)
+    return token
+
+
+@pytest.fixture
+def auth_headers(auth_token):
+    return {
+        'Authorization': f'Bearer {auth_token}',
+        'Content-Type': 'application/json'
+    }
@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from flask import Flask, g
+from app.middleware.auth_decorators import require_event_access
+from app.middleware.principal_cache import Principal
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    with app.test_request_context():
+        yield app
+
+
+def _call(principal, found, **decorator_kwargs):
+    @require_event_access('event_id', **decorator_kwargs)
+    def view(event_id):
+        return 'ok', 200
+
+    with patch('app.middleware.auth_decorators.verify_jwt_in_request'), \
+            patch('app.middleware.auth_decorators.get_jwt_identity', return_value=str(principal.id)), \
+            patch('app.middleware.auth_decorators.resolve_principal', return_value=principal), \
+            patch('app.middleware.auth_decorators.get_event_with_access', return_value=found) as mock_access:
+        result = view(event_id=5)
+
+    mock_access.assert_called_once()
+    status = result[1]
+    return status
+
+
+def principal(roles=()):
+    return Principal('u1', True, True, frozenset(roles))
+
+
+class TestRequireEventAccess:
+    """Unit tests for the single-query event access decorator"""
+
+    def test_owner_allowed(self, app):
+        event = MagicMock()
+
+        assert _call(principal(), (event, True, False)) == 200
+        assert g.current_resource is event
+
+    def test_participant_needs_flag(self, app):
+        assert _call(principal(), (MagicMock(), False, True)) == 403
+        assert _call(principal(), (MagicMock(), False, True), allow_participants=True) == 200
+
+    def test_admin_allowed(self, app):
+        assert _call(principal(['admin']), (MagicMock(), False, False)) == 200
+
+    def test_missing_event(self, app):
+        assert _call(principal(), None) == 404
+
+    def test_owner_only(self, app):
+        assert _call(principal(['admin']), (MagicMock(), False, False), roles=[]) == 403
+        assert _call(principal(), (MagicMock(), False, True), roles=[]) == 403
+        assert _call(principal(), (MagicMock(), True, False), roles=[]) == 200
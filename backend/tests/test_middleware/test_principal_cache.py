@@ -0,0 +1,197 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from app.middleware.principal_cache import (
+    PrincipalCache, Principal, get_principal, principal_cache, principal_claims, principal_from_claims)
+from app.models import User, Role, UserRole
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def principal(user_id, roles=()):
+    return Principal(user_id, True, True, frozenset(roles))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestPrincipalCache:
+    """Unit tests for the LRU/TTL principal cache"""
+
+    def test_hit_and_miss(self, clock):
+        cache = PrincipalCache(maxsize=2, ttl=10, clock=clock)
+        cache.put(principal('a'))
+
+        assert cache.get('a').id == 'a'
+        assert cache.get('b') is None
+
+    def test_entries_expire(self, clock):
+        cache = PrincipalCache(maxsize=2, ttl=10, clock=clock)
+        cache.put(principal('a'))
+
+        clock.now = 10
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_evicted(self, clock):
+        cache = PrincipalCache(maxsize=2, ttl=10, clock=clock)
+        cache.put(principal('a'))
+        cache.put(principal('b'))
+        cache.get('a')
+        cache.put(principal('c'))
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None and cache.get('c') is not None
+
+    def test_keys_normalized_to_strings(self, clock):
+        cache = PrincipalCache(ttl=10, clock=clock)
+        cache.put(principal(123))
+        cache.invalidate('123')
+
+        assert cache.get(123) is None
+
+
+class TestGetPrincipal:
+    """Unit tests for cache-through principal loading"""
+
+    def setup_method(self):
+        principal_cache.clear()
+
+    def teardown_method(self):
+        principal_cache.clear()
+
+    @patch('app.middleware.principal_cache.fetch_principal')
+    def test_loaded_once(self, mock_fetch):
+        mock_fetch.return_value = principal('u1', ['admin'])
+
+        assert get_principal('u1').roles == {'admin'}
+        assert get_principal('u1').roles == {'admin'}
+        mock_fetch.assert_called_once_with('u1')
+
+    @patch('app.middleware.principal_cache.fetch_principal')
+    def test_missing_user_not_cached(self, mock_fetch):
+        mock_fetch.return_value = None
+
+        assert get_principal('ghost') is None
+        assert get_principal('ghost') is None
+        assert mock_fetch.call_count == 2
+
+
+class TestInvalidationOnCommit:
+    """Unit tests for invalidation when user or role changes are committed"""
+
+    def setup_method(self):
+        principal_cache.clear()
+
+    def _flush(self, session=None, **changes):
+        from app.middleware.principal_cache import _collect_changed_principals
+
+        session = session or MagicMock(info={})
+        session.new = changes.get('new', [])
+        session.dirty = changes.get('dirty', [])
+        session.deleted = changes.get('deleted', [])
+        _collect_changed_principals(session, None)
+        return session
+
+    def _commit(self, session):
+        from app.middleware.principal_cache import _invalidate_committed_principals
+
+        _invalidate_committed_principals(session)
+
+    def test_changed_user_invalidated_on_commit(self):
+        principal_cache.put(principal('u1'))
+        principal_cache.put(principal('u2'))
+        user = User()
+        user.id = 'u1'
+
+        session = self._flush(dirty=[user])
+        assert principal_cache.get('u1') is not None
+
+        self._commit(session)
+        assert principal_cache.get('u1') is None
+        assert principal_cache.get('u2') is not None
+
+    def test_role_assignment_invalidated(self):
+        principal_cache.put(principal('u1'))
+
+        self._commit(self._flush(new=[UserRole(user_id='u1', role_id=1)]))
+
+        assert principal_cache.get('u1') is None
+
+    def test_role_change_clears_everything(self):
+        principal_cache.put(principal('u1'))
+        principal_cache.put(principal('u2'))
+
+        self._commit(self._flush(deleted=[Role(name='admin')]))
+
+        assert len(principal_cache) == 0
+
+    def test_rollback_discards_pending(self):
+        from app.middleware.principal_cache import _discard_pending_principals
+
+        principal_cache.put(principal('u1'))
+        user = User()
+        user.id = 'u1'
+
+        session = self._flush(dirty=[user])
+        _discard_pending_principals(session)
+        self._commit(session)
+
+        assert principal_cache.get('u1') is not None
+
+
+class TestClaims:
+    """Unit tests for principals carried as access-token claims"""
+
+    def test_round_trip(self):
+        claims = principal_claims(Principal('u1', True, False, frozenset({'editor', 'admin'})))
+
+        assert claims == {'roles': ['admin', 'editor'], 'is_active': True, 'is_email_verified': False}
+        rebuilt = principal_from_claims('u1', {**claims, 'sub': 'u1'})
+        assert (rebuilt.id, rebuilt.is_active, rebuilt.is_email_verified) == ('u1', True, False)
+        assert rebuilt.roles == {'admin', 'editor'}
+
+    def test_tokens_without_claims(self):
+        assert principal_from_claims('u1', {'sub': 'u1'}) is None
+
+
+class TestResolvePrincipal:
+    """Unit tests for choosing between token claims and the principal cache"""
+
+    CLAIMS = {'sub': 'u1', 'roles': ['admin'], 'is_active': True, 'is_email_verified': True}
+
+    def _resolve(self, claims_mode, claims):
+        from flask import Flask
+        from app.middleware.auth_decorators import resolve_principal
+
+        app = Flask(__name__)
+        app.config['AUTHORIZE_FROM_JWT_CLAIMS'] = claims_mode
+        with app.app_context(), \
+                patch('app.middleware.auth_decorators.get_jwt', return_value=claims), \
+                patch('app.middleware.auth_decorators.get_principal') as mock_get:
+            mock_get.return_value = principal('u1')
+            return resolve_principal('u1'), mock_get
+
+    def test_claims_mode_skips_lookup(self):
+        resolved, mock_get = self._resolve(True, self.CLAIMS)
+
+        assert resolved.roles == {'admin'}
+        mock_get.assert_not_called()
+
+    def test_claims_mode_falls_back_for_old_tokens(self):
+        resolved, mock_get = self._resolve(True, {'sub': 'u1'})
+
+        mock_get.assert_called_once_with('u1')
+
+    def test_default_mode_uses_cache(self):
+        resolved, mock_get = self._resolve(False, self.CLAIMS)
+
+        assert resolved.roles == frozenset()
+        mock_get.assert_called_once_with('u1')
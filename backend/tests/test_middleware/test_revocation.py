@@ -0,0 +1,172 @@
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+from flask import Flask
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy.exc import OperationalError
+from app.extensions import jwt
+from app.middleware.jwt_callbacks import configure_jwt_callbacks
+from app.middleware.revocation import RevocationSet, is_token_revoked, revoke_token, revoked_tokens
+from app.routes.auth_routes import auth_bp
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def session_row(revoked_minutes_ago, expires_in_days=30):
+    now = datetime.now(timezone.utc)
+    return SimpleNamespace(id=uuid.uuid4(), revoked_at=now - timedelta(minutes=revoked_minutes_ago),
+                           expires_at=now + timedelta(days=expires_in_days))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    with app.app_context():
+        yield app
+
+
+@patch('app.middleware.revocation.db.session')
+class TestRevocationSet:
+    """Unit tests for the in-memory set of revoked refresh tokens"""
+
+    def test_first_lookup_loads_revoked_sessions(self, mock_session, clock, app):
+        row = session_row(10)
+        mock_session.execute.return_value.all.return_value = [row]
+        revoked = RevocationSet(sync_interval=5, clock=clock)
+
+        assert revoked.is_revoked(row.id)
+        assert not revoked.is_revoked(uuid.uuid4())
+        assert mock_session.execute.call_count == 1
+
+    def test_incremental_sync_after_interval(self, mock_session, clock, app):
+        first, second = session_row(10), session_row(1)
+        mock_session.execute.return_value.all.side_effect = [[first], [second]]
+        revoked = RevocationSet(sync_interval=5, clock=clock)
+        revoked.is_revoked(first.id)
+
+        clock.now = 5
+        assert revoked.is_revoked(second.id)
+        assert revoked.is_revoked(first.id)
+
+        query = str(mock_session.execute.call_args.args[0])
+        assert query.count('user_sessions.revoked_at >=') == 1
+
+    def test_local_revocation_visible_immediately(self, mock_session, clock, app):
+        mock_session.execute.return_value.all.return_value = []
+        revoked = RevocationSet(sync_interval=5, clock=clock)
+        revoked.is_revoked('warm-up')
+        jti = uuid.uuid4()
+
+        revoked.add(jti, datetime.now(timezone.utc) + timedelta(days=1))
+
+        assert revoked.is_revoked(str(jti))
+        assert mock_session.execute.call_count == 1
+
+    def test_expired_entries_dropped(self, mock_session, clock, app):
+        mock_session.execute.return_value.all.return_value = []
+        revoked = RevocationSet(sync_interval=5, clock=clock)
+        revoked.add('old', datetime.utcnow() - timedelta(seconds=1))
+
+        revoked.sync()
+
+        assert len(revoked) == 0
+
+    def test_failed_sync_keeps_set(self, mock_session, clock, app):
+        mock_session.execute.side_effect = OperationalError('select', {}, Exception('down'))
+        revoked = RevocationSet(sync_interval=5, clock=clock)
+        revoked.add('jti', datetime.now(timezone.utc) + timedelta(days=1))
+
+        assert revoked.is_revoked('jti')
+        mock_session.rollback.assert_called_once()
+
+
+class TestBlocklistCheck:
+    """Unit tests for the token_in_blocklist_loader check"""
+
+    def test_access_tokens_not_checked(self):
+        with patch.object(revoked_tokens, 'is_revoked') as mock_revoked:
+            assert not is_token_revoked({'type': 'access', 'jti': 'a'})
+        mock_revoked.assert_not_called()
+
+    def test_refresh_tokens_checked(self):
+        with patch.object(revoked_tokens, 'is_revoked', return_value=True) as mock_revoked:
+            assert is_token_revoked({'type': 'refresh', 'jti': 'r'})
+        mock_revoked.assert_called_once_with('r')
+
+
+@pytest.fixture
+def auth_app():
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret'
+    app.config['JWT_TOKEN_LOCATION'] = ["headers", "cookies"]
+    app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+    jwt.init_app(app)
+    configure_jwt_callbacks()
+    app.register_blueprint(auth_bp)
+    revoked_tokens.clear()
+    with patch.object(revoked_tokens, 'is_stale', return_value=False):
+        yield app
+    revoked_tokens.clear()
+
+
+def _revoke_for_a_day(jti):
+    revoke_token(jti, datetime.now(timezone.utc) + timedelta(days=1))
+
+
+@patch('app.routes.auth_routes.revoke_session', side_effect=_revoke_for_a_day)
+class TestLogout:
+    """Logout revokes the session behind the refresh token"""
+
+    def _tokens(self, app):
+        jti = uuid.uuid4()
+        with app.app_context():
+            refresh = create_refresh_token(identity='1', additional_claims={'jti': str(jti)})
+            access = create_access_token(identity='1')
+        return jti, refresh, access
+
+    def test_refresh_token_rejected_after_logout(self, mock_revoke, auth_app):
+        jti, refresh, access = self._tokens(auth_app)
+        client = auth_app.test_client()
+        client.set_cookie('refresh_token_cookie', refresh)
+
+        response = client.post('/api/auth/logout', headers={'Authorization': f'Bearer {access}'})
+
+        assert response.status_code == 200
+        mock_revoke.assert_called_once_with(jti)
+        client.set_cookie('refresh_token_cookie', refresh)
+        replay = client.post('/api/auth/refresh')
+        assert replay.status_code == 401
+        assert replay.get_json()['error'] == 'token_revoked'
+
+    def test_access_token_alone_revokes_nothing(self, mock_revoke, auth_app):
+        _, _, access = self._tokens(auth_app)
+
+        response = auth_app.test_client().post('/api/auth/logout', headers={'Authorization': f'Bearer {access}'})
+
+        assert response.status_code == 200
+        mock_revoke.assert_not_called()
+
+    def test_logout_twice_still_clears_cookies(self, mock_revoke, auth_app):
+        _, refresh, _ = self._tokens(auth_app)
+        client = auth_app.test_client()
+        client.set_cookie('refresh_token_cookie', refresh)
+        client.post('/api/auth/logout')
+        client.set_cookie('refresh_token_cookie', refresh)
+
+        response = client.post('/api/auth/logout')
+
+        assert response.status_code == 200
+        assert 'refresh_token_cookie=;' in ' '.join(response.headers.getlist('Set-Cookie'))
@@ -103,9 +103,9 @@ class TestEventModel:
         session.add(participant)
         session.flush()
 
-        assert event.participant_links.count() == 1
-        
-        assert event.participant_links.first().user_id == user.id
+        assert len(event.participant_links) == 1
+
+        assert event.participant_links[0].user_id == user.id
 
 
 class TestEventParticipantModel:
@@ -0,0 +1,91 @@
+from datetime import datetime
+from app.models import Event, EventParticipant
+
+
+class TestFreeBusyEndpoint:
+
+    def test_free_busy_merges_owned_and_joined_events(self, client, auth_headers, user, session):
+        owned = Event(
+            title='Owned',
+            start_time=datetime(2024, 6, 15, 10, 30),
+            end_time=datetime(2024, 6, 15, 12, 0),
+            owner_id=user.id,
+        )
+        joined = Event(
+            title='Joined',
+            start_time=datetime(2024, 6, 15, 9, 0),
+            end_time=datetime(2024, 6, 15, 11, 0),
+            owner_id=user.id,
+        )
+        cancelled = Event(
+            title='Cancelled',
+            start_time=datetime(2024, 6, 15, 14, 0),
+            end_time=datetime(2024, 6, 15, 15, 0),
+            status='cancelled',
+            owner_id=user.id,
+        )
+        session.add_all([owned, joined, cancelled])
+        session.flush()
+        session.add(EventParticipant(event_id=joined.id, user_id=user.id))
+        session.flush()
+
+        response = client.post(
+            '/api/availability/freebusy',
+            json={'user_ids': [str(user.id)], 'from': '2024-06-15T00:00:00', 'to': '2024-06-16T00:00:00'},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()['busy'] == {
+            str(user.id): [{'start': '2024-06-15T09:00:00', 'end': '2024-06-15T12:00:00'}]
+        }
+
+    def test_free_busy_requires_window(self, client, auth_headers, user):
+        response = client.post(
+            '/api/availability/freebusy',
+            json={'user_ids': [str(user.id)], 'from': '2024-06-15T00:00:00'},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
+
+class TestCommonSlotsEndpoint:
+
+    def test_slots_respect_busy_time_and_working_hours(self, client, auth_headers, user, session):
+        session.add(Event(
+            title='Morning',
+            start_time=datetime(2024, 6, 14, 9, 0),
+            end_time=datetime(2024, 6, 14, 10, 30),
+            owner_id=user.id,
+        ))
+        session.flush()
+
+        response = client.post(
+            '/api/availability/slots',
+            json={
+                'user_ids': [str(user.id)],
+                'duration_minutes': 60,
+                'from': '2024-06-14T00:00:00',
+                'to': '2024-06-18T00:00:00',
+                'count': 2,
+                'working_hours': {'start': '09:00', 'end': '12:00'},
+            },
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()['slots'] == [
+            {'start': '2024-06-14T10:30:00', 'end': '2024-06-14T11:30:00'},
+            {'start': '2024-06-17T09:00:00', 'end': '2024-06-17T10:00:00'},
+        ]
+
+    def test_slots_invalid_duration(self, client, auth_headers, user):
+        response = client.post(
+            '/api/availability/slots',
+            json={'user_ids': [str(user.id)], 'duration_minutes': 'long',
+                  'from': '2024-06-14T00:00:00', 'to': '2024-06-18T00:00:00'},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
@@ -1,41 +1,10 @@
+import io
 import pytest
-from app.models import Event, User
-
-
-
-@pytest.fixture
-def test_participants(session):
-    participants = []
-    for i in range(3):
-        user = User()
-        user.email = f'participant{i}@test.com'
-        user.password_hash = 'hashed_password'
-        user.password_algorithm = 'pbkdf2:sha256'
-        user.is_email_verified = True
-        user.is_active = True
-        session.add(user)
-        participants.append(user)
-    session.flush()
-    for p in participants:
-        session.refresh(p)
-    return participants
-
-
-@pytest.fixture
-def auth_token(user, app):
-    from flask_jwt_extended import create_access_token
-
-    with app.app_context():
-        token = create_access_token(identity=user.id)
-    return token
-
-
-@pytest.fixture
-def auth_headers(auth_token):
-    return {
-        'Authorization': f'Bearer {auth_token}',
-        'Content-Type': 'application/json'
-    }
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event as sa_event
+from app.extensions import db
+from app.models import Event, EventParticipant, EventTombstone
+from app.services.calendar_service import encode_sync_token, prune_event_tombstones
 
 
 @pytest.fixture
@@ -116,4 +85,857 @@ class TestUpdateEventEndpointIntegration:
             headers=auth_headers
         )
 
-        assert response.status_code == 400
\ No newline at end of file
+        assert response.status_code == 400
+
+@pytest.fixture
+def month_events(client, auth_headers):
+    events = []
+    for title, start, end in [
+        ('May Event', '2024-05-20T10:00:00', '2024-05-20T11:00:00'),
+        ('June Event', '2024-06-15T10:00:00', '2024-06-15T11:00:00'),
+        ('Spanning Event', '2024-06-30T22:00:00', '2024-07-01T02:00:00'),
+        ('July Event', '2024-07-10T10:00:00', '2024-07-10T11:00:00'),
+    ]:
+        response = client.post(
+            '/api/calendar/events/create',
+            json={'title': title, 'start_time': start, 'end_time': end},
+            headers=auth_headers
+        )
+        assert response.status_code == 201
+        events.append(response.get_json())
+    return events
+
+
+class TestGetEventsEndpointIntegration:
+
+    def test_get_events_without_range_returns_all(self, client, auth_headers, month_events):
+        response = client.get('/api/calendar/events/', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert len(response.get_json()) == len(month_events)
+
+    def test_get_events_in_range(self, client, auth_headers, month_events):
+        response = client.get(
+            '/api/calendar/events/?from=2024-06-01T00:00:00&to=2024-07-01T00:00:00',
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        titles = [event['title'] for event in response.get_json()]
+        assert titles == ['June Event', 'Spanning Event']
+
+    def test_get_events_open_ended_range(self, client, auth_headers, month_events):
+        response = client.get(
+            '/api/calendar/events/?from=2024-07-01T00:00:00',
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        titles = [event['title'] for event in response.get_json()]
+        assert titles == ['Spanning Event', 'July Event']
+
+    def test_get_events_includes_participations(self, client, auth_headers, user, test_participants, add_events):
+        add_events(test_participants[0], [user], count=1)
+
+        response = client.get(
+            '/api/calendar/events/?from=2024-06-01T00:00:00&to=2024-07-01T00:00:00',
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert [e['title'] for e in response.get_json()] == ['Event 0']
+
+    def test_get_events_paginated(self, client, auth_headers, month_events):
+        titles = []
+        cursor = None
+        pages = 0
+
+        while True:
+            url = '/api/calendar/events/?limit=3'
+            if cursor:
+                url += f'&cursor={cursor}'
+            response = client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+
+            body = response.get_json()
+            titles.extend(event['title'] for event in body['data'])
+            cursor = body['next_cursor']
+            pages += 1
+            if cursor is None:
+                break
+
+        assert pages == 2
+        assert titles == ['May Event', 'June Event', 'Spanning Event', 'July Event']
+
+    def test_get_events_invalid_cursor(self, client, auth_headers):
+        response = client.get('/api/calendar/events/?cursor=garbage', headers=auth_headers)
+
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Invalid cursor'
+
+    def test_get_events_stream(self, client, auth_headers, month_events):
+        response = client.get(
+            '/api/calendar/events/?stream=true&from=2024-06-01T00:00:00',
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        titles = [event['title'] for event in response.get_json()]
+        assert titles == ['June Event', 'Spanning Event', 'July Event']
+
+    def test_get_events_stream_with_pagination(self, client, auth_headers):
+        response = client.get('/api/calendar/events/?stream=true&limit=10', headers=auth_headers)
+
+        assert response.status_code == 400
+
+    def test_get_events_invalid_date(self, client, auth_headers):
+        response = client.get('/api/calendar/events/?from=not-a-date', headers=auth_headers)
+
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Invalid date format'
+
+    def test_get_events_inverted_range(self, client, auth_headers):
+        response = client.get(
+            '/api/calendar/events/?from=2024-07-01T00:00:00&to=2024-06-01T00:00:00',
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
+
+@pytest.fixture
+def query_counter(app):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sa_event.listen(db.engine, 'before_cursor_execute', count)
+    yield statements
+    sa_event.remove(db.engine, 'before_cursor_execute', count)
+
+
+class TestGetEventsQueryCount:
+
+    def _count_listing_queries(self, client, auth_headers, query_counter):
+        query_counter.clear()
+        response = client.get('/api/calendar/events/', headers=auth_headers)
+        assert response.status_code == 200
+        return len(query_counter), response.get_json()
+
+    def test_query_count_independent_of_event_count(
+        self, client, auth_headers, user, test_participants, add_events, query_counter
+    ):
+        add_events(user, test_participants, count=2)
+        small_count, small_data = self._count_listing_queries(client, auth_headers, query_counter)
+
+        add_events(user, test_participants, count=10)
+        large_count, large_data = self._count_listing_queries(client, auth_headers, query_counter)
+
+        assert len(small_data) == 2
+        assert len(large_data) == 12
+        assert all(len(event['participants']) == 3 for event in large_data)
+        assert large_count == small_count
+
+
+    def test_principal_cached_between_requests(self, client, auth_headers, created_event, query_counter):
+        url = f"/api/calendar/events/{created_event['id']}"
+        client.patch(url, json={'title': 'First'}, headers=auth_headers)
+
+        query_counter.clear()
+        response = client.patch(url, json={'title': 'Second'}, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert not [statement for statement in query_counter if 'user_roles' in statement]
+
+
+class TestEventsETag:
+
+    def test_list_not_modified(self, client, auth_headers, created_event):
+        first = client.get('/api/calendar/events/', headers=auth_headers)
+        assert first.status_code == 200
+        etag = first.headers['ETag']
+
+        second = client.get(
+            '/api/calendar/events/',
+            headers={**auth_headers, 'If-None-Match': etag}
+        )
+
+        assert second.status_code == 304
+        assert second.headers['ETag'] == etag
+
+    def test_list_etag_changes_after_create(self, client, auth_headers, created_event):
+        etag = client.get('/api/calendar/events/', headers=auth_headers).headers['ETag']
+
+        client.post(
+            '/api/calendar/events/create',
+            json={'title': 'Another', 'start_time': '2024-06-16T10:00:00', 'end_time': '2024-06-16T11:00:00'},
+            headers=auth_headers
+        )
+        response = client.get(
+            '/api/calendar/events/',
+            headers={**auth_headers, 'If-None-Match': etag}
+        )
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert len(response.get_json()) == 2
+
+    def test_list_etag_depends_on_query(self, client, auth_headers, created_event):
+        etag = client.get('/api/calendar/events/', headers=auth_headers).headers['ETag']
+
+        response = client.get(
+            '/api/calendar/events/?from=2024-06-15T00:00:00',
+            headers={**auth_headers, 'If-None-Match': etag}
+        )
+
+        assert response.status_code == 200
+
+    def test_event_etag_changes_after_patch(self, client, auth_headers, created_event):
+        event_id = created_event['id']
+        etag = client.get(f'/api/calendar/events/{event_id}', headers=auth_headers).headers['ETag']
+
+        not_modified = client.get(
+            f'/api/calendar/events/{event_id}',
+            headers={**auth_headers, 'If-None-Match': etag}
+        )
+        assert not_modified.status_code == 304
+
+        client.patch(f'/api/calendar/events/{event_id}', json={'title': 'Renamed'}, headers=auth_headers)
+        response = client.get(
+            f'/api/calendar/events/{event_id}',
+            headers={**auth_headers, 'If-None-Match': etag}
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()['title'] == 'Renamed'
+
+    def test_event_not_modified_skips_full_load(self, client, auth_headers, created_event, query_counter):
+        url = f"/api/calendar/events/{created_event['id']}"
+        etag = client.get(url, headers=auth_headers).headers['ETag']
+
+        query_counter.clear()
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert len([statement for statement in query_counter if 'FROM events' in statement]) == 1
+        assert not [statement for statement in query_counter if 'events.title' in statement or 'users' in statement]
+
+    def test_list_not_modified_skips_user_lookup(self, client, auth_headers, created_event, query_counter):
+        etag = client.get('/api/calendar/events/', headers=auth_headers).headers['ETag']
+
+        query_counter.clear()
+        response = client.get('/api/calendar/events/', headers={**auth_headers, 'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert query_counter and all('calendar_versions' in statement for statement in query_counter)
+
+
+class TestEventsChangesEndpoint:
+
+    def test_initial_sync_returns_all_events(self, client, auth_headers, created_event):
+        response = client.get('/api/calendar/events/changes', headers=auth_headers)
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert [event['id'] for event in body['updated']] == [created_event['id']]
+        assert body['deleted'] == []
+        assert body['next_since']
+
+    def test_deleted_event_reported_as_tombstone(self, client, auth_headers, created_event):
+        token = client.get('/api/calendar/events/changes', headers=auth_headers).get_json()['next_since']
+
+        client.delete(f"/api/calendar/events/{created_event['id']}", headers=auth_headers)
+        response = client.get(f'/api/calendar/events/changes?since={token}', headers=auth_headers)
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body['updated'] == []
+        assert body['deleted'] == [created_event['id']]
+
+    def test_removed_participant_receives_tombstone(
+        self, client, auth_headers, created_event, test_participants, app
+    ):
+        from flask_jwt_extended import create_access_token
+
+        participant = test_participants[0]
+        event_id = created_event['id']
+        client.patch(
+            f'/api/calendar/events/{event_id}',
+            json={'participant_ids': [str(participant.id)]},
+            headers=auth_headers
+        )
+
+        participant_headers = {'Authorization': f'Bearer {create_access_token(identity=str(participant.id))}'}
+        token = client.get('/api/calendar/events/changes', headers=participant_headers).get_json()['next_since']
+
+        client.patch(f'/api/calendar/events/{event_id}', json={'participant_ids': []}, headers=auth_headers)
+        body = client.get(f'/api/calendar/events/changes?since={token}', headers=participant_headers).get_json()
+
+        assert body['updated'] == []
+        assert body['deleted'] == [event_id]
+
+    def test_invalid_token(self, client, auth_headers):
+        response = client.get('/api/calendar/events/changes?since=@@@', headers=auth_headers)
+
+        assert response.status_code == 400
+
+    def test_naive_token_rejected(self, client, auth_headers):
+        token = encode_sync_token(datetime(2024, 1, 1))
+
+        response = client.get(f'/api/calendar/events/changes?since={token}', headers=auth_headers)
+
+        assert response.status_code == 400
+
+    def test_token_older_than_retention_gone(self, client, auth_headers, app):
+        token = encode_sync_token(
+            datetime.now(timezone.utc) - timedelta(days=app.config['SYNC_TOKEN_RETENTION_DAYS'] + 1)
+        )
+
+        response = client.get(f'/api/calendar/events/changes?since={token}', headers=auth_headers)
+
+        assert response.status_code == 410
+        assert response.get_json()['error'] == 'Sync token expired'
+
+    def test_old_tombstones_pruned(self, user, session, app):
+        now = datetime.now(timezone.utc)
+        retention = timedelta(days=app.config['SYNC_TOKEN_RETENTION_DAYS'])
+        session.add_all([
+            EventTombstone(event_id=1, user_id=user.id, deleted_at=now - retention - timedelta(days=1)),
+            EventTombstone(event_id=2, user_id=user.id, deleted_at=now - retention + timedelta(days=1)),
+        ])
+        session.flush()
+
+        assert prune_event_tombstones() == 1
+        assert [tombstone.event_id for tombstone in EventTombstone.query.all()] == [2]
+
+
+class TestConflictDetection:
+
+    def test_create_overlapping_event_rejected(self, client, auth_headers, created_event):
+        response = client.post(
+            '/api/calendar/events/create',
+            json={
+                'title': 'Overlap',
+                'start_time': '2024-06-15T10:30:00',
+                'end_time': '2024-06-15T11:30:00',
+                'check_conflicts': True
+            },
+            headers=auth_headers
+        )
+
+        assert response.status_code == 409
+        conflicts = response.get_json()['conflicts']
+        assert [conflict['event_id'] for conflict in conflicts] == [created_event['id']]
+
+    def test_create_overlapping_event_without_check(self, client, auth_headers, created_event):
+        response = client.post(
+            '/api/calendar/events/create',
+            json={'title': 'Overlap', 'start_time': '2024-06-15T10:30:00', 'end_time': '2024-06-15T11:30:00'},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 201
+
+    def test_create_adjacent_event_allowed(self, client, auth_headers, created_event):
+        response = client.post(
+            '/api/calendar/events/create',
+            json={
+                'title': 'Right after',
+                'start_time': '2024-06-15T11:00:00',
+                'end_time': '2024-06-15T12:00:00',
+                'check_conflicts': True
+            },
+            headers=auth_headers
+        )
+
+        assert response.status_code == 201
+
+    def test_participant_conflict_reported(self, client, auth_headers, test_participants, add_events):
+        participant = test_participants[0]
+        add_events(participant, count=1)
+
+        response = client.post(
+            '/api/calendar/events/create',
+            json={
+                'title': 'Invite',
+                'start_time': '2024-06-01T09:30:00',
+                'end_time': '2024-06-01T10:30:00',
+                'participant_ids': [str(participant.id)],
+                'check_conflicts': True
+            },
+            headers=auth_headers
+        )
+
+        assert response.status_code == 409
+        assert response.get_json()['conflicts'][0]['user_id'] == str(participant.id)
+
+    def test_patch_into_conflict_rejected(self, client, auth_headers, created_event):
+        other = client.post(
+            '/api/calendar/events/create',
+            json={'title': 'Later', 'start_time': '2024-06-15T13:00:00', 'end_time': '2024-06-15T14:00:00'},
+            headers=auth_headers
+        ).get_json()
+
+        response = client.patch(
+            f"/api/calendar/events/{other['id']}",
+            json={'start_time': '2024-06-15T10:45:00', 'check_conflicts': True},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 409
+
+
+@pytest.fixture
+def weekly_event(client, auth_headers):
+    response = client.post(
+        '/api/calendar/events/create',
+        json={
+            'title': 'Weekly Sync',
+            'start_time': '2024-06-03T10:00:00',
+            'end_time': '2024-06-03T11:00:00',
+            'recurrence_rule': 'FREQ=WEEKLY;BYDAY=MO'
+        },
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+    return response.get_json()
+
+
+class TestRecurringEvents:
+
+    def test_series_expanded_within_window(self, client, auth_headers, weekly_event):
+        response = client.get(
+            '/api/calendar/events/?from=2025-01-01T00:00:00&to=2025-01-15T00:00:00',
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        occurrences = response.get_json()
+        assert [o['start_time'] for o in occurrences] == ['2025-01-06T10:00:00', '2025-01-13T10:00:00']
+        assert all(o['id'] == weekly_event['id'] for o in occurrences)
+        assert occurrences[0]['recurrence_id'] == '2025-01-06T10:00:00'
+
+    def test_series_returned_once_without_window(self, client, auth_headers, weekly_event):
+        response = client.get('/api/calendar/events/', headers=auth_headers)
+
+        events = response.get_json()
+        assert len(events) == 1
+        assert events[0]['recurrence_rule'] == 'FREQ=WEEKLY;BYDAY=MO'
+
+    def test_finite_series_not_listed_after_its_end(self, client, auth_headers):
+        client.post(
+            '/api/calendar/events/create',
+            json={'title': 'Short', 'start_time': '2024-06-03T10:00:00', 'end_time': '2024-06-03T11:00:00',
+                  'recurrence_rule': 'FREQ=DAILY;COUNT=3'},
+            headers=auth_headers
+        )
+
+        response = client.get(
+            '/api/calendar/events/?from=2024-06-06T00:00:00&to=2024-07-01T00:00:00',
+            headers=auth_headers
+        )
+
+        assert response.get_json() == []
+
+    def test_cancel_and_move_occurrences(self, client, auth_headers, weekly_event):
+        event_id = weekly_event['id']
+
+        cancelled = client.delete(
+            f'/api/calendar/events/{event_id}/occurrences?original_start=2024-06-10T10:00:00',
+            headers=auth_headers
+        )
+        moved = client.put(
+            f'/api/calendar/events/{event_id}/occurrences',
+            json={'original_start': '2024-06-17T10:00:00', 'start_time': '2024-06-18T14:00:00',
+                  'end_time': '2024-06-18T15:00:00', 'title': 'Moved Sync'},
+            headers=auth_headers
+        )
+        assert cancelled.status_code == 200
+        assert moved.status_code == 200
+
+        response = client.get(
+            '/api/calendar/events/?from=2024-06-08T00:00:00&to=2024-06-20T00:00:00',
+            headers=auth_headers
+        )
+
+        occurrences = response.get_json()
+        assert [(o['start_time'], o['title']) for o in occurrences] == [('2024-06-18T14:00:00', 'Moved Sync')]
+
+    def test_clear_occurrence_exception(self, client, auth_headers, weekly_event):
+        event_id = weekly_event['id']
+        client.delete(
+            f'/api/calendar/events/{event_id}/occurrences?original_start=2024-06-10T10:00:00',
+            headers=auth_headers
+        )
+
+        cleared = client.delete(
+            f'/api/calendar/events/{event_id}/exceptions?original_start=2024-06-10T10:00:00',
+            headers=auth_headers
+        )
+        missing = client.delete(
+            f'/api/calendar/events/{event_id}/exceptions?original_start=2024-06-10T10:00:00',
+            headers=auth_headers
+        )
+
+        assert cleared.status_code == 200
+        assert missing.status_code == 404
+        response = client.get(
+            '/api/calendar/events/?from=2024-06-08T00:00:00&to=2024-06-12T00:00:00',
+            headers=auth_headers
+        )
+        assert [o['start_time'] for o in response.get_json()] == ['2024-06-10T10:00:00']
+
+    def test_occurrences_paginated_in_time_order(self, client, auth_headers, weekly_event):
+        client.post(
+            '/api/calendar/events/create',
+            json={'title': 'Tuesday', 'start_time': '2024-06-04T09:00:00', 'end_time': '2024-06-04T10:00:00',
+                  'recurrence_rule': 'FREQ=WEEKLY;BYDAY=TU'},
+            headers=auth_headers
+        )
+
+        starts = []
+        cursor = None
+        while True:
+            url = '/api/calendar/events/?from=2024-06-01T00:00:00&to=2024-06-15T00:00:00&limit=1'
+            if cursor:
+                url += f'&cursor={cursor}'
+            body = client.get(url, headers=auth_headers).get_json()
+            starts.extend(o['start_time'] for o in body['data'])
+            cursor = body['next_cursor']
+            if cursor is None:
+                break
+
+        assert starts == ['2024-06-03T10:00:00', '2024-06-04T09:00:00', '2024-06-10T10:00:00', '2024-06-11T09:00:00']
+
+    def test_moved_occurrence_outside_series_listed(self, client, auth_headers):
+        created = client.post(
+            '/api/calendar/events/create',
+            json={'title': 'Short', 'start_time': '2024-06-03T10:00:00', 'end_time': '2024-06-03T11:00:00',
+                  'recurrence_rule': 'FREQ=DAILY;COUNT=2'},
+            headers=auth_headers
+        ).get_json()
+        client.put(
+            f"/api/calendar/events/{created['id']}/occurrences",
+            json={'original_start': '2024-06-04T10:00:00', 'start_time': '2024-06-20T10:00:00',
+                  'end_time': '2024-06-20T11:00:00'},
+            headers=auth_headers
+        )
+
+        response = client.get(
+            '/api/calendar/events/?from=2024-06-19T00:00:00&to=2024-06-21T00:00:00',
+            headers=auth_headers
+        )
+
+        assert [o['start_time'] for o in response.get_json()] == ['2024-06-20T10:00:00']
+
+    def test_exception_for_unknown_occurrence(self, client, auth_headers, weekly_event):
+        response = client.put(
+            f"/api/calendar/events/{weekly_event['id']}/occurrences",
+            json={'original_start': '2024-06-11T10:00:00', 'title': 'Tuesday?'},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 404
+
+    def test_invalid_rule(self, client, auth_headers):
+        response = client.post(
+            '/api/calendar/events/create',
+            json={'title': 'Bad', 'start_time': '2024-06-03T10:00:00', 'end_time': '2024-06-03T11:00:00',
+                  'recurrence_rule': 'FREQ=SECONDLY'},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Invalid recurrence rule'
+
+    def test_recurring_candidate_checked_per_occurrence(self, client, auth_headers):
+        for title, start, end in [('Tuesday', '2024-08-06T10:00:00', '2024-08-06T11:00:00'),
+                                  ('Monday', '2024-08-12T10:30:00', '2024-08-12T11:00:00')]:
+            client.post('/api/calendar/events/create', json={'title': title, 'start_time': start, 'end_time': end},
+                        headers=auth_headers)
+
+        response = client.post(
+            '/api/calendar/events/create',
+            json={'title': 'Mondays', 'start_time': '2024-07-01T10:00:00', 'end_time': '2024-07-01T11:00:00',
+                  'recurrence_rule': 'FREQ=WEEKLY;BYDAY=MO', 'check_conflicts': True},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 409
+        assert [conflict['start_time'] for conflict in response.get_json()['conflicts']] == ['2024-08-12T10:30:00']
+
+    def test_recurring_conflict_detected(self, client, auth_headers, weekly_event):
+        response = client.post(
+            '/api/calendar/events/create',
+            json={'title': 'Clash', 'start_time': '2024-09-02T10:30:00', 'end_time': '2024-09-02T11:30:00',
+                  'check_conflicts': True},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 409
+        assert response.get_json()['conflicts'][0]['start_time'] == '2024-09-02T10:00:00'
+
+
+class TestBulkCreate:
+
+    def test_creates_valid_and_reports_invalid(self, client, auth_headers, test_participants, query_counter):
+        events = [
+            {'title': f'Bulk {i}', 'start_time': f'2024-07-{i + 1:02d}T09:00:00',
+             'end_time': f'2024-07-{i + 1:02d}T10:00:00',
+             'participant_ids': [str(p.id) for p in test_participants]}
+            for i in range(20)
+        ]
+        events.insert(5, {'title': 'Broken', 'start_time': '2024-07-01T10:00:00', 'end_time': '2024-07-01T09:00:00'})
+
+        query_counter.clear()
+        response = client.post('/api/calendar/events/bulk', json={'events': events}, headers=auth_headers)
+
+        assert response.status_code == 201
+        data = response.get_json()
+        assert len(data['created']) == 20
+        assert [error['index'] for error in data['errors']] == [5]
+        assert len(query_counter) < 10
+
+        listing = client.get('/api/calendar/events/?from=2024-07-01T00:00:00&to=2024-08-01T00:00:00',
+                             headers=auth_headers).get_json()
+        assert len(listing) == 20
+        assert all(len(event['participants']) == 3 for event in listing)
+
+    def test_unknown_participant_rejects_item(self, client, auth_headers):
+        response = client.post(
+            '/api/calendar/events/bulk',
+            json={'events': [{'title': 'Ghost', 'start_time': '2024-07-01T09:00:00',
+                              'end_time': '2024-07-01T10:00:00',
+                              'participant_ids': ['00000000-0000-0000-0000-000000000000']}]},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+        assert response.get_json()['errors'][0]['index'] == 0
+
+    def test_requires_list(self, client, auth_headers):
+        response = client.post('/api/calendar/events/bulk', json={'events': 'nope'}, headers=auth_headers)
+
+        assert response.status_code == 400
+
+
+class TestBulkPatchAndDelete:
+
+    def test_shift_many_events(self, client, auth_headers, user, test_participants, add_events, session,
+                               query_counter):
+        ids = add_events(user, test_participants)
+
+        query_counter.clear()
+        response = client.patch('/api/calendar/events/bulk', json={'ids': ids, 'shift_minutes': 30, 'color': 'red'},
+                                headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.get_json()['count'] == 3
+        assert len(query_counter) < 10
+
+        session.expire_all()
+        events = Event.query.filter(Event.id.in_(ids)).order_by(Event.id).all()
+        assert [event.start_time for event in events] == [datetime(2024, 6, 1 + i, 9, 30) for i in range(3)]
+        assert all(event.color == 'red' for event in events)
+
+    def test_foreign_event_rejects_whole_batch(self, client, auth_headers, user, test_participants, add_events):
+        ids = add_events(user, test_participants[:1])
+        foreign_ids = add_events(test_participants[0], count=1)
+
+        response = client.patch('/api/calendar/events/bulk', json={'ids': ids + foreign_ids, 'title': 'Taken over'},
+                                headers=auth_headers)
+
+        assert response.status_code == 403
+        events = Event.query.filter(Event.id.in_(ids + foreign_ids)).order_by(Event.id).all()
+        assert [event.title for event in events] == ['Event 0', 'Event 1', 'Event 2', 'Event 0']
+
+    def test_foreign_event_blocks_bulk_delete(self, client, auth_headers, user, test_participants, add_events):
+        ids = add_events(user, test_participants[:1])
+        foreign_ids = add_events(test_participants[0], count=1)
+
+        response = client.delete('/api/calendar/events/bulk', json={'ids': ids + foreign_ids}, headers=auth_headers)
+
+        assert response.status_code == 403
+        assert Event.query.filter(Event.id.in_(ids + foreign_ids)).count() == 4
+
+    def test_missing_event(self, client, auth_headers):
+        response = client.patch('/api/calendar/events/bulk', json={'ids': [999999], 'title': 'x'},
+                                headers=auth_headers)
+
+        assert response.status_code == 404
+
+    def test_delete_many_events(self, client, auth_headers, user, test_participants, add_events):
+        ids = add_events(user, test_participants)
+        token = client.get('/api/calendar/events/changes', headers=auth_headers).get_json()['next_since']
+
+        response = client.delete('/api/calendar/events/bulk', json={'ids': ids}, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert Event.query.filter(Event.id.in_(ids)).count() == 0
+        assert EventParticipant.query.filter(EventParticipant.event_id.in_(ids)).count() == 0
+
+        changes = client.get(f'/api/calendar/events/changes?since={token}', headers=auth_headers).get_json()
+        assert sorted(changes['deleted']) == ids
+
+
+
+class TestIcsExport:
+
+    def test_export_streams_calendar(self, client, auth_headers, created_event, weekly_event):
+        response = client.get('/api/calendar/export.ics', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/calendar'
+        body = response.get_data(as_text=True)
+        assert body.startswith('BEGIN:VCALENDAR\r\n')
+        assert body.count('BEGIN:VEVENT') == 2
+        assert f"UID:{weekly_event['id']}@my-friend-calendar" in body
+        assert 'RRULE:FREQ=WEEKLY' in body
+
+    def test_export_not_modified(self, client, auth_headers, created_event):
+        etag = client.get('/api/calendar/export.ics', headers=auth_headers).headers['ETag']
+
+        response = client.get('/api/calendar/export.ics', headers={**auth_headers, 'If-None-Match': etag})
+
+        assert response.status_code == 304
+
+    def test_export_invalid_range(self, client, auth_headers):
+        response = client.get('/api/calendar/export.ics?from=yesterday', headers=auth_headers)
+
+        assert response.status_code == 400
+
+
+class TestIcsImport:
+
+    ICS = (
+        "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+        + "".join(
+            f"BEGIN:VEVENT\r\nUID:{i}@example.com\r\nDTSTART:202408{i + 1:02d}T090000Z\r\n"
+            f"DTEND:202408{i + 1:02d}T100000Z\r\nSUMMARY:Imported {i}\r\n"
+            "ATTENDEE:mailto:participant0@test.com\r\nEND:VEVENT\r\n"
+            for i in range(5)
+        )
+        + "BEGIN:VEVENT\r\nUID:bad@example.com\r\nDTSTART:nonsense\r\nEND:VEVENT\r\n"
+        + "END:VCALENDAR\r\n"
+    )
+
+    def test_import_file(self, client, auth_headers, test_participants):
+        response = client.post(
+            '/api/calendar/import.ics?batch_size=2',
+            data={'file': (io.BytesIO(self.ICS.encode('utf-8')), 'calendar.ics')},
+            content_type='multipart/form-data',
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        summary = response.get_json()
+        assert summary['imported'] == 5
+        assert [error['uid'] for error in summary['errors']] == ['bad@example.com']
+
+        listing = client.get('/api/calendar/events/?from=2024-08-01T00:00:00&to=2024-09-01T00:00:00',
+                             headers=auth_headers).get_json()
+        assert [event['title'] for event in listing] == [f'Imported {i}' for i in range(5)]
+        assert all(event['participants'][0]['email'] == 'participant0@test.com' for event in listing)
+
+    def test_import_raw_body(self, client, auth_headers):
+        response = client.post('/api/calendar/import.ics', data=self.ICS, content_type='text/calendar',
+                               headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.get_json()['imported'] == 5
+
+    def test_missing_file(self, client, auth_headers):
+        response = client.post('/api/calendar/import.ics', json={}, headers=auth_headers)
+
+        assert response.status_code == 400
+
+
+class TestEventSearch:
+
+    @pytest.fixture
+    def searchable_events(self, client, auth_headers):
+        events = [
+            ('Team meeting', 'Room 4', 'Quarterly planning', '2024-06-03T10:00:00'),
+            ('Lunch', 'Meeting point cafe', None, '2024-06-04T12:00:00'),
+            ('Dentist', None, 'Bring the team photo', '2024-07-01T09:00:00'),
+        ]
+        for title, location, description, start in events:
+            client.post('/api/calendar/events/create', json={
+                'title': title, 'location': location, 'description': description,
+                'start_time': start, 'end_time': start[:11] + '23:00:00',
+            }, headers=auth_headers)
+
+    def test_ranked_by_field_weight(self, client, auth_headers, searchable_events):
+        response = client.get('/api/calendar/events/search?q=meet', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert [event['title'] for event in response.get_json()] == ['Team meeting', 'Lunch']
+
+    def test_range_filter(self, client, auth_headers, searchable_events):
+        response = client.get(
+            '/api/calendar/events/search?q=team&from=2024-06-15T00:00:00&to=2024-08-01T00:00:00',
+            headers=auth_headers
+        )
+
+        assert [event['title'] for event in response.get_json()] == ['Dentist']
+
+    def test_other_users_events_hidden(self, client, searchable_events, test_participants):
+        from flask_jwt_extended import create_access_token
+
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(test_participants[0].id))}'}
+        response = client.get('/api/calendar/events/search?q=team', headers=headers)
+
+        assert response.get_json() == []
+
+    def test_missing_query(self, client, auth_headers):
+        response = client.get('/api/calendar/events/search', headers=auth_headers)
+
+        assert response.status_code == 400
+
+
+
+class TestEventAccess:
+
+    def _headers(self, user):
+        from flask_jwt_extended import create_access_token
+
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+    @pytest.fixture
+    def shared_event(self, client, auth_headers, test_participants):
+        response = client.post('/api/calendar/events/create', json={
+            'title': 'Shared', 'start_time': '2024-06-15T10:00:00', 'end_time': '2024-06-15T11:00:00',
+            'participant_ids': [str(test_participants[0].id)],
+        }, headers=auth_headers)
+        return response.get_json()
+
+    def test_participant_can_view(self, client, shared_event, test_participants, query_counter):
+        headers = self._headers(test_participants[0])
+
+        query_counter.clear()
+        response = client.get(f"/api/calendar/events/{shared_event['id']}", headers=headers)
+
+        assert response.status_code == 200
+        assert response.get_json()['title'] == 'Shared'
+        event_queries = [statement for statement in query_counter if 'FROM events' in statement]
+        assert len(event_queries) == 2
+        assert 'is_participant' in event_queries[0] and 'is_participant' not in event_queries[1]
+
+    def test_participant_cannot_edit(self, client, shared_event, test_participants):
+        response = client.patch(f"/api/calendar/events/{shared_event['id']}", json={'title': 'Mine'},
+                                headers=self._headers(test_participants[0]))
+
+        assert response.status_code == 403
+
+    def test_stranger_cannot_view(self, client, shared_event, test_participants):
+        response = client.get(f"/api/calendar/events/{shared_event['id']}",
+                              headers=self._headers(test_participants[1]))
+
+        assert response.status_code == 403
+
+    def test_missing_event(self, client, auth_headers):
+        response = client.get('/api/calendar/events/999999', headers=auth_headers)
+
+        assert response.status_code == 404
@@ -0,0 +1,192 @@
+import pytest
+from datetime import datetime, time, timedelta, timezone
+from unittest.mock import patch
+from uuid import UUID
+from zoneinfo import ZoneInfo
+from app.services.availability_service import (
+    merge_intervals, parse_user_ids, validate_window, get_free_busy, MAXIMAL_USERS_PER_QUERY,
+    find_slots, complement, working_intervals, parse_slot_request, find_common_slots,
+    DEFAULT_SLOT_COUNT, DEFAULT_WORKING_DAYS, find_conflicts, _occupied_events)
+
+USER_ID = UUID('12345678-1234-5678-1234-567812345678')
+
+
+def at(hour, day=15):
+    return datetime(2024, 6, day, hour, 0)
+
+
+class TestMergeIntervals:
+    """Unit tests for the merge_intervals function"""
+
+    def test_empty(self):
+        assert merge_intervals([]) == []
+
+    def test_overlapping_and_touching_are_merged(self):
+        intervals = [(at(12), at(13)), (at(9), at(10)), (at(9), at(11)), (at(11), at(12))]
+
+        assert merge_intervals(intervals) == [(at(9), at(13))]
+
+    def test_contained_interval(self):
+        assert merge_intervals([(at(9), at(17)), (at(10), at(11))]) == [(at(9), at(17))]
+
+    def test_disjoint_intervals_are_sorted(self):
+        assert merge_intervals([(at(14), at(15)), (at(9), at(10))]) == [(at(9), at(10)), (at(14), at(15))]
+
+
+class TestParseUserIds:
+    """Unit tests for the parse_user_ids function"""
+
+    def test_duplicates_removed(self):
+        assert parse_user_ids([str(USER_ID), str(USER_ID)]) == [USER_ID]
+
+    @pytest.mark.parametrize('raw_ids', [None, [], 'abc', ['not-a-uuid']])
+    def test_invalid(self, raw_ids):
+        with pytest.raises(ValueError, match="user_ids"):
+            parse_user_ids(raw_ids)
+
+    def test_too_many(self):
+        raw_ids = [str(UUID(int=i)) for i in range(MAXIMAL_USERS_PER_QUERY + 1)]
+
+        with pytest.raises(ValueError, match="At most"):
+            parse_user_ids(raw_ids)
+
+
+class TestValidateWindow:
+    """Unit tests for the validate_window function"""
+
+    def test_missing_bound(self):
+        with pytest.raises(ValueError, match="required"):
+            validate_window(at(9), None)
+
+    def test_too_long(self):
+        with pytest.raises(ValueError, match="cannot exceed"):
+            validate_window(datetime(2024, 1, 1), datetime(2025, 6, 1))
+
+
+class TestGetFreeBusy:
+    """Unit tests for the get_free_busy function"""
+
+    @patch('app.services.availability_service.busy_intervals')
+    def test_blocks_are_merged_and_clipped(self, mock_busy):
+        other_id = UUID('22345678-1234-5678-1234-567812345678')
+        mock_busy.return_value = {USER_ID: [(at(7), at(9)), (at(8), at(10)), (at(16), at(19))]}
+
+        busy = get_free_busy([USER_ID, other_id], at(8), at(18))
+
+        assert busy == {USER_ID: [(at(8), at(10)), (at(16), at(18))], other_id: []}
+
+    @patch('app.services.availability_service.busy_intervals')
+    def test_offset_window_converted_to_utc(self, mock_busy):
+        mock_busy.return_value = {USER_ID: [(at(6), at(9))]}
+        plus_two = timezone(timedelta(hours=2))
+
+        busy = get_free_busy([USER_ID], at(9).replace(tzinfo=plus_two), at(12).replace(tzinfo=plus_two))
+
+        mock_busy.assert_called_once_with([USER_ID], at(7), at(10))
+        assert busy == {USER_ID: [(at(7), at(9))]}
+
+
+class TestFindSlots:
+    """Unit tests for slot search helpers"""
+
+    def test_slots_fill_gaps_in_order(self):
+        blocked = [(at(9), at(10)), (at(10), at(11)), (at(12), at(13))]
+
+        slots = find_slots(blocked, at(9), at(15), timedelta(hours=1), 3)
+
+        assert slots == [(at(11), at(12)), (at(13), at(14)), (at(14), at(15))]
+
+    def test_short_gaps_are_skipped(self):
+        blocked = [(at(9), datetime(2024, 6, 15, 10, 30)), (at(11), at(12))]
+
+        assert find_slots(blocked, at(9), at(12), timedelta(hours=1), 5) == []
+
+    def test_slot_start_is_aligned(self):
+        blocked = [(at(9), datetime(2024, 6, 15, 9, 5))]
+
+        slots = find_slots(blocked, at(9), at(11), timedelta(minutes=30), 1)
+
+        assert slots == [(datetime(2024, 6, 15, 9, 15), datetime(2024, 6, 15, 9, 45))]
+
+    def test_complement(self):
+        assert complement([(at(10), at(11))], at(9), at(12)) == [(at(9), at(10)), (at(11), at(12))]
+
+    def test_working_intervals_in_user_timezone(self):
+        intervals = working_intervals(
+            ZoneInfo('Europe/Warsaw'), at(0, day=14), at(0, day=15), (time(9), time(17)), DEFAULT_WORKING_DAYS
+        )
+
+        assert (at(7, day=14), at(15, day=14)) in intervals
+        assert all(start.weekday() < 5 for start, _ in intervals)
+
+
+class TestParseSlotRequest:
+    """Unit tests for the parse_slot_request function"""
+
+    def test_defaults(self):
+        duration, count, working_hours, working_days = parse_slot_request({'duration_minutes': 30})
+
+        assert duration == timedelta(minutes=30)
+        assert count == DEFAULT_SLOT_COUNT
+        assert working_hours is None
+        assert working_days == frozenset(DEFAULT_WORKING_DAYS)
+
+    @pytest.mark.parametrize('data', [
+        {},
+        {'duration_minutes': 0},
+        {'duration_minutes': 30, 'count': 0},
+        {'duration_minutes': 30, 'working_hours': {'start': '17:00', 'end': '09:00'}},
+        {'duration_minutes': 30, 'working_hours': {'start': 'nine'}},
+        {'duration_minutes': 30, 'working_days': [7]},
+    ])
+    def test_invalid(self, data):
+        with pytest.raises(ValueError):
+            parse_slot_request(data)
+
+    @patch('app.services.availability_service.busy_intervals')
+    def test_find_common_slots_without_working_hours(self, mock_busy):
+        mock_busy.return_value = {USER_ID: [(at(9), at(12))]}
+
+        slots = find_common_slots([USER_ID], at(9), at(14), timedelta(hours=1), 2)
+
+        assert slots == [(at(12), at(13)), (at(13), at(14))]
+
+    @patch('app.services.availability_service.busy_intervals')
+    def test_find_common_slots_with_offset_window(self, mock_busy):
+        mock_busy.return_value = {USER_ID: [(at(9), at(12))]}
+        plus_two = timezone(timedelta(hours=2))
+
+        slots = find_common_slots([USER_ID], at(11).replace(tzinfo=plus_two), at(16).replace(tzinfo=plus_two),
+                                  timedelta(hours=1), 1)
+
+        assert slots == [(at(12), at(13))]
+
+
+class TestFindConflicts:
+    """Unit tests for the find_conflicts function"""
+
+    @patch('app.services.availability_service._occupied_intervals')
+    def test_only_overlapping_occurrences_reported(self, mock_occupied):
+        mock_occupied.return_value = [
+            (USER_ID, 1, at(9), at(10)),
+            (USER_ID, 2, at(10, day=16), at(11, day=16)),
+            (USER_ID, 3, at(12, day=16), at(13, day=16)),
+        ]
+        candidates = [(at(10), at(11)), (at(10, day=16), at(12, day=16))]
+
+        conflicts = find_conflicts([USER_ID], candidates)
+
+        assert [conflict['event_id'] for conflict in conflicts] == [2]
+        assert mock_occupied.call_args.args[1:3] == (at(10), at(12, day=16))
+        assert mock_occupied.call_args.args[4] == candidates
+
+    def test_single_events_joined_against_candidates(self):
+        statement = str(_occupied_events([USER_ID], at(10), at(12, day=16), windows=[(at(10), at(11))]))
+
+        branches = statement.split('UNION ALL')
+        assert ['JOIN (VALUES' in branch for branch in branches] == [True, True, False, False, False, False]
+        assert ['recurrence_rule IS NULL' in branch for branch in branches] == [True, True, False, False, False, False]
+        assert ['FROM event_exceptions' in branch for branch in branches] == [False, False, False, False, True, True]
+
+    def test_no_candidates(self):
+        assert find_conflicts([USER_ID], []) == []
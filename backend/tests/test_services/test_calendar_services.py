@@ -1,7 +1,12 @@
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch, MagicMock
-from app.services.calendar_service import patch_event
+from app.services.calendar_service import (
+    patch_event, parse_time_range, parse_pagination, encode_cursor, decode_cursor, DEFAULT_PAGE_SIZE,
+    calendar_etag, EventConflictError, bulk_create_events, MAXIMAL_BULK_SIZE, parse_event_ids,
+    parse_bulk_patch, bulk_patch_events, build_search_query, parse_search_limit, MAXIMAL_SEARCH_LIMIT,
+    serialize_events, set_occurrence_exception, clear_occurrence_exception, encode_sync_token, decode_sync_token)
+from app.models.event import EventException
 from uuid import UUID
 
 @pytest.fixture
@@ -14,6 +19,7 @@ def sample_event():
     event.start_time = datetime(2024, 1, 15, 10, 0)
     event.end_time = datetime(2024, 1, 15, 11, 0)
     event.owner_id = 1
+    event.recurrence_rule = None
 
     mock_query = MagicMock()
     mock_query.delete = MagicMock(return_value=None)
@@ -100,12 +106,36 @@ class TestPatchEventFunction:
         updated_event, was_updated = patch_event(sample_event, data)
 
         assert was_updated is True
-        assert mock_db.add.call_count == 3
+        mock_db.add.assert_not_called()
+        inserted_rows = mock_db.execute.call_args_list[0].args[1]
+        assert {row['user_id'] for row in inserted_rows} == {user_id_1, user_id_2, user_id_3}
         mock_db.commit.assert_called_once()
 
         mock_db.query.assert_called_once()
         mock_query.filter.assert_called_once()
 
+    @patch('app.services.calendar_service.db.session')
+    def test_participant_diff_keeps_unchanged(self, mock_db, sample_event):
+        """Only added ids are inserted and only removed ids deleted"""
+        kept = UUID('12345678-1234-5678-1234-567812345678')
+        removed = UUID('22345678-1234-5678-1234-567812345678')
+        added = UUID('32345678-1234-5678-1234-567812345678')
+        sample_event.participant_links = [MagicMock(user_id=kept), MagicMock(user_id=removed)]
+
+        mock_query = MagicMock()
+        mock_db.query.return_value = mock_query
+        mock_query.filter.return_value = mock_query
+        mock_query.all.return_value = [MagicMock(id=added)]
+
+        patch_event(sample_event, {'participant_ids': [str(kept), str(added)]})
+
+        statements = [call.args[0] for call in mock_db.execute.call_args_list]
+        inserted_rows = mock_db.execute.call_args_list[0].args[1]
+        assert [row['user_id'] for row in inserted_rows] == [added]
+        assert statements[1].is_delete
+        assert statements[1].compile().params['user_id_1'] == [removed]
+        mock_db.delete.assert_not_called()
+
     @patch('app.services.calendar_service.db.session')
     def test_no_valid_fields_returns_false(self, mock_db, sample_event):
         """Test that no valid fields returns was_updated=False"""
@@ -141,4 +171,287 @@ class TestPatchEventFunction:
         assert updated_event.title == 'New Title'
         assert updated_event.description == 'New Description'
         assert updated_event.start_time == datetime(2023, 2, 1, 9, 0)
-        mock_db.commit.assert_called_once()
\ No newline at end of file
+        mock_db.commit.assert_called_once()
+
+class TestParseTimeRange:
+    """Unit tests for the parse_time_range function"""
+
+    def test_no_bounds(self):
+        assert parse_time_range({}) == (None, None)
+
+    def test_both_bounds(self):
+        range_start, range_end = parse_time_range({'from': '2024-06-01T00:00:00', 'to': '2024-07-01T00:00:00'})
+
+        assert range_start == datetime(2024, 6, 1)
+        assert range_end == datetime(2024, 7, 1)
+
+    def test_open_ended(self):
+        assert parse_time_range({'to': '2024-07-01T00:00:00'}) == (None, datetime(2024, 7, 1))
+
+    def test_invalid_format(self):
+        with pytest.raises(ValueError, match="INVALID_DATE"):
+            parse_time_range({'from': 'yesterday'})
+
+    def test_inverted_range(self):
+        with pytest.raises(ValueError, match="'from' must be before 'to'."):
+            parse_time_range({'from': '2024-07-01T00:00:00', 'to': '2024-06-01T00:00:00'})
+
+
+class TestPagination:
+    """Unit tests for cursor encoding and pagination parameter parsing"""
+
+    def test_cursor_round_trip(self):
+        event = MagicMock(id=42, start_time=datetime(2024, 6, 15, 10, 0))
+
+        assert decode_cursor(encode_cursor(event)) == (datetime(2024, 6, 15, 10, 0), 42, None)
+
+    def test_decode_malformed_cursor(self):
+        with pytest.raises(ValueError, match="INVALID_CURSOR"):
+            decode_cursor("not-a-cursor")
+
+    def test_pagination_not_requested(self):
+        assert parse_pagination({}) == (None, None)
+
+    def test_default_limit_with_cursor(self):
+        event = MagicMock(id=7, start_time=datetime(2024, 6, 15, 10, 0))
+
+        limit, after = parse_pagination({'cursor': encode_cursor(event)})
+
+        assert limit == DEFAULT_PAGE_SIZE
+        assert after == (datetime(2024, 6, 15, 10, 0), 7, None)
+
+    @pytest.mark.parametrize('limit', ['0', '-5', '100000', 'ten'])
+    def test_invalid_limit(self, limit):
+        with pytest.raises(ValueError, match="'limit' must be"):
+            parse_pagination({'limit': limit})
+
+
+class TestCalendarETag:
+    """Unit tests for the calendar_etag function"""
+
+    def test_same_inputs_same_etag(self):
+        assert calendar_etag('user', 3, 'from=x') == calendar_etag('user', 3, 'from=x')
+
+    def test_version_changes_etag(self):
+        assert calendar_etag('user', 3) != calendar_etag('user', 4)
+
+    def test_parts_change_etag(self):
+        assert calendar_etag('user', 3, 'limit=10') != calendar_etag('user', 3, 'limit=20')
+
+
+class TestSyncToken:
+    """Unit tests for sync token encoding"""
+
+    def test_round_trip(self):
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        assert decode_sync_token(encode_sync_token(since)) == since
+
+    def test_naive_timestamp_rejected(self):
+        with pytest.raises(ValueError, match="INVALID_TOKEN"):
+            decode_sync_token(encode_sync_token(datetime(2024, 1, 1)))
+
+    def test_garbage_rejected(self):
+        with pytest.raises(ValueError, match="INVALID_TOKEN"):
+            decode_sync_token('@@@')
+
+
+class TestConflictCheck:
+    """Unit tests for the optional conflict check in patch_event"""
+
+    CONFLICT = {'user_id': '1', 'event_id': 2, 'start_time': '2024-01-15T10:30:00', 'end_time': '2024-01-15T11:30:00'}
+
+    @patch('app.services.calendar_service.find_conflicts')
+    @patch('app.services.calendar_service.db.session')
+    def test_conflicting_time_change_raises(self, mock_db, mock_find, sample_event):
+        mock_find.return_value = [self.CONFLICT]
+        data = {'start_time': '2024-01-15T10:30:00', 'check_conflicts': True}
+
+        with pytest.raises(EventConflictError) as exc_info:
+            patch_event(sample_event, data)
+
+        assert exc_info.value.conflicts == [self.CONFLICT]
+        assert mock_find.call_args.args[2] == sample_event.id
+        mock_db.commit.assert_not_called()
+
+    @patch('app.services.calendar_service.find_conflicts')
+    @patch('app.services.calendar_service.db.session')
+    def test_title_change_skips_check(self, mock_db, mock_find, sample_event):
+        patch_event(sample_event, {'title': 'Renamed', 'check_conflicts': True})
+
+        mock_find.assert_not_called()
+        mock_db.commit.assert_called_once()
+
+    @patch('app.services.calendar_service.find_conflicts')
+    @patch('app.services.calendar_service.db.session')
+    def test_check_is_opt_in(self, mock_db, mock_find, sample_event):
+        patch_event(sample_event, {'start_time': '2024-01-15T10:30:00'})
+
+        mock_find.assert_not_called()
+
+
+class TestBulkCreateValidation:
+    """Unit tests for the validation step of bulk_create_events"""
+
+    VALID = {'title': 'Standup', 'start_time': '2024-01-15T09:00:00', 'end_time': '2024-01-15T09:15:00'}
+
+    def test_rejects_empty_batch(self):
+        with pytest.raises(ValueError):
+            bulk_create_events([], 1)
+
+    def test_rejects_oversized_batch(self):
+        with pytest.raises(ValueError):
+            bulk_create_events([self.VALID] * (MAXIMAL_BULK_SIZE + 1), 1)
+
+    @patch('app.services.calendar_service.db.session')
+    def test_invalid_items_reported_by_index(self, mock_db):
+        items = [
+            {'title': 'No times'},
+            {**self.VALID, 'end_time': '2024-01-15T08:00:00'},
+            {**self.VALID, 'start_time': 'tomorrow'},
+        ]
+
+        created, errors = bulk_create_events(items, 1)
+
+        assert created == []
+        assert [error['index'] for error in errors] == [0, 1, 2]
+        assert errors[0]['error'] == 'Missing required fields'
+        mock_db.execute.assert_not_called()
+        mock_db.commit.assert_not_called()
+
+
+class TestBulkPatchParsing:
+    """Unit tests for the id list and payload parsing of bulk changes"""
+
+    def test_ids_deduplicated(self):
+        assert parse_event_ids([3, 1, 3]) == [1, 3]
+
+    @pytest.mark.parametrize('raw_ids', [None, [], ['1'], [True], [1] * (MAXIMAL_BULK_SIZE + 1)])
+    def test_invalid_ids(self, raw_ids):
+        with pytest.raises(ValueError):
+            parse_event_ids(raw_ids)
+
+    def test_shift_and_fields(self):
+        values, shift = parse_bulk_patch({'ids': [1], 'status': 'done', 'shift_minutes': -15, 'owner_id': 'x'})
+
+        assert values == {'status': 'done'}
+        assert shift.total_seconds() == -900
+
+    def test_empty_patch_rejected(self):
+        with pytest.raises(ValueError):
+            parse_bulk_patch({'ids': [1], 'shift_minutes': 0})
+
+    @pytest.mark.parametrize('data', [
+        {'status': 'x' * 21},
+        {'color': '#' * 21},
+        {'title': 't' * 256},
+        {'location': 5},
+    ])
+    def test_values_checked_against_columns(self, data):
+        with pytest.raises(ValueError):
+            parse_bulk_patch({'ids': [1], **data})
+
+    @patch('app.services.calendar_service.bump_calendar_versions')
+    @patch('app.services.calendar_service._participants_by_event', return_value={})
+    @patch('app.services.calendar_service.check_bulk_ownership')
+    @patch('app.services.calendar_service.db.session')
+    def test_shift_moves_until(self, mock_db, mock_ownership, mock_participants, mock_bump):
+        mock_db.execute.return_value.all.return_value = [
+            (1, 'FREQ=DAILY;UNTIL=20240610T090000', datetime(2024, 6, 3, 10), datetime(2024, 6, 3, 11)),
+            (2, 'FREQ=DAILY;COUNT=3', datetime(2024, 6, 3, 10), datetime(2024, 6, 3, 11)),
+            (3, None, datetime(2024, 6, 3, 10), datetime(2024, 6, 3, 11)),
+        ]
+
+        bulk_patch_events({'ids': [1, 2, 3], 'shift_minutes': 60}, 'owner')
+
+        series_ends = mock_db.execute.call_args_list[-1].args[1]
+        assert [row['recurrence_rule'] for row in series_ends] == [
+            'FREQ=DAILY;UNTIL=20240610T100000', 'FREQ=DAILY;COUNT=3']
+        assert series_ends[0]['recurrence_end'] == datetime(2024, 6, 10, 11)
+
+
+class TestSearchQuery:
+    """Unit tests for search text parsing"""
+
+    def test_words_become_prefix_terms(self):
+        assert build_search_query("Team  meet! o'clock") == "'team':* & 'meet':* & 'o':* & 'clock':*"
+
+    def test_unicode_words_kept(self):
+        assert build_search_query('Spotkanie zespołu') == "'spotkanie':* & 'zespołu':*"
+
+    @pytest.mark.parametrize('text', [None, '', '  !? '])
+    def test_empty_text_rejected(self, text):
+        with pytest.raises(ValueError, match='INVALID_QUERY'):
+            build_search_query(text)
+
+    def test_limit_bounds(self):
+        assert parse_search_limit(None) == 20
+        with pytest.raises(ValueError):
+            parse_search_limit(str(MAXIMAL_SEARCH_LIMIT + 1))
+
+
+
+def _series(event_id, start, rule=None, exceptions=()):
+    event = MagicMock(id=event_id, start_time=start, end_time=start + timedelta(hours=1), recurrence_rule=rule,
+                      owner_id=1, participant_links=[])
+    event.exceptions = list(exceptions)
+    event.to_dict.return_value = {'id': event_id, 'start_time': start.isoformat(), 'title': f'Event {event_id}'}
+    return event
+
+
+class TestRecurringSeries:
+    """Unit tests for occurrence ordering and exception upkeep"""
+
+    def test_occurrences_emitted_in_time_order(self):
+        moved = EventException(original_start=datetime(2024, 6, 4, 8), is_cancelled=False,
+                               start_time=datetime(2024, 6, 1, 12), end_time=datetime(2024, 6, 1, 13))
+        daily = _series(1, datetime(2024, 6, 1, 10), 'FREQ=DAILY')
+        later = _series(3, datetime(2024, 6, 3, 8), 'FREQ=DAILY;COUNT=2', [moved])
+        single = _series(2, datetime(2024, 6, 2, 9))
+
+        occurrences = serialize_events([daily, later, single], datetime(2024, 6, 1), datetime(2024, 6, 4))
+
+        assert [(o['start_time'], o['id']) for o in occurrences] == [
+            ('2024-06-01T10:00:00', 1),
+            ('2024-06-01T12:00:00', 3),
+            ('2024-06-02T09:00:00', 2),
+            ('2024-06-02T10:00:00', 1),
+            ('2024-06-03T08:00:00', 3),
+            ('2024-06-03T10:00:00', 1),
+        ]
+
+    @patch('app.services.calendar_service.db.session')
+    def test_exceptions_follow_moved_series(self, mock_db):
+        event = _series(1, datetime(2024, 1, 15, 10), 'FREQ=DAILY', [
+            EventException(original_start=datetime(2024, 1, 17, 10), is_cancelled=False, title='Moved'),
+        ])
+
+        patch_event(event, {'start_time': '2024-01-15T12:00:00', 'end_time': '2024-01-15T13:00:00'})
+
+        assert [(e.original_start, e.title) for e in event.exceptions] == [(datetime(2024, 1, 17, 12), 'Moved')]
+
+        patch_event(event, {'recurrence_rule': 'FREQ=WEEKLY'})
+
+        assert event.exceptions == []
+
+    @patch('app.services.calendar_service.db.session')
+    def test_moved_occurrence_stores_both_times(self, mock_db):
+        event = _series(1, datetime(2024, 1, 15, 10), 'FREQ=DAILY')
+
+        exception = set_occurrence_exception(
+            event, {'original_start': '2024-01-17T10:00:00', 'start_time': '2024-01-17T15:00:00'}
+        )
+
+        assert (exception.start_time, exception.end_time) == (datetime(2024, 1, 17, 15), datetime(2024, 1, 17, 16))
+
+    @patch('app.services.calendar_service.db.session')
+    def test_clear_occurrence_exception(self, mock_db):
+        exception = EventException(original_start=datetime(2024, 1, 17, 10), is_cancelled=True)
+        event = _series(1, datetime(2024, 1, 15, 10), 'FREQ=DAILY', [exception])
+
+        clear_occurrence_exception(event, {'original_start': '2024-01-17T10:00:00'})
+
+        assert event.exceptions == []
+        mock_db.commit.assert_called_once()
+        with pytest.raises(ValueError, match='NOT_FOUND'):
+            clear_occurrence_exception(event, {'original_start': '2024-01-17T10:00:00'})
@@ -0,0 +1,188 @@
+import socketserver
+import threading
+import pytest
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+from flask import Flask
+from app.extensions import mail
+from app.services.email_service import (
+    send_messages, record_results, deliver_pending, retry_delay, EmailDispatcher, EMAIL_MAX_ATTEMPTS)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 stand-in ready')
+        recipients = []
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == 'QUIT':
+                self.reply('221 bye')
+                return
+            if command == 'RCPT':
+                if 'reject' in line:
+                    self.reply('550 no such user')
+                    continue
+                recipients.append(line.split(':', 1)[1].strip(' <>'))
+                self.reply('250 ok')
+            elif command == 'DATA':
+                self.reply('354 go ahead')
+                data = []
+                while (chunk := self.rfile.readline()) not in (b'.\r\n', b''):
+                    data.append(chunk)
+                self.server.messages.append((recipients, b''.join(data).decode()))
+                recipients = []
+                self.reply('250 queued')
+            elif command == 'RSET':
+                recipients = []
+                self.reply('250 ok')
+            else:
+                self.reply('250 stand-in')
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.messages = []
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def mail_app(smtp_server):
+    app = Flask(__name__)
+    app.config.update(
+        MAIL_SERVER='127.0.0.1', MAIL_PORT=smtp_server.server_address[1], MAIL_USE_TLS=False,
+        MAIL_USE_SSL=False, MAIL_DEFAULT_SENDER='calendar@example.com', MAIL_SUPPRESS_SEND=False,
+    )
+    mail.init_app(app)
+    with app.app_context():
+        yield app
+
+
+def outbox_row(id, recipient, attempts=1):
+    return SimpleNamespace(id=id, recipient=recipient, subject=f'Subject {id}', body=f'Body {id}', attempts=attempts)
+
+
+class TestSendMessages:
+    """Unit tests for SMTP delivery against a local stand-in server"""
+
+    def test_batch_uses_one_connection(self, mail_app, smtp_server):
+        batch = [outbox_row(i, f'user{i}@example.com') for i in range(3)]
+
+        results = send_messages(batch)
+
+        assert results == {0: None, 1: None, 2: None}
+        assert smtp_server.connections == 1
+        assert [recipients for recipients, _ in smtp_server.messages] == [[f'user{i}@example.com'] for i in range(3)]
+        assert 'Subject 2' in smtp_server.messages[2][1]
+
+    def test_refused_recipient_does_not_stop_batch(self, mail_app, smtp_server):
+        batch = [outbox_row(1, 'reject@example.com'), outbox_row(2, 'ok@example.com')]
+
+        results = send_messages(batch)
+
+        assert results[1] is not None
+        assert results[2] is None
+        assert len(smtp_server.messages) == 1
+
+    def test_unbuildable_message_fails_alone(self, mail_app, smtp_server):
+        batch = [outbox_row(1, 'a@example.com'), outbox_row(2, 'b@example.com')]
+        batch[0].subject = 'Broken\nSubject'
+
+        results = send_messages(batch)
+
+        assert results[1] is not None
+        assert results[2] is None
+        assert len(smtp_server.messages) == 1
+
+    def test_unreachable_server_fails_whole_batch(self, mail_app, smtp_server):
+        mail_app.config['MAIL_PORT'] = 1
+        mail.init_app(mail_app)
+
+        with patch('app.services.email_service.claim_batch', return_value=[outbox_row(1, 'a@example.com')]), \
+                patch('app.services.email_service.record_results') as mock_record:
+            assert deliver_pending() == 1
+
+        assert mock_record.call_args.args[1][1]
+
+
+class TestRecordResults:
+    """Unit tests for retry scheduling"""
+
+    def test_backoff_doubles(self):
+        assert [retry_delay(attempt) for attempt in (1, 2, 3)] == [
+            timedelta(seconds=30), timedelta(seconds=60), timedelta(seconds=120)]
+
+    @patch('app.services.email_service.db.session')
+    def test_failures_retried_until_limit(self, mock_db):
+        batch = [outbox_row(1, 'a@example.com'), outbox_row(2, 'b@example.com', attempts=EMAIL_MAX_ATTEMPTS),
+                 outbox_row(3, 'c@example.com')]
+
+        record_results(batch, {1: 'timeout', 2: 'timeout', 3: None})
+
+        sent_update, failure_update = mock_db.execute.call_args_list
+        failures = failure_update.args[1]
+        assert [(row['id'], row['status']) for row in failures] == [(1, 'pending'), (2, 'failed')]
+        assert sent_update.args[0].compile().params['id_1'] == [3]
+        mock_db.commit.assert_called_once()
+
+
+class TestEmailDispatcher:
+    """Unit tests for the background dispatcher switch"""
+
+    def test_disabled_in_testing(self):
+        app = Flask(__name__)
+        app.testing = True
+        dispatcher = EmailDispatcher(app)
+
+        dispatcher.wake()
+
+        assert dispatcher._thread is None
+
+    def test_wake_drains_outbox(self):
+        app = Flask(__name__)
+        dispatcher = EmailDispatcher(app, poll_interval=60)
+        drained = threading.Event()
+
+        with patch('app.services.email_service.drain_outbox', side_effect=lambda size: drained.set()), \
+                patch('app.services.email_service.db.session'):
+            dispatcher.wake()
+            assert drained.wait(5)
+            dispatcher.stop(timeout=5)
+
+        assert not dispatcher._thread.is_alive()
+
+    def test_first_request_drains_pending_outbox(self):
+        app = Flask(__name__)
+        app.add_url_rule('/ping', 'ping', lambda: 'pong')
+        dispatcher = EmailDispatcher(app, poll_interval=60)
+        drained = threading.Event()
+
+        with patch('app.services.email_service.drain_outbox', side_effect=lambda size: drained.set()), \
+                patch('app.services.email_service.db.session'):
+            assert app.test_client().get('/ping').status_code == 200
+            assert drained.wait(5)
+            dispatcher.stop(timeout=5)
+
+        assert not dispatcher._thread.is_alive()
+
+    def test_first_request_ignored_in_testing(self):
+        app = Flask(__name__)
+        app.testing = True
+        app.add_url_rule('/ping', 'ping', lambda: 'pong')
+        dispatcher = EmailDispatcher(app)
+
+        app.test_client().get('/ping')
+
+        assert dispatcher._thread is None
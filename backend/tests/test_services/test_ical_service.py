@@ -0,0 +1,208 @@
+import io
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from app.services.ical_service import (
+    escape_text, fold_line, vevent_lines, iter_calendar_ics, unescape_text, iter_content_lines,
+    iter_vevents, parse_ics_datetime, vevent_to_event_data, parse_import_batch_size, import_ics)
+
+DTSTAMP = '20240101T000000Z'
+
+
+def _event(**fields):
+    event = MagicMock()
+    event.id = 7
+    event.title = 'Planning'
+    event.description = None
+    event.location = None
+    event.status = 'planned'
+    event.start_time = datetime(2024, 6, 3, 10, 0)
+    event.end_time = datetime(2024, 6, 3, 11, 0)
+    event.updated_at = None
+    event.owner = MagicMock(email='owner@example.com')
+    event.participant_links = [MagicMock(user=MagicMock(email='guest@example.com'))]
+    event.recurrence_rule = None
+    event.exceptions = []
+    for name, value in fields.items():
+        setattr(event, name, value)
+    return event
+
+
+class TestEscapeAndFold:
+    """Unit tests for iCalendar text escaping and line folding"""
+
+    def test_escapes_special_characters(self):
+        assert escape_text('a,b;c\\d\ne') == 'a\\,b\\;c\\\\d\\ne'
+
+    def test_short_line_unchanged(self):
+        assert fold_line('SUMMARY:Hi') == 'SUMMARY:Hi\r\n'
+
+    def test_long_line_folded_within_limit(self):
+        line = 'DESCRIPTION:' + 'ż' * 100
+        folded = fold_line(line)
+
+        assert folded.endswith('\r\n')
+        physical = folded[:-2].split('\r\n')
+        assert all(len(part.encode('utf-8')) <= 75 for part in physical)
+        assert all(part.startswith(' ') for part in physical[1:])
+        assert ''.join(part[1:] if i else part for i, part in enumerate(physical)) == line
+
+
+class TestVevent:
+    """Unit tests for VEVENT serialization"""
+
+    def test_single_event(self):
+        lines = vevent_lines(_event(), DTSTAMP)
+
+        assert lines[0] == 'BEGIN:VEVENT' and lines[-1] == 'END:VEVENT'
+        assert 'UID:7@my-friend-calendar' in lines
+        assert 'DTSTART:20240603T100000Z' in lines
+        assert 'STATUS:CONFIRMED' in lines
+        assert 'ATTENDEE:mailto:guest@example.com' in lines
+
+    def test_series_with_exceptions(self):
+        cancelled = MagicMock(is_cancelled=True, original_start=datetime(2024, 6, 10, 10, 0))
+        moved = MagicMock(
+            is_cancelled=False, original_start=datetime(2024, 6, 17, 10, 0),
+            start_time=datetime(2024, 6, 18, 14, 0), end_time=None,
+            title='Moved', description=None, location=None,
+        )
+        event = _event(recurrence_rule='FREQ=WEEKLY;UNTIL=20240630T000000', exceptions=[cancelled, moved])
+
+        lines = vevent_lines(event, DTSTAMP)
+
+        assert 'RRULE:FREQ=WEEKLY;UNTIL=20240630T000000Z' in lines
+        assert 'EXDATE:20240610T100000Z' in lines
+        assert lines.count('BEGIN:VEVENT') == 2
+        assert 'RECURRENCE-ID:20240617T100000Z' in lines
+        assert 'DTEND:20240618T150000Z' in lines
+
+    def test_calendar_envelope(self):
+        query = MagicMock()
+        query.yield_per.return_value = [_event()]
+
+        document = ''.join(iter_calendar_ics(query, batch_size=10))
+
+        query.yield_per.assert_called_once_with(10)
+        assert document.startswith('BEGIN:VCALENDAR\r\nVERSION:2.0\r\n')
+        assert document.endswith('END:VCALENDAR\r\n')
+
+
+SAMPLE_ICS = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:one@example.com\r\n"
+    "DTSTART:20240603T100000Z\r\n"
+    "DTEND:20240603T110000Z\r\n"
+    "SUMMARY:Weekly\\, sync\r\n"
+    "DESCRIPTION:A long description that the exporting client decided to fold\r\n"
+    "  across two lines\r\n"
+    "RRULE:FREQ=WEEKLY;COUNT=4\r\n"
+    "EXDATE:20240610T100000Z,20240617T100000Z\r\n"
+    "ATTENDEE;CN=\"Guest: One\":mailto:Guest@Example.com\r\n"
+    "BEGIN:VALARM\r\n"
+    "DESCRIPTION:Reminder\r\n"
+    "END:VALARM\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:two@example.com\r\n"
+    "DTSTART;VALUE=DATE:20240610\r\n"
+    "SUMMARY:Holiday\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:three@example.com\r\n"
+    "SUMMARY:No start\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+class TestIcsParsing:
+    """Unit tests for incremental iCalendar parsing"""
+
+    def _vevents(self):
+        return list(iter_vevents(iter_content_lines(io.BytesIO(SAMPLE_ICS.encode('utf-8')))))
+
+    def test_unescape(self):
+        assert unescape_text('a\\,b\\;c\\nd\\\\e') == 'a,b;c\nd\\e'
+
+    def test_unfolds_and_skips_nested_components(self):
+        vevents = self._vevents()
+
+        assert len(vevents) == 3
+        description = vevents[0]['DESCRIPTION']
+        assert description == [({}, 'A long description that the exporting client decided to fold across two lines')]
+
+    def test_maps_event_and_attendees(self):
+        data, attendees, excluded_starts = vevent_to_event_data(self._vevents()[0])
+
+        assert data['title'] == 'Weekly, sync'
+        assert data['start_time'] == '2024-06-03T10:00:00'
+        assert data['recurrence_rule'] == 'FREQ=WEEKLY;COUNT=4'
+        assert attendees == {'guest@example.com'}
+        assert excluded_starts == [datetime(2024, 6, 10, 10, 0), datetime(2024, 6, 17, 10, 0)]
+
+    def test_long_text_truncated(self):
+        properties = self._vevents()[0]
+        properties['SUMMARY'] = [({}, 'x' * 300)]
+        properties['LOCATION'] = [({}, 'y' * 300)]
+
+        data, _, _ = vevent_to_event_data(properties)
+
+        assert len(data['title']) == 255
+        assert len(data['location']) == 255
+
+    def test_long_rrule_rejected(self):
+        properties = self._vevents()[0]
+        properties['RRULE'] = [({}, 'FREQ=DAILY;BYHOUR=' + ','.join(['1'] * 200))]
+
+        with pytest.raises(ValueError):
+            vevent_to_event_data(properties)
+
+    def test_all_day_event_lasts_one_day(self):
+        data, _, excluded_starts = vevent_to_event_data(self._vevents()[1])
+
+        assert (data['start_time'], data['end_time']) == ('2024-06-10T00:00:00', '2024-06-11T00:00:00')
+        assert excluded_starts == []
+
+    def test_missing_start_rejected(self):
+        with pytest.raises(ValueError):
+            vevent_to_event_data(self._vevents()[2])
+
+    def test_tzid_converted_to_utc(self):
+        moment, all_day = parse_ics_datetime('20240603T120000', {'TZID': 'Europe/Warsaw'})
+
+        assert moment == datetime(2024, 6, 3, 10, 0)
+        assert all_day is False
+
+    @pytest.mark.parametrize('value', ['0', '100000', 'many'])
+    def test_invalid_batch_size(self, value):
+        with pytest.raises(ValueError):
+            parse_import_batch_size(value)
+
+
+class TestImportIcs:
+    """Unit tests for batching in import_ics"""
+
+    @patch('app.services.ical_service.bump_calendar_versions')
+    @patch('app.services.ical_service.insert_events')
+    @patch('app.services.ical_service.db.session')
+    def test_batches_and_reports_errors(self, mock_db, mock_insert, mock_bump):
+        mock_db.execute.return_value.all.return_value = []
+        mock_insert.side_effect = lambda rows: list(range(len(rows)))
+
+        summary = import_ics(io.BytesIO(SAMPLE_ICS.encode('utf-8')), 'owner', batch_size=1)
+
+        assert summary['imported'] == 2
+        assert summary['failed'] == 1
+        assert summary['errors'][0]['uid'] == 'three@example.com'
+        assert mock_insert.call_count == 2
+        mock_db.commit.assert_called_once()
+
+        exception_rows = [call.args[1] for call in mock_db.execute.call_args_list if len(call.args) > 1]
+        assert exception_rows == [[
+            {'event_id': 0, 'original_start': datetime(2024, 6, 10, 10, 0), 'is_cancelled': True},
+            {'event_id': 0, 'original_start': datetime(2024, 6, 17, 10, 0), 'is_cancelled': True},
+        ]]
+
@@ -0,0 +1,176 @@
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from werkzeug.security import generate_password_hash
+from app.services.password_service import hash_password, needs_rehash, password_hasher, calibrate, MINIMAL_MEMORY_COST
+from app.services.password_service import HashingPool, HashingPoolSaturatedError, verify_password
+from app.services.auth_service import authenticate_user
+
+
+def profile_app(time_cost=1, memory_cost=8192, parallelism=1):
+    app = Flask(__name__)
+    app.config.update(PASSWORD_HASH_TIME_COST=time_cost, PASSWORD_HASH_MEMORY_COST=memory_cost,
+                      PASSWORD_HASH_PARALLELISM=parallelism)
+    return app
+
+
+class TestCostProfile:
+    """Unit tests for hashing with the configured argon2id profile"""
+
+    def test_hash_uses_profile(self):
+        with profile_app().app_context():
+            hashed = hash_password('Secret1!')
+
+            assert hashed.startswith('$argon2id$')
+            assert 'm=8192,t=1,p=1' in hashed
+            assert password_hasher().verify(hashed, 'Secret1!')
+
+    def test_pbkdf2_needs_rehash(self):
+        with profile_app().app_context():
+            assert needs_rehash('pbkdf2:sha256', generate_password_hash('Secret1!'))
+
+    def test_profile_change_needs_rehash(self):
+        with profile_app().app_context():
+            hashed = hash_password('Secret1!')
+            assert not needs_rehash('argon2id', hashed)
+
+        with profile_app(time_cost=2).app_context():
+            assert needs_rehash('argon2id', hashed)
+
+
+class TestCalibrate:
+    """Unit tests for the cost calibration search"""
+
+    @staticmethod
+    def _model(time_cost, memory_cost, parallelism, rounds):
+        return time_cost * memory_cost / 1024
+
+    @patch('app.services.password_service._median_hash_ms')
+    def test_time_cost_grows_to_target(self, mock_median):
+        mock_median.side_effect = self._model
+
+        profile = calibrate(250, memory_cost=65536, parallelism=4)
+
+        assert (profile['time_cost'], profile['memory_cost']) == (3, 65536)
+        assert profile['median_ms'] == 192
+
+    @patch('app.services.password_service._median_hash_ms')
+    def test_memory_halved_when_single_pass_too_slow(self, mock_median):
+        mock_median.side_effect = self._model
+
+        profile = calibrate(40, memory_cost=262144, parallelism=4)
+
+        assert profile['memory_cost'] == 32768
+        assert profile['time_cost'] == 1
+
+    @patch('app.services.password_service._median_hash_ms')
+    def test_memory_floor(self, mock_median):
+        mock_median.side_effect = self._model
+
+        profile = calibrate(1, memory_cost=65536, parallelism=4)
+
+        assert profile['memory_cost'] >= MINIMAL_MEMORY_COST
+
+
+class TestRehashOnLogin:
+    """Unit tests for upgrading stored hashes after a successful login"""
+
+    @pytest.fixture
+    def stored_user(self):
+        user = MagicMock(is_active=True, password_algorithm='pbkdf2:sha256',
+                         password_hash=generate_password_hash('Secret1!'))
+        return user
+
+    @patch('app.services.auth_service.db.session')
+    @patch('app.services.auth_service.User')
+    @patch('app.services.auth_service.login_throttle')
+    def test_pbkdf2_upgraded(self, mock_throttle, mock_user, mock_db, stored_user):
+        mock_user.query.filter.return_value.filter_by.return_value.first.return_value = stored_user
+
+        with profile_app().app_context():
+            assert authenticate_user('a@example.com', 'Secret1!') is stored_user
+
+        assert stored_user.password_algorithm == 'argon2id'
+        assert stored_user.password_hash.startswith('$argon2id$')
+        mock_db.commit.assert_called_once()
+
+    @patch('app.services.auth_service.db.session')
+    @patch('app.services.auth_service.User')
+    @patch('app.services.auth_service.login_throttle')
+    def test_current_hash_kept(self, mock_throttle, mock_user, mock_db, stored_user):
+        mock_user.query.filter.return_value.filter_by.return_value.first.return_value = stored_user
+        with profile_app().app_context():
+            stored_user.password_algorithm = 'argon2id'
+            stored_user.password_hash = hash_password('Secret1!')
+            current = stored_user.password_hash
+
+            authenticate_user('a@example.com', 'Secret1!')
+
+        assert stored_user.password_hash == current
+
+
+class TestHashingPool:
+    """Unit tests for the bounded password hashing pool"""
+
+    @pytest.fixture
+    def pool(self):
+        return HashingPool(workers=1, queue_depth=1, timeout=5)
+
+    def test_runs_on_worker_thread(self, pool):
+        assert pool.run(threading.current_thread).name.startswith('password-hash')
+
+    def test_rejects_when_saturated(self, pool):
+        release = threading.Event()
+        first = threading.Thread(target=pool.run, args=(release.wait,))
+        second = threading.Thread(target=pool.run, args=(release.wait,))
+        first.start()
+        second.start()
+        try:
+            while pool._slots._value:
+                release.wait(0.01)
+
+            with pytest.raises(HashingPoolSaturatedError) as error:
+                pool.run(len, 'x')
+            assert error.value.retry_after >= 1
+        finally:
+            release.set()
+            first.join()
+            second.join()
+
+        assert pool.run(len, 'x') == 1
+
+    def test_timeout_rejects(self):
+        pool = HashingPool(workers=1, queue_depth=0, timeout=0.01)
+        release = threading.Event()
+
+        with pytest.raises(HashingPoolSaturatedError):
+            pool.run(release.wait)
+        release.set()
+
+    def test_errors_propagate(self, pool):
+        with pytest.raises(ZeroDivisionError):
+            pool.run(divmod, 1, 0)
+        assert pool.run(len, 'ok') == 2
+
+    def test_verify_password(self):
+        with profile_app().app_context():
+            hashed = hash_password('Secret1!')
+
+            assert verify_password('argon2id', hashed, 'Secret1!')
+            assert not verify_password('argon2id', hashed, 'Wrong1!')
+            assert not verify_password('argon2id', 'not-a-hash', 'Secret1!')
+            assert verify_password('pbkdf2:sha256', generate_password_hash('Secret1!'), 'Secret1!')
+            assert not verify_password('bcrypt', hashed, 'Secret1!')
+
+    @patch('app.services.auth_service.User')
+    @patch('app.services.auth_service.login_throttle')
+    @patch('app.services.auth_service.verify_password', side_effect=HashingPoolSaturatedError())
+    def test_saturated_login_not_counted(self, mock_verify, mock_throttle, mock_user):
+        mock_user.query.filter.return_value.filter_by.return_value.first.return_value = MagicMock(
+            is_active=True, password_algorithm='argon2id', password_hash='$argon2id$')
+
+        with pytest.raises(HashingPoolSaturatedError):
+            authenticate_user('a@example.com', 'Secret1!')
+
+        mock_throttle.record.assert_not_called()
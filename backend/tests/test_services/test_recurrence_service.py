@@ -0,0 +1,168 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app.services.recurrence_service import (
+    parse_rrule, normalize_rrule, occurrence_starts, series_end, occurrence_intervals, is_occurrence,
+    shift_rrule, overlap_filters, moved_occurrence_filters)
+
+HOUR = timedelta(hours=1)
+
+
+def series(rule, start=datetime(2024, 1, 1, 10, 0), duration=HOUR):
+    return SimpleNamespace(recurrence_rule=rule, start_time=start, end_time=start + duration)
+
+
+class TestParseRrule:
+    """Unit tests for RRULE parsing"""
+
+    def test_weekly_rule(self):
+        rule = parse_rrule('RRULE:FREQ=WEEKLY;BYDAY=WE,MO;INTERVAL=2;COUNT=10')
+
+        assert rule == {'freq': 'WEEKLY', 'interval': 2, 'count': 10, 'until': None, 'byday': [0, 2]}
+
+    def test_normalize(self):
+        assert normalize_rrule('freq=weekly;byday=we,mo') == 'FREQ=WEEKLY;BYDAY=MO,WE'
+        assert normalize_rrule('') is None
+        assert normalize_rrule(None) is None
+
+    @pytest.mark.parametrize('text', [
+        'FREQ=HOURLY',
+        'FREQ=DAILY;BYHOUR=9',
+        'FREQ=DAILY;COUNT=0',
+        'FREQ=DAILY;COUNT=2;UNTIL=20240101',
+        'FREQ=MONTHLY;BYDAY=MO',
+        'FREQ=WEEKLY;BYDAY=XX',
+        'FREQ=DAILY;UNTIL=tomorrow',
+        'FREQ',
+    ])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError, match="INVALID_RRULE"):
+            parse_rrule(text)
+
+
+class TestOccurrenceStarts:
+    """Unit tests for occurrence expansion"""
+
+    def test_daily_count(self):
+        starts = list(occurrence_starts(parse_rrule('FREQ=DAILY;COUNT=3'), datetime(2024, 1, 1, 10), HOUR))
+
+        assert starts == [datetime(2024, 1, d, 10) for d in (1, 2, 3)]
+
+    def test_weekly_byday_skips_days_before_start(self):
+        # 2024-01-03 is a Wednesday
+        rule = parse_rrule('FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=4')
+
+        starts = list(occurrence_starts(rule, datetime(2024, 1, 3, 10), HOUR))
+
+        assert starts == [datetime(2024, 1, d, 10) for d in (3, 5, 8, 10)]
+
+    def test_monthly_skips_missing_days(self):
+        rule = parse_rrule('FREQ=MONTHLY;COUNT=3')
+
+        starts = list(occurrence_starts(rule, datetime(2024, 1, 31, 10), HOUR))
+
+        assert starts == [datetime(2024, 1, 31, 10), datetime(2024, 3, 31, 10), datetime(2024, 5, 31, 10)]
+
+    def test_until_is_inclusive(self):
+        rule = parse_rrule('FREQ=DAILY;UNTIL=20240103T100000')
+
+        assert len(list(occurrence_starts(rule, datetime(2024, 1, 1, 10), HOUR))) == 3
+
+    def test_window_far_from_start_matches_full_expansion(self):
+        rule = parse_rrule('FREQ=WEEKLY;BYDAY=TU,TH;INTERVAL=2')
+        dtstart = datetime(2010, 3, 2, 9)
+        range_start, range_end = datetime(2024, 6, 1), datetime(2024, 7, 1)
+
+        windowed = list(occurrence_starts(rule, dtstart, HOUR, range_start, range_end))
+        brute = [
+            moment for moment in occurrence_starts(rule, dtstart, HOUR, range_end=range_end)
+            if moment + HOUR > range_start
+        ]
+
+        assert windowed == brute
+        assert windowed
+
+    def test_count_respected_after_skipping(self):
+        rule = parse_rrule('FREQ=DAILY;COUNT=10')
+
+        starts = list(occurrence_starts(rule, datetime(2024, 1, 1, 10), HOUR, datetime(2024, 1, 8), datetime(2024, 2, 1)))
+
+        assert starts == [datetime(2024, 1, d, 10) for d in (8, 9, 10)]
+
+    def test_occurrence_overlapping_window_start_included(self):
+        rule = parse_rrule('FREQ=DAILY')
+
+        starts = list(occurrence_starts(
+            rule, datetime(2024, 1, 1, 23), 2 * HOUR, datetime(2024, 1, 5), datetime(2024, 1, 5, 12)
+        ))
+
+        assert starts == [datetime(2024, 1, 4, 23)]
+
+
+class TestSeriesHelpers:
+    """Unit tests for series_end, occurrence_intervals and is_occurrence"""
+
+    def test_series_end(self):
+        rule = parse_rrule('FREQ=WEEKLY;COUNT=3')
+
+        assert series_end(rule, datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11)) == datetime(2024, 1, 15, 11)
+
+    def test_shift_rrule_moves_until(self):
+        assert shift_rrule('FREQ=DAILY;UNTIL=20240110', HOUR) == 'FREQ=DAILY;UNTIL=20240110T010000'
+        assert shift_rrule('FREQ=DAILY;COUNT=2', HOUR) == 'FREQ=DAILY;COUNT=2'
+        assert shift_rrule(None, HOUR) is None
+
+    def test_endless_series_has_no_end(self):
+        assert series_end(parse_rrule('FREQ=DAILY'), datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11)) is None
+
+    def test_single_event_interval(self):
+        event = series(None)
+
+        assert occurrence_intervals(event, datetime(2024, 1, 1), datetime(2024, 1, 2)) == [
+            (datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11), None, None)
+        ]
+
+    def test_exceptions_cancel_and_move(self):
+        event = series('FREQ=DAILY')
+        cancelled = SimpleNamespace(original_start=datetime(2024, 1, 2, 10), is_cancelled=True,
+                                    start_time=None, end_time=None)
+        moved_in = SimpleNamespace(original_start=datetime(2024, 1, 10, 10), is_cancelled=False,
+                                   start_time=datetime(2024, 1, 3, 15), end_time=None)
+
+        intervals = occurrence_intervals(
+            event, datetime(2024, 1, 1), datetime(2024, 1, 4), [cancelled, moved_in]
+        )
+
+        assert [(start, original) for start, _, original, _ in intervals] == [
+            (datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 10)),
+            (datetime(2024, 1, 3, 10), datetime(2024, 1, 3, 10)),
+            (datetime(2024, 1, 3, 15), datetime(2024, 1, 10, 10)),
+        ]
+
+    def test_is_occurrence(self):
+        event = series('FREQ=WEEKLY;BYDAY=MO')
+
+        assert is_occurrence(event, datetime(2024, 1, 8, 10))
+        assert not is_occurrence(event, datetime(2024, 1, 9, 10))
+        assert not is_occurrence(event, datetime(2024, 1, 8, 11))
+
+
+class TestOverlapFilters:
+    """Unit tests for the SQL window predicates"""
+
+    def test_range_stays_on_events(self):
+        filters = overlap_filters(datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+        assert len(filters) == 2
+        assert not any('event_exceptions' in str(predicate) for predicate in filters)
+
+    def test_moved_occurrences_matched_on_exceptions(self):
+        filters = moved_occurrence_filters(datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+        sql = ' AND '.join(str(predicate) for predicate in filters)
+        assert 'event_exceptions.start_time < :start_time_1' in sql
+        assert 'event_exceptions.end_time > :end_time_1' in sql
+        assert 'events' not in sql.replace('event_exceptions', '')
+
+    def test_no_window(self):
+        assert overlap_filters() == []
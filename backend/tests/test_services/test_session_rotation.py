@@ -0,0 +1,62 @@
+import uuid
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from flask import Flask
+from flask_jwt_extended import decode_token
+from sqlalchemy.dialects import postgresql
+from app.extensions import jwt
+from app.services.auth_service import refresh_tokens, SessionNotFoundError, SessionRevokedError
+
+
+@pytest.fixture
+def jwt_app():
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+    jwt.init_app(app)
+    with app.app_context():
+        yield app
+
+
+@patch('app.services.auth_service.access_token_claims', return_value={})
+@patch('app.services.auth_service.revoke_token')
+@patch('app.services.auth_service.db.session')
+class TestRefreshRotation:
+    """Unit tests for single-statement refresh token rotation"""
+
+    def test_rotates_in_one_statement(self, mock_session, mock_revoke, mock_claims, jwt_app):
+        expires_at = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        mock_session.execute.return_value.scalar_one_or_none.return_value = expires_at
+        old_jti, user_id = uuid.uuid4(), str(uuid.uuid4())
+
+        tokens = refresh_tokens(str(old_jti), user_id, '10.0.0.1', 'pytest')
+
+        mock_session.execute.assert_called_once()
+        sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith('WITH revoked_session AS')
+        assert 'UPDATE user_sessions' in sql and 'revoked_at IS NULL' in sql
+        assert 'INSERT INTO user_sessions' in sql
+        mock_session.commit.assert_called_once()
+        mock_revoke.assert_called_once_with(old_jti, expires_at)
+
+        new_jti = decode_token(tokens['refresh_token'])['jti']
+        params = mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()).params
+        assert uuid.UUID(new_jti) in params.values()
+        assert decode_token(tokens['access_token'])['sub'] == user_id
+
+    def test_revoked_session(self, mock_session, mock_revoke, mock_claims, jwt_app):
+        mock_session.execute.return_value.scalar_one_or_none.return_value = None
+
+        with pytest.raises(SessionRevokedError):
+            refresh_tokens(str(uuid.uuid4()), str(uuid.uuid4()), None, 'pytest')
+
+        mock_session.rollback.assert_called_once()
+        mock_session.commit.assert_not_called()
+        mock_revoke.assert_not_called()
+
+    def test_missing_session(self, mock_session, mock_revoke, mock_claims, jwt_app):
+        mock_session.execute.return_value.scalar_one_or_none.return_value = None
+        mock_session.get.return_value = None
+
+        with pytest.raises(SessionNotFoundError):
+            refresh_tokens(str(uuid.uuid4()), str(uuid.uuid4()), None, 'pytest')
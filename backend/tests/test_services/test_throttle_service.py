@@ -0,0 +1,179 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, MagicMock
+from flask import Flask
+from app.services.throttle_service import (
+    SlidingWindowCounter, LoginThrottle, LoginThrottledError, AttemptWriter)
+from app.services.auth_service import authenticate_user
+
+WINDOW = timedelta(minutes=15)
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def throttle(clock):
+    throttle = LoginThrottle(WINDOW, email_budget=3, ip_budget=5, clock=clock)
+    throttle.writer = MagicMock()
+    return throttle
+
+
+class TestSlidingWindowCounter:
+    """Unit tests for the in-memory sliding window"""
+
+    def test_untracked_key(self, clock):
+        assert SlidingWindowCounter(WINDOW, clock=clock).events('k') is None
+
+    def test_old_events_leave_window(self, clock):
+        counter = SlidingWindowCounter(WINDOW, clock=clock)
+        counter.hit('k')
+        clock.now += 600
+        counter.hit('k')
+
+        clock.now += 301
+        assert len(counter.events('k')) == 1
+
+    def test_least_recently_used_key_evicted(self, clock):
+        counter = SlidingWindowCounter(WINDOW, maxsize=2, clock=clock)
+        counter.hit('a')
+        counter.hit('b')
+        counter.events('a')
+        counter.hit('c')
+
+        assert counter.events('b') is None
+        assert counter.events('a') == [clock.now]
+
+
+class TestLoginThrottle:
+    """Unit tests for per-email and per-IP budgets"""
+
+    @patch('app.services.throttle_service.db.session')
+    def test_email_budget(self, mock_db, throttle, clock):
+        mock_db.execute.return_value.scalars.return_value.all.return_value = []
+        for _ in range(3):
+            throttle.check('a@example.com', '10.0.0.1')
+            throttle.record('a@example.com', '10.0.0.1', 'ua', False)
+
+        with pytest.raises(LoginThrottledError) as exc_info:
+            throttle.check('a@example.com', '10.0.0.2')
+        assert 0 < exc_info.value.retry_after <= WINDOW.total_seconds() + 1
+
+        clock.now += WINDOW.total_seconds()
+        throttle.check('a@example.com', '10.0.0.2')
+
+    @patch('app.services.throttle_service.db.session')
+    def test_ip_budget_across_emails(self, mock_db, throttle):
+        mock_db.execute.return_value.scalars.return_value.all.return_value = []
+        for i in range(5):
+            throttle.record(f'user{i}@example.com', '10.0.0.1', 'ua', False)
+
+        with pytest.raises(LoginThrottledError):
+            throttle.check('someone@example.com', '10.0.0.1')
+
+    @patch('app.services.throttle_service.db.session')
+    def test_success_clears_email_failures(self, mock_db, throttle):
+        mock_db.execute.return_value.scalars.return_value.all.return_value = []
+        for _ in range(2):
+            throttle.record('a@example.com', '10.0.0.1', 'ua', False)
+        throttle.record('a@example.com', '10.0.0.1', 'ua', True)
+        throttle.record('a@example.com', '10.0.0.1', 'ua', False)
+
+        throttle.check('a@example.com', '10.0.0.1')
+
+    @patch('app.services.throttle_service.db.session')
+    def test_unknown_keys_loaded_from_table_once(self, mock_db, throttle, clock):
+        recent = datetime.fromtimestamp(clock.now - 60, timezone.utc)
+        mock_db.execute.return_value.scalars.return_value.all.return_value = [recent] * 3
+
+        with pytest.raises(LoginThrottledError):
+            throttle.check('a@example.com', '10.0.0.1')
+        with pytest.raises(LoginThrottledError):
+            throttle.check('a@example.com', '10.0.0.1')
+
+        assert mock_db.execute.call_count == 2
+
+    @patch('app.services.throttle_service.db.session')
+    def test_email_seed_starts_after_last_success(self, mock_db, throttle):
+        mock_db.execute.return_value.scalars.return_value.all.return_value = []
+
+        throttle.check('a@example.com', '10.0.0.1')
+
+        email_query, ip_query = (str(call.args[0]) for call in mock_db.execute.call_args_list)
+        assert 'max(login_attempts.created_at)' in email_query
+        assert 'login_attempts.successful IS true' in email_query
+        assert 'max(' not in ip_query
+
+    def test_record_queues_row(self, throttle):
+        throttle.record('a@example.com', '10.0.0.1', 'ua', False, failure_reason='invalid_password')
+
+        row = throttle.writer.add.call_args.args[0]
+        assert (row['email'], row['successful'], row['failure_reason']) == ('a@example.com', False, 'invalid_password')
+
+
+class TestAttemptWriter:
+    """Unit tests for batched LoginAttempt writes"""
+
+    @patch('app.services.throttle_service.db.session')
+    def test_rows_buffered_and_flushed_together(self, mock_db):
+        writer = AttemptWriter(batch_size=100, flush_interval=60)
+        writer.init_app(Flask(__name__))
+
+        with patch('app.services.throttle_service.threading.Thread'):
+            writer.add({'email': 'a'})
+            writer.add({'email': 'b'})
+        mock_db.execute.assert_not_called()
+
+        assert writer.flush() == 2
+        assert mock_db.execute.call_args.args[1] == [{'email': 'a'}, {'email': 'b'}]
+        mock_db.commit.assert_called_once()
+
+    @patch('app.services.throttle_service.db.session')
+    def test_inline_in_testing(self, mock_db):
+        app = Flask(__name__)
+        app.testing = True
+        writer = AttemptWriter()
+        writer.init_app(app)
+
+        writer.add({'email': 'a'})
+
+        mock_db.execute.assert_called_once()
+
+
+class TestAuthenticateUserThrottling:
+    """Unit tests for throttling in authenticate_user"""
+
+    @patch('app.services.auth_service._verify_password')
+    @patch('app.services.auth_service.User')
+    @patch('app.services.auth_service.login_throttle')
+    def test_throttled_before_lookup_and_hashing(self, mock_throttle, mock_user, mock_verify):
+        mock_throttle.check.side_effect = LoginThrottledError(30)
+
+        with pytest.raises(LoginThrottledError):
+            authenticate_user('A@example.com', 'secret', '10.0.0.1')
+
+        mock_throttle.check.assert_called_once_with('a@example.com', '10.0.0.1')
+        mock_user.query.filter.assert_not_called()
+        mock_verify.assert_not_called()
+
+    @patch('app.services.auth_service._verify_password', return_value=False)
+    @patch('app.services.auth_service.User')
+    @patch('app.services.auth_service.login_throttle')
+    def test_failure_recorded(self, mock_throttle, mock_user, mock_verify):
+        user = MagicMock(is_active=True)
+        mock_user.query.filter.return_value.filter_by.return_value.first.return_value = user
+
+        assert authenticate_user('a@example.com', 'wrong', '10.0.0.1', 'ua') is None
+
+        mock_throttle.record.assert_called_once_with(
+            'a@example.com', '10.0.0.1', 'ua', False, user.id, 'invalid_password')